@@ -2,9 +2,14 @@ import { SKILL_DB } from '../../shared/SkillTypes.js';
 
 const SKILL_IDS = Object.keys(SKILL_DB).concat(['dash']);
 
+// Frames per cooldown sheet; must match COOLDOWN_STEPS in tools/gen_skill_icons.py
+const COOLDOWN_STEPS = 12;
+
 class SkillSprites {
   constructor() {
     this.sprites = {};
+    this.disabled = {};
+    this.cooldown = {};
     this.loaded = false;
   }
 
@@ -20,20 +25,47 @@ class SkillSprites {
         img.onload = () => {
           this.sprites[id] = img;
           count++;
-          if (count >= total) { this.loaded = true; resolve(); }
+          if (count >= total) { this.loaded = true; this._loadStates(); resolve(); }
         };
         img.onerror = () => {
           count++;
-          if (count >= total) { this.loaded = true; resolve(); }
+          if (count >= total) { this.loaded = true; this._loadStates(); resolve(); }
         };
         img.src = `/tileArt/skills/${id}.png`;
       }
     });
   }
 
+  // Prebaked disabled icons and cooldown sweep sheets. Loaded in the background;
+  // until they arrive the UI falls back to dimming the base icon.
+  _loadStates() {
+    for (const id of Object.keys(this.sprites)) {
+      for (const [state, store] of [['disabled', this.disabled], ['cooldown', this.cooldown]]) {
+        const img = new Image();
+        img.onload = () => { store[id] = img; };
+        img.src = `/tileArt/skills/${state}/${id}.png`;
+      }
+    }
+  }
+
   get(skillId) {
     return this.sprites[skillId] || null;
   }
+
+  getDisabled(skillId) {
+    return this.disabled[skillId] || null;
+  }
+
+  // Draw the cooldown sheet frame for cdPercent (1 = just used, 0 = ready).
+  // Returns false when the sheet isn't loaded so the caller can fall back.
+  drawCooldown(ctx, skillId, cdPercent, x, y, w, h) {
+    const sheet = this.cooldown[skillId];
+    if (!sheet) return false;
+    const frame = Math.min(COOLDOWN_STEPS - 1, Math.floor((1 - cdPercent) * COOLDOWN_STEPS));
+    const fw = sheet.width / COOLDOWN_STEPS;
+    ctx.drawImage(sheet, frame * fw, 0, fw, sheet.height, x, y, w, h);
+    return true;
+  }
 }
 
 const skillSprites = new SkillSprites();
@@ -62,7 +62,12 @@ export default class SkillBar {
 
         // Skill icon or color fill
         const icon = skillSprites.get(def.id);
-        if (icon) {
+        const baked = cdPercent > 0 && skillSprites.drawCooldown(
+          ctx, def.id, cdPercent, sx + 2, sy + 2, this.slotSize - 4, this.slotSize - 4
+        );
+        if (baked) {
+          // Prebaked sweep frame already shows the cooldown
+        } else if (icon) {
           ctx.globalAlpha = cdPercent > 0 ? 0.4 : (isFlashing ? 1.0 : 0.9);
           ctx.drawImage(icon, sx + 2, sy + 2, this.slotSize - 4, this.slotSize - 4);
         } else {
@@ -71,11 +76,13 @@ export default class SkillBar {
           ctx.fillRect(sx + 2, sy + 2, this.slotSize - 4, this.slotSize - 4);
         }
 
-        // Cooldown overlay (top-down sweep)
+        // Cooldown overlay (top-down sweep, unless the baked sheet drew it)
         if (cdPercent > 0) {
-          ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
-          const coverHeight = (this.slotSize - 4) * cdPercent;
-          ctx.fillRect(sx + 2, sy + 2, this.slotSize - 4, coverHeight);
+          if (!baked) {
+            ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+            const coverHeight = (this.slotSize - 4) * cdPercent;
+            ctx.fillRect(sx + 2, sy + 2, this.slotSize - 4, coverHeight);
+          }
 
           // Cooldown text
           ctx.globalAlpha = 1.0;
@@ -136,7 +143,10 @@ export default class SkillBar {
 
     // Dash icon or fill color
     const dashIcon = skillSprites.get('dash');
-    if (dashIcon) {
+    const baked = cdPercent > 0 && skillSprites.drawCooldown(ctx, 'dash', cdPercent, dx + 2, dy + 2, ds - 4, ds - 4);
+    if (baked) {
+      // Prebaked sweep frame already shows the cooldown
+    } else if (dashIcon) {
       ctx.globalAlpha = cdPercent > 0 ? 0.4 : 0.9;
       ctx.drawImage(dashIcon, dx + 2, dy + 2, ds - 4, ds - 4);
     } else {
@@ -147,9 +157,11 @@ export default class SkillBar {
 
     // Cooldown overlay
     if (cdPercent > 0) {
-      ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
-      const coverHeight = (ds - 4) * cdPercent;
-      ctx.fillRect(dx + 2, dy + 2, ds - 4, coverHeight);
+      if (!baked) {
+        ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+        const coverHeight = (ds - 4) * cdPercent;
+        ctx.fillRect(dx + 2, dy + 2, ds - 4, coverHeight);
+      }
 
       ctx.globalAlpha = 1.0;
       ctx.fillStyle = '#fff';
@@ -166,8 +166,9 @@ export default class SkillsPanel {
         ctx.fillRect(this.x + 2, rowY, this.width - 4, this.rowHeight);
       }
 
-      // Skill icon or color pip
-      const icon = skillSprites.get(def.id);
+      // Skill icon or color pip (greyed out while on cooldown)
+      const onCooldown = skills.getCooldownPercent(def.id) > 0;
+      const icon = (onCooldown && skillSprites.getDisabled(def.id)) || skillSprites.get(def.id);
       const iconSize = 24;
       const iconX = this.x + 8;
       const iconY = rowY + Math.floor((this.rowHeight - iconSize) / 2);
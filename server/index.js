@@ -26,6 +26,15 @@ app.use(express.json());
 app.use('/client', express.static(join(ROOT, 'client')));
 app.use('/shared', express.static(join(ROOT, 'shared')));
 app.use('/data', express.static(join(ROOT, 'data')));
+// Atlas pages are named by content hash (tools/build_assets.py atlas), so a URL
+// never changes content; only the manifest has to be revalidated.
+app.use('/tileArt/atlas', express.static(join(ROOT, 'tileArt', 'atlas'), {
+  immutable: true,
+  maxAge: '1y',
+  setHeaders(res, path) {
+    if (path.endsWith('.json')) res.setHeader('Cache-Control', 'no-cache');
+  },
+}));
 app.use('/tileArt', express.static(join(ROOT, 'tileArt')));
 
 // Landing page (login/character select)
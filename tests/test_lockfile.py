@@ -0,0 +1,137 @@
+"""
+tileArt.lock staleness (see tools/lockfile.py): outputs that were edited
+or removed, generators whose source moved, committed files locked by
+their bytes, and ids or files the lock does not cover.
+
+    python -m pytest -q tests/test_lockfile.py
+"""
+
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import lockfile  # noqa: E402
+from build_cache import file_sha1  # noqa: E402
+
+SOURCE = '''
+def gen_a():
+    return 1
+
+
+def gen_b():
+    return 2
+
+
+GENERATORS = {'a': gen_a, 'b': gen_b}
+'''
+
+
+def _save(path, text, tick):
+    path.write_text(text)
+    # Distinct mtimes even on filesystems with coarse timestamps
+    os.utime(path, ns=(tick * 10**9, tick * 10**9))
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A one-module tools dir, its art dir and a lock that matches both."""
+    tools = tmp_path / 'tools'
+    art = tmp_path / 'art'
+    tools.mkdir()
+    art.mkdir()
+    monkeypatch.setattr(lockfile, 'TOOLS_DIR', str(tools))
+    module = tools / 'scratch_gen.py'
+    _save(module, SOURCE, 1)
+
+    lock = lockfile.Lock(str(tmp_path / 'art.lock'))
+    lock.sources['scratch_gen.py'] = {'sha1': file_sha1(str(module)),
+                                      'units': lockfile._unit_hashes(str(module))}
+    for name, data in [('a', b'AAAA'), ('b', b'BB')]:
+        (art / f'{name}.png').write_bytes(data)
+        lock.outputs[f'{name}.png'] = {'id': name, 'generator': f'scratch_gen.gen_{name}',
+                                       'inputs': '', 'deps': [f'scratch_gen.gen_{name}'],
+                                       'size': len(data), 'sha1': hashlib.sha1(data).hexdigest()}
+    lock.save()
+
+    def verify(ids=('a', 'b')):
+        return lockfile.verify(lock.path, str(art), str(tmp_path / 'digests.json'), workers=2, ids=ids)
+    return module, art, verify
+
+
+def test_up_to_date(tree):
+    _, _, verify = tree
+    assert verify() == lockfile.Report(2, {}, {})
+    assert verify() == lockfile.Report(2, {}, {})   # again, from the digest cache
+
+
+def test_modified_and_missing_outputs(tree):
+    _, art, verify = tree
+    assert verify().stale == {}
+    (art / 'a.png').write_bytes(b'AAAB')          # same size: caught by the hash
+    os.utime(art / 'a.png', ns=(5 * 10**9, 5 * 10**9))
+    (art / 'b.png').unlink()
+    assert verify().stale == {'a.png': 'modified', 'b.png': 'missing'}
+
+
+def test_changed_generator(tree):
+    module, _, verify = tree
+    _save(module, SOURCE.replace('return 2', 'return 3'), 2)
+    assert verify().stale == {'b.png': 'source changed: scratch_gen.gen_b'}
+
+
+def test_change_outside_generators_stales_module(tree):
+    module, _, verify = tree
+    _save(module, SOURCE + '\nSIZE = 32\n', 2)
+    stale = verify().stale
+    assert sorted(stale) == ['a.png', 'b.png']
+    assert stale['a.png'] == 'scratch_gen.py changed outside its generators: SIZE'
+
+
+def test_comment_edit_is_not_stale(tree):
+    module, _, verify = tree
+    _save(module, '# header\n' + SOURCE, 2)
+    assert verify().stale == {}
+
+
+def test_lock_round_trip(tree, tmp_path):
+    lock = lockfile.Lock(str(tmp_path / 'art.lock'))
+    assert lock.outputs['a.png']['deps'] == ['scratch_gen.gen_a']
+    (tmp_path / 'old.lock').write_text('{"version": 0}')
+    with pytest.raises(ValueError, match='lock version'):
+        lockfile.Lock(str(tmp_path / 'old.lock'))
+
+
+def test_unlocked_ids_and_files(tree):
+    _, art, verify = tree
+    (art / 'hand.png').write_bytes(b'drawn')
+    (art / 'atlas').mkdir()
+    (art / 'atlas' / 'page-0.png').write_bytes(b'build output')
+    report = verify(ids=('a', 'b', 'c'))
+    assert report.stale == {}
+    assert report.unlocked == {'c.png': 'registry id not in the lock', 'hand.png': 'file not in the lock'}
+
+
+def test_committed_files(tree, tmp_path):
+    module, art, verify = tree
+    (art / 'hand.png').write_bytes(b'drawn')
+    lock = lockfile.Lock(str(tmp_path / 'art.lock'))
+    assert lockfile.unlocked_files(lock.outputs, str(art)) == ['hand.png']
+    assert lock.record_committed('hand', ['hand.png'], str(art)) == ['hand.png']
+    lock.save()
+    assert verify(ids=('a', 'b', 'hand')) == lockfile.Report(3, {}, {})
+
+    # An overwrite is reported, and recording again keeps the old record
+    (art / 'hand.png').write_bytes(b'generated')
+    assert verify().stale == {'hand.png': 'modified'}
+    assert lock.record_committed('hand', ['hand.png'], str(art)) == []
+    assert lock.record_committed('hand', ['hand.png'], str(art), replace=True) == ['hand.png']
+    lock.save()
+    assert verify().stale == {}
+
+    # A source edit leaves records without a generator alone
+    _save(module, SOURCE.replace('return 2', 'return 3'), 2)
+    assert verify().stale == {'b.png': 'source changed: scratch_gen.gen_b'}
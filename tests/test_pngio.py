@@ -0,0 +1,64 @@
+"""
+PNG encoding round-trips (see tools/pngio.py): the parallel band writer
+and the Adler-32 combination its zlib trailer relies on.
+
+    python -m pytest -q tests/test_pngio.py
+"""
+
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import pngio  # noqa: E402
+
+
+@pytest.mark.parametrize('split', [0, 1, 5000, 65521, 70000, 100000])
+def test_adler32_combine_matches_zlib(split):
+    data = np.random.default_rng(split).integers(0, 256, 100000, dtype=np.uint8).tobytes()
+    a, b = data[:split], data[split:]
+    assert pngio.adler32_combine(zlib.adler32(a), zlib.adler32(b), len(b)) == zlib.adler32(data)
+
+
+def _image(h, w, seed=0):
+    rng = np.random.default_rng(seed)
+    # Runs of repeated colours, like sprite sheets, so bands reference earlier ones
+    rgba = rng.integers(0, 256, (h, w // 8, 4), dtype=np.uint8).repeat(8, axis=1)
+    rgba[::7, :, 3] = 0
+    return rgba
+
+
+@pytest.mark.parametrize('rows, workers', [(1, 1), (16, 4), (33, 3), (500, 2)])
+def test_stream_round_trip(tmp_path, rows, workers):
+    rgba = _image(100, 64)
+    path = tmp_path / 'out.png'
+    written = pngio.write_png_stream(str(path), 64, 100, pngio.iter_bands(rgba, rows),
+                                     workers=workers, max_pending=2)
+    data = path.read_bytes()
+    assert written == len(data)
+    assert np.array_equal(pngio.decode_png(data), rgba)
+    # zlib checks the combined Adler-32 trailer when it inflates the whole stream
+    idat = b''.join(body for kind, body in pngio._iter_chunks(data) if kind == b'IDAT')
+    raw = zlib.decompress(idat)
+    assert len(raw) == 100 * (64 * 4 + 1)
+
+
+def test_stream_palette_round_trip(tmp_path):
+    palette = np.array([(0, 0, 0, 0), (255, 0, 0, 255), (0, 128, 255, 200)], dtype=np.uint8)
+    index = np.random.default_rng(1).integers(0, 3, (40, 24), dtype=np.uint8)
+    path = tmp_path / 'pal.png'
+    pngio.write_png_stream(str(path), 24, 40, (index[y:y + 7] for y in range(0, 40, 7)),
+                           workers=2, palette=palette)
+    assert np.array_equal(pngio.read_png(str(path)), palette[index])
+
+
+def test_stream_rejects_wrong_height(tmp_path):
+    rgba = _image(10, 8)
+    with pytest.raises(ValueError, match='cover 10 rows'):
+        pngio.write_png_stream(str(tmp_path / 'a.png'), 8, 12, pngio.iter_bands(rgba, 4))
+    with pytest.raises(ValueError, match='exceed'):
+        pngio.write_png_stream(str(tmp_path / 'b.png'), 8, 6, pngio.iter_bands(rgba, 4))
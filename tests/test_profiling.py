@@ -0,0 +1,82 @@
+"""
+Write and overdraw counts of the generator profiler (see tools/profiling.py).
+
+    python -m pytest -q tests/test_profiling.py
+"""
+
+import os
+import sys
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import profiling  # noqa: E402
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def _module():
+    """A list-of-rows generator module: 4x4 fill, a 2x2 repaint, one pixel off canvas."""
+    module = types.ModuleType('scratch_gen')
+    source = '''
+SIZE = 4
+
+def new_canvas(w=SIZE, h=SIZE):
+    return [[(0, 0, 0, 0)] * w for _ in range(h)]
+
+def set_px(px, x, y, c):
+    if 0 <= x < len(px[0]) and 0 <= y < len(px):
+        px[y][x] = c
+
+def fill_rect(px, x, y, w, h, c):
+    for yy in range(y, y + h):
+        for xx in range(x, x + w):
+            set_px(px, xx, yy, c)
+
+def gen_box(bg, fg):
+    px = new_canvas()
+    fill_rect(px, 0, 0, 4, 4, bg)
+    fill_rect(px, 1, 1, 2, 2, fg)
+    set_px(px, 9, 9, fg)
+    return px
+'''
+    exec(compile(source, 'scratch_gen.py', 'exec'), vars(module))
+    return module
+
+
+def test_counting_canvas():
+    canvas = profiling.CountingCanvas(3, 2)
+    canvas.fill_rect(-1, 0, 3, 2, RED)
+    canvas.set_px(1, 1, BLUE)
+    canvas.set_px(5, 5, BLUE)
+    canvas[0][-1] = BLUE    # negative indices count against the right pixel
+    assert canvas.heat().tolist() == [[1, 1, 1], [1, 2, 0]]
+    assert canvas[1][1] == BLUE
+
+
+def test_profile_entry_counts():
+    module = _module()
+    gen = lambda: module.gen_box(RED, BLUE)  # noqa: E731
+    prof = profiling.profile_entry('box', module, gen)
+    assert prof.calls == {'fill_rect': 2, 'set_px': 21}
+    assert prof.writes == 20
+    assert prof.pixels == 16
+    assert prof.overwritten == 4
+    assert prof.overdraw == 20 / 16
+    expected = np.ones((4, 4), dtype=np.int32)
+    expected[1:3, 1:3] = 2
+    assert np.array_equal(prof.heat, expected)
+    assert tuple(prof.rgba[1, 1]) == BLUE and tuple(prof.rgba[0, 0]) == RED
+    # The module is handed back uninstrumented
+    assert type(module.new_canvas()) is list
+    assert module.set_px.__name__ == 'set_px'
+
+
+def test_uncounted_generator():
+    prof = profiling.profile_entry('flat', types.ModuleType('flat_gen'),
+                                   lambda: np.zeros((2, 2, 4), np.uint8), memory=True)
+    assert prof.writes is None and prof.overwritten is None and prof.overdraw is None
+    assert prof.peak_kib is not None
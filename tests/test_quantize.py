@@ -0,0 +1,70 @@
+"""
+Palette quantization (see tools/quantize.py).
+
+    python -m pytest -q tests/test_quantize.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import quantize  # noqa: E402
+
+
+def _gradient(h=64, w=64):
+    y, x = np.mgrid[0:h, 0:w]
+    rgba = np.stack([x * 4, y * 4, (x + y) * 2, np.full_like(x, 255)], axis=-1).astype(np.uint8)
+    rgba[:4] = 0    # a transparent band
+    return rgba
+
+
+def test_few_colours_are_lossless():
+    colors = np.array([(10, 20, 30, 255), (200, 100, 0, 128), (0, 0, 0, 0)], dtype=np.uint8)
+    rgba = colors[np.random.default_rng(0).integers(0, 3, (16, 16))]
+    index, palette = quantize.quantize(rgba)
+    assert len(palette) == 3
+    assert tuple(palette[0]) == (0, 0, 0, 0)
+    assert np.array_equal(palette[index], rgba)
+
+
+@pytest.mark.parametrize('dither', [False, True])
+def test_reduces_to_palette_size(dither):
+    rgba = _gradient()
+    index, palette = quantize.quantize(rgba, colors=16, dither=dither)
+    assert index.shape == rgba.shape[:2] and index.dtype == np.uint8
+    assert len(palette) <= 16 and int(index.max()) < len(palette)
+    out = palette[index]
+    # Transparent pixels map to entry 0 and only there
+    assert np.all(index[rgba[..., 3] == 0] == 0)
+    assert np.all(index[rgba[..., 3] > 0] > 0)
+    assert quantize.psnr(rgba, out) > 25
+
+
+def test_more_colours_is_closer():
+    rgba = _gradient()
+    scores = [quantize.psnr(rgba, p[i]) for i, p in (quantize.quantize(rgba, colors=n) for n in (4, 32, 128))]
+    assert scores == sorted(scores)
+
+
+def test_deterministic():
+    rgba = _gradient()
+    a = quantize.quantize(rgba, colors=32, dither=True)
+    b = quantize.quantize(rgba, colors=32, dither=True)
+    assert all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def test_colour_count_is_checked():
+    with pytest.raises(ValueError):
+        quantize.quantize(_gradient(), colors=1)
+    with pytest.raises(ValueError):
+        quantize.quantize(_gradient(), colors=257)
+
+
+def test_psnr():
+    a = np.zeros((4, 4, 4), np.uint8)
+    assert quantize.psnr(a, a) == float('inf')
+    assert quantize.psnr(a, a + 1) == pytest.approx(10 * np.log10(255 ** 2))
@@ -0,0 +1,107 @@
+"""
+Output sinks (see tools/sinks.py): atomic replacement, unchanged files
+left alone, reproducible archives and no temporary files after errors.
+
+    python -m pytest -q tests/test_sinks.py
+"""
+
+import os
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import sinks  # noqa: E402
+
+FILES = {'a.png': b'\x89PNG first', 'sub/b.png': b'\x89PNG second', 'sub/deep/c.png': b'c' * 5000}
+
+
+def _write(sink, files=FILES):
+    with sink:
+        for name, data in files.items():
+            sink.put(name, data)
+    return sink
+
+
+def _leftovers(root):
+    return [os.path.join(d, f) for d, _, fs in os.walk(root) for f in fs if f.endswith('.tmp')]
+
+
+def test_replace_file(tmp_path):
+    path = str(tmp_path / 'x' / 'y.png')
+    assert sinks.replace_file(path, b'one')
+    os.utime(path, ns=(10**9, 10**9))
+    assert not sinks.replace_file(path, b'one')
+    assert os.stat(path).st_mtime_ns == 10**9
+    assert sinks.replace_file(path, b'two')
+    assert open(path, 'rb').read() == b'two'
+    assert _leftovers(tmp_path) == []
+
+
+def test_directory_sink_writes_only_changes(tmp_path):
+    sink = _write(sinks.DirectorySink(str(tmp_path)))
+    assert sorted(sink.changed) == sorted(FILES)
+    assert (tmp_path / 'sub' / 'deep' / 'c.png').read_bytes() == FILES['sub/deep/c.png']
+
+    sink = _write(sinks.DirectorySink(str(tmp_path)), dict(FILES, **{'a.png': b'new'}))
+    assert sink.changed == ['a.png']
+    assert _leftovers(tmp_path) == []
+
+
+@pytest.mark.parametrize('ext', ['zip', 'tar'])
+def test_archive_is_reproducible(tmp_path, ext):
+    first = tmp_path / f'one.{ext}'
+    second = tmp_path / f'two.{ext}'
+    _write(sinks.ArchiveSink(str(first)))
+    _write(sinks.ArchiveSink(str(second)))
+    assert first.read_bytes() == second.read_bytes()
+
+    sink = _write(sinks.ArchiveSink(str(first)))
+    assert sink.changed == []
+    if ext == 'zip':
+        with zipfile.ZipFile(first) as z:
+            assert {n: z.read(n) for n in z.namelist()} == FILES
+    else:
+        with tarfile.open(first) as t:
+            assert {m.name: t.extractfile(m).read() for m in t.getmembers()} == FILES
+    assert _leftovers(tmp_path) == []
+
+
+@pytest.mark.parametrize('ext', ['zip', 'tar'])
+def test_archive_error_leaves_no_temp_file(tmp_path, ext):
+    path = tmp_path / f'out.{ext}'
+    path.write_bytes(b'previous')
+    with pytest.raises(KeyError):
+        with sinks.ArchiveSink(str(path)) as sink:
+            sink.put('a.png', b'a')
+            raise KeyError('render failed')
+    assert path.read_bytes() == b'previous'
+    assert _leftovers(tmp_path) == []
+
+
+def test_archive_write_error_leaves_no_temp_file(tmp_path):
+    sink = sinks.ArchiveSink(str(tmp_path / 'out.zip'))
+    sink._archive.close()       # every later write fails on the writer thread
+    sink.put('a.png', b'a')
+    with pytest.raises(ValueError):
+        sink.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_content_store_dedupes(tmp_path):
+    sink = _write(sinks.ContentStore(str(tmp_path)), {'a.png': b'same', 'b.png': b'same'})
+    assert sorted(sink.changed) == ['a.png', 'b.png']
+    assert len(os.listdir(tmp_path / 'objects')) == 1
+    assert _write(sinks.ContentStore(str(tmp_path)), {'a.png': b'same'}).changed == []
+
+
+def test_open_sink(tmp_path):
+    for spec, kind in [(f'{tmp_path}/a.tar', sinks.ArchiveSink), (f'cas:{tmp_path}/cas', sinks.ContentStore),
+                       (str(tmp_path / 'dir'), sinks.DirectorySink)]:
+        with sinks.open_sink(spec) as sink:
+            assert type(sink) is kind
+    with pytest.raises(ValueError, match='needs a path ending in .zip'):
+        sinks.open_sink('zip:out.tar')
@@ -0,0 +1,86 @@
+"""
+Watch mode survives a generator file that is briefly invalid mid-edit
+(see tools/watch.py).
+
+    python -m pytest -q tests/test_watch.py
+"""
+
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import depgraph  # noqa: E402
+import watch     # noqa: E402
+
+
+def _save(path, source, tick):
+    path.write_text(source)
+    # Distinct mtimes even on filesystems with coarse timestamps
+    os.utime(path, ns=(tick * 10**9, tick * 10**9))
+
+
+def test_broken_save_is_reported_and_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(depgraph, 'TOOLS_DIR', str(tmp_path))
+    module = tmp_path / 'scratch_gen.py'
+    _save(module, 'def f():\n    return 1\n', 1)
+    logs = []
+    watcher = watch.Watcher(modules=(), log=logs.append)
+    try:
+        before = dict(watcher._hashes['scratch_gen'])
+
+        _save(module, 'def f(:\n    return 1\n', 2)
+        assert watcher.poll() == ['scratch_gen']
+        assert watcher.update(['scratch_gen']) == []
+        assert any('scratch_gen: SyntaxError' in line for line in logs)
+        assert watcher._hashes['scratch_gen'] == before
+
+        # Still broken: retried on the next poll without a new save, reported once
+        reported = len(logs)
+        assert watcher.poll() == ['scratch_gen']
+        watcher.update(['scratch_gen'])
+        assert len(logs) == reported
+
+        _save(module, 'def f():\n    return 2\n', 3)
+        assert watcher.poll() == ['scratch_gen']
+        watcher.update(['scratch_gen'])
+        assert watcher._hashes['scratch_gen'] != before
+        assert watcher.poll() == []
+    finally:
+        watcher.sink.close()
+
+
+def test_shared_edit_keeps_hand_drawn_strips(tmp_path, monkeypatch):
+    import atlas
+    import registry
+    import gen_enemy_sprites
+
+    monkeypatch.setattr(atlas, 'ART_DIR', str(tmp_path))
+    path = gen_enemy_sprites.__file__
+    with open(path) as f:
+        source = f.read()
+    st = os.stat(path)
+    committed = {i: open(os.path.join(registry.ART_DIR, f'{i}.png'), 'rb').read()
+                 for i in registry.HAND_DRAWN}
+    watcher = watch.Watcher(modules=('gen_enemy_sprites',), log=lambda line: None)
+    try:
+        # A no-op statement in darken() re-keys every enemy that draws through it
+        edited = source.replace('def darken(c, f=0.65):\n', 'def darken(c, f=0.65):\n    pass\n', 1)
+        assert edited != source
+        with open(path, 'w') as f:
+            f.write(edited)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        written = watcher.update(watcher.poll())
+        assert 'enemies/greyling.png' in written
+        assert not {f'{i}.png' for i in registry.HAND_DRAWN} & set(written)
+        assert not (tmp_path / 'enemies' / 'boar.png').exists()
+    finally:
+        watcher.sink.close()
+        with open(path, 'w') as f:
+            f.write(source)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        importlib.reload(gen_enemy_sprites)
+    for i, data in committed.items():
+        with open(os.path.join(registry.ART_DIR, f'{i}.png'), 'rb') as f:
+            assert f.read() == data, i
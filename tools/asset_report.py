@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Asset budget report: what tileArt/ costs a client, per sprite category.
+
+Only PNG headers are read (decoded size is width * height * 4), so the
+report stays cheap enough to run after every build. Besides the atlas
+sprites it counts the prebaked skill state icons, which the client also
+downloads (SkillSprites.js), and the variant strips under tileArt/variants/.
+Nothing in client/ fetches the variant strips; they are atlas input only,
+so they are listed below the total and left out of it and of the largest
+files.
+"""
+
+import json
+import os
+import re
+import subprocess
+
+from atlas import ART_DIR, ATLAS_DIR, MANIFEST, VARIANTS, load_manifest, scan_sprites, scan_variants
+from pngio import read_header
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+ENEMY_SPRITES_JS = os.path.join(ROOT_DIR, 'client', 'entities', 'EnemySprites.js')
+
+REPORT_CATEGORIES = ('items', 'enemies', 'skills', 'skills/disabled', 'skills/cooldown', 'resources',
+                     'stations', 'npcs', 'ui', 'sorting', 'terrain', 'player', VARIANTS)
+
+# Sprite subdirectories scan_sprites() does not descend into (gen_skill_icons.py)
+STATE_DIRS = ('skills/disabled', 'skills/cooldown')
+
+# Categories packed into atlas pages only; the client never fetches their files
+ATLAS_ONLY = (VARIANTS,)
+
+
+# ── Referenced ids ─────────────────────────────────────────────────────
+
+def item_ids():
+    """Keys of shared/ItemTypes.js ITEM_DB, evaluated by node (cut gems are generated)."""
+    script = ("const { ITEM_DB } = await import('./shared/ItemTypes.js');"
+              "console.log(JSON.stringify(Object.keys(ITEM_DB)));")
+    out = subprocess.run(['node', '--input-type=module', '-e', script], cwd=ROOT_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def enemy_ids():
+    """The ENEMY_IDS list literal in client/entities/EnemySprites.js."""
+    with open(ENEMY_SPRITES_JS) as f:
+        src = f.read()
+    body = re.search(r'const ENEMY_IDS = \[(.*?)\];', src, re.S).group(1)
+    return re.findall(r"'([^']+)'", body)
+
+
+# ── Report ─────────────────────────────────────────────────────────────
+
+def scan_files(root=ART_DIR):
+    """scan_sprites() plus variant strips and skill state icons, as (key, category, path)."""
+    found = scan_sprites(root)
+    found += [(f'{VARIANTS}/{key}', VARIANTS, path) for key, path in scan_variants(root).items()]
+    for sub in STATE_DIRS:
+        state_dir = os.path.join(root, *sub.split('/'))
+        if os.path.isdir(state_dir):
+            found += [(f'{sub}/{name[:-4]}', sub, os.path.join(state_dir, name))
+                      for name in os.listdir(state_dir) if name.endswith('.png')]
+    found.sort()
+    return found
+
+
+def build_report(root=ART_DIR, atlas_dir=ATLAS_DIR, check_refs=True):
+    """Collect per-category totals, per-file sizes and missing referenced ids."""
+    files = []
+    for key, cat, path in scan_files(root):
+        w, h, _, _ = read_header(path)
+        files.append({'key': key, 'category': cat, 'bytes': os.path.getsize(path),
+                      'w': w, 'h': h, 'decoded': w * h * 4})
+
+    categories = {}
+    for f in files:
+        c = categories.setdefault(f['category'], {'files': 0, 'bytes': 0, 'decoded': 0})
+        c['files'] += 1
+        c['bytes'] += f['bytes']
+        c['decoded'] += f['decoded']
+
+    report = {'categories': categories, 'files': files, 'missing': {}}
+
+    manifest = load_manifest(atlas_dir) if os.path.exists(os.path.join(atlas_dir, MANIFEST)) else None
+    if manifest:
+        report['atlas'] = {
+            'files': len(manifest['pages']),
+            'bytes': sum(p['bytes'] for p in manifest['pages']),
+            'decoded': sum(p['w'] * p['h'] * 4 for p in manifest['pages']),
+        }
+
+    if check_refs:
+        have = {f['key'] for f in files}
+        report['missing'] = {
+            'items': [i for i in item_ids() if f'items/{i}' not in have],
+            'enemies': [e for e in enemy_ids() if f'enemies/{e}' not in have],
+        }
+    return report
+
+
+def _kb(n):
+    return f'{n / 1024:.1f}'
+
+
+def format_report(report, top=10):
+    lines = [f"{'category':<16} {'files':>6} {'wire KB':>9} {'decoded KB':>11}"]
+    total = {'files': 0, 'bytes': 0, 'decoded': 0}
+    cats = report['categories']
+    order = [c for c in REPORT_CATEGORIES if c in cats] + sorted(set(cats) - set(REPORT_CATEGORIES))
+    for cat in [c for c in order if c not in ATLAS_ONLY]:
+        c = cats[cat]
+        lines.append(f"{cat:<16} {c['files']:>6} {_kb(c['bytes']):>9} {_kb(c['decoded']):>11}")
+        for k in total:
+            total[k] += c[k]
+    lines.append(f"{'total':<16} {total['files']:>6} {_kb(total['bytes']):>9} {_kb(total['decoded']):>11}")
+    for cat in [c for c in order if c in ATLAS_ONLY]:
+        c = cats[cat]
+        lines.append(f"{cat:<16} {c['files']:>6} {_kb(c['bytes']):>9} {_kb(c['decoded']):>11}"
+                     f"  (atlas input only, not fetched)")
+
+    if 'atlas' in report:
+        a = report['atlas']
+        lines.append(f"{'atlas':<16} {a['files']:>6} {_kb(a['bytes']):>9} {_kb(a['decoded']):>11}"
+                     f"  ({total['files']} requests -> {a['files']})")
+
+    if top:
+        lines.append('')
+        lines.append(f'Largest {top} files (wire bytes):')
+        fetched = [f for f in report['files'] if f['category'] not in ATLAS_ONLY]
+        for f in sorted(fetched, key=lambda f: (-f['bytes'], f['key']))[:top]:
+            lines.append(f"  {f['key'] + '.png':<36} {_kb(f['bytes']):>7} KB  "
+                         f"({f['w']}x{f['h']}, {_kb(f['decoded'])} KB decoded)")
+
+    for kind, ids in report['missing'].items():
+        if ids:
+            lines.append('')
+            lines.append(f'Missing {kind} sprites ({len(ids)}):')
+            lines.append('  ' + ', '.join(ids))
+    return '\n'.join(lines)
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Atlas stage: trim the generated tileArt/ sprites to their opaque bounds and
+pack them into shared atlas pages with a JSON manifest.
+
+Sprite keys are paths relative to tileArt/ without the extension, so
+'items/stick' is the sprite the client loads from /tileArt/items/stick.png.
+Each manifest entry records where the trimmed pixels live on the page and
+the untrimmed source size plus offset, so a sprite drawn at (dx, dy) with
+size (dw, dh) is blitted to:
+
+    dx + offsetX * dw / sourceW,  dy + offsetY * dh / sourceH
+    w * dw / sourceW,             h * dh / sourceH
+
+which lands every opaque pixel exactly where the untrimmed sprite had it.
+
+Pages are packed per load bundle (critical, common, one per biome) and
+named after a hash of their inputs ('meadow-<hash>-0.png'), so the server
+can cache them as immutable and a deploy only changes the URLs of bundles
+whose sprites changed. The manifest's 'loadOrder' says which bundles a
+client should fetch first.
+
+Every enemy also gets elite/boss/corrupted recolours packed next to it as
+'enemies/<id>@<variant>'; the base entry lists them under 'variants'.
+
+Seeded texture variants (gen_tile_variants.py, gen_resource_sprites.py
+--variants) live in tileArt/variants/<key>.png as a strip of square
+frames. Frame i becomes the sprite '<key>#<i + 1>' and the base entry gets
+'variantCount' (including itself as variant 0).
+
+Sprites whose trimmed pixels are identical (dedup.py) share one slot:
+every key keeps its own entry, and the copies name the key that owns the
+pixels in 'sameAs'.
+
+With `sprites` (build_assets.py atlas --from-generators) the atlas is
+packed straight from registry.render() output instead of the PNGs under
+tileArt/: nothing is written or read back in between.
+
+With `quantize` (build_assets.py atlas --quantize) every page is reduced
+to one shared palette of up to 256 RGBA colours (quantize.py) and written
+as a palette PNG; the page records its colour count and PSNR.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from build_cache import BuildCache
+from bundles import BIOME_DIR, COMMON, CRITICAL, plan_bundles
+from dedup import pixel_digest
+from pngio import decode_png, iter_bands, read_png, write_png_stream
+from quantize import psnr, quantize as quantize_page
+from variants import ENEMY_VARIANTS, recolour_strips
+
+ART_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tileArt')
+ATLAS_DIR = os.path.join(ART_DIR, 'atlas')
+
+# Sub-directories of tileArt/ that hold one sprite category each.
+# Loose PNGs at the top level are the autotile terrain textures.
+CATEGORIES = ('items', 'enemies', 'skills', 'resources', 'stations', 'npcs', 'ui', 'sorting')
+ROOT_CATEGORIES = {'player': 'player'}
+VARIANTS = 'variants'  # tileArt/variants/<key>.png: extra seeded variants of <key>
+
+FRAME_SIZE = 32       # enemy sheets are horizontal strips of 32x32 frames
+PAGE_SIZE = 1024
+PADDING = 1
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 4
+CACHE_FILE = '.build-cache.json'
+ATLAS_URL = '/tileArt/atlas'
+ATLAS_FORMAT = 2      # bump when trimming/packing changes the pixels on a page
+
+
+# ── Discovery ──────────────────────────────────────────────────────────
+
+def category_of(key):
+    if '/' in key:
+        return key.split('/', 1)[0]
+    return ROOT_CATEGORIES.get(key, 'terrain')
+
+
+def scan_sprites(root=ART_DIR):
+    """List (key, category, path) for every generated PNG, sorted by key."""
+    found = []
+    for name in os.listdir(root):
+        if name.endswith('.png'):
+            key = name[:-4]
+            found.append((key, category_of(key), os.path.join(root, name)))
+    for cat in CATEGORIES:
+        cat_dir = os.path.join(root, cat)
+        if not os.path.isdir(cat_dir):
+            continue
+        for name in os.listdir(cat_dir):
+            if name.endswith('.png'):
+                key = f'{cat}/{name[:-4]}'
+                found.append((key, cat, os.path.join(cat_dir, name)))
+    found.sort()
+    return found
+
+
+def scan_variants(root=ART_DIR):
+    """{base key: strip path} for every tileArt/variants/<key>.png, sorted by key."""
+    found = {}
+    variant_root = os.path.join(root, VARIANTS)
+    if not os.path.isdir(variant_root):
+        return found
+    for dirpath, _, names in os.walk(variant_root):
+        rel = os.path.relpath(dirpath, variant_root).replace(os.sep, '/')
+        for name in names:
+            if name.endswith('.png'):
+                key = name[:-4] if rel == '.' else f'{rel}/{name[:-4]}'
+                found[key] = os.path.join(dirpath, name)
+    return dict(sorted(found.items()))
+
+
+def collect_sprites(sprites):
+    """scan_sprites() and scan_variants() for in-memory sprites.
+
+    `sprites` yields (key, width, height, data) as registry.render() does,
+    data being an RGBA array or PNG bytes; both take the place of the path.
+    Keys scan_sprites() would not find (skill state sheets) are dropped.
+    """
+    found = []
+    variants = {}
+    for key, _, _, data in sprites:
+        parts = key.split('/')
+        if parts[0] == VARIANTS:
+            variants[key[len(VARIANTS) + 1:]] = data
+        elif len(parts) == 1 or (len(parts) == 2 and parts[0] in CATEGORIES):
+            found.append((key, category_of(key), data))
+    found.sort(key=lambda f: f[0])
+    return found, dict(sorted(variants.items()))
+
+
+def _source_digest(cache, source):
+    """sha1 of a path's bytes (by stat through the cache), PNG bytes or pixels."""
+    if isinstance(source, str):
+        return cache.digest(source)
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha1(source).hexdigest()
+    return pixel_digest(source)
+
+
+def _load(source):
+    if isinstance(source, str):
+        return read_png(source)
+    if isinstance(source, (bytes, bytearray)):
+        return decode_png(bytes(source))
+    return source
+
+
+def frame_count(key, width, height):
+    """Enemy sprites wider than one frame are animation strips."""
+    if category_of(key) == 'enemies' and height == FRAME_SIZE and width > FRAME_SIZE \
+            and width % FRAME_SIZE == 0:
+        return width // FRAME_SIZE
+    return 1
+
+
+# ── Trimming ───────────────────────────────────────────────────────────
+
+def trim_bbox(rgba, frames=1):
+    """Tight opaque bbox (x, y, w, h) of an RGBA array.
+
+    For animation strips the box is the union over all frames, so every
+    frame keeps the same trimmed size and offset. A fully transparent
+    sprite yields a zero-sized box.
+    """
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3].reshape(h, frames, w // frames).transpose(1, 0, 2) != 0
+    rows = alpha.any(axis=(0, 2))
+    cols = alpha.any(axis=(0, 1))
+    if not rows.any():
+        return 0, 0, 0, 0
+    ys = np.flatnonzero(rows)
+    xs = np.flatnonzero(cols)
+    return int(xs[0]), int(ys[0]), int(xs[-1] - xs[0] + 1), int(ys[-1] - ys[0] + 1)
+
+
+def trim(rgba, frames=1):
+    """Return (trimmed strip, bbox). Frames stay side by side, each cropped to bbox."""
+    x, y, w, h = bbox = trim_bbox(rgba, frames)
+    fw = rgba.shape[1] // frames
+    strip = np.concatenate([rgba[y:y + h, f * fw + x:f * fw + x + w] for f in range(frames)],
+                           axis=1)
+    return strip, bbox
+
+
+# ── Packing ────────────────────────────────────────────────────────────
+
+def pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    """Shelf-pack (key, w, h) rectangles, tallest first.
+
+    Returns ({key: (page, x, y)}, [(page_w, page_h), ...]). Pages are
+    cropped to the area actually used.
+    """
+    order = sorted(sizes, key=lambda s: (-s[2], -s[1], s[0]))
+    placements = {}
+    pages = []
+    x = y = shelf_h = 0
+    used_w = used_h = 0
+
+    def close_page():
+        pages.append((used_w, used_h))
+
+    for key, w, h in order:
+        if w + padding > page_size or h + padding > page_size:
+            raise ValueError(f'{key}: {w}x{h} does not fit a {page_size}px atlas page')
+        if x + w + padding > page_size:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + h + padding > page_size:
+            close_page()
+            x = y = shelf_h = used_w = used_h = 0
+        placements[key] = (len(pages), x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h + padding)
+        used_w = max(used_w, x)
+        used_h = max(used_h, y + h + padding)
+    if placements:
+        close_page()
+    return placements, pages
+
+
+# ── Build ──────────────────────────────────────────────────────────────
+
+def bundle_hash(members, page_size, padding, quantize=None):
+    """Digest of everything that determines a bundle's pages."""
+    h = hashlib.sha1(json.dumps([ATLAS_FORMAT, ENEMY_VARIANTS, page_size, padding, quantize,
+                                 [(key, digest) for key, _, _, digest in members]]).encode())
+    return h.hexdigest()[:12]
+
+
+def load_manifest(out_dir=ATLAS_DIR):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _reuse_bundle(previous, bundle, bhash, members, out_dir):
+    """Pages and entries from the last build if the bundle's inputs are unchanged."""
+    if not previous or previous.get('version') != MANIFEST_VERSION:
+        return None
+    old_pages = [(i, p) for i, p in enumerate(previous['pages']) if p['bundle'] == bundle]
+    if not old_pages or any(p['hash'] != bhash for _, p in old_pages):
+        return None
+    if not all(os.path.exists(os.path.join(out_dir, p['file'])) for _, p in old_pages):
+        return None
+    remap = {old: new for new, (old, _) in enumerate(old_pages)}
+    # Derived entries (recolours, variants) belong to the bundle too
+    entries = {k: dict(e) for k, e in previous['sprites'].items() if e['bundle'] == bundle}
+    if any(key not in entries for key, cat, _, _ in members if cat != VARIANTS):
+        return None
+    for entry in entries.values():
+        if 'page' in entry:
+            entry['page'] = remap[entry['page']]
+    return [p for _, p in old_pages], entries
+
+
+def _add_enemy_variants(sprites, entries):
+    """Add '<key>@<variant>' recolours of every enemy strip (see variants.py)."""
+    keys = [k for k, e in entries.items() if e['category'] == 'enemies' and sprites[k].size]
+    recoloured = recolour_strips([sprites[k] for k in keys])
+    for variant, strips in recoloured.items():
+        for key, strip in zip(keys, strips):
+            vkey = f'{key}@{variant}'
+            entry = {k: v for k, v in entries[key].items() if k != 'variants'}
+            entry.update(variantOf=key, variant=variant)
+            entries[vkey] = entry
+            sprites[vkey] = strip
+    for key in keys:
+        entries[key]['variants'] = {v: f'{key}@{v}' for v in recoloured}
+
+
+def _add_texture_variants(key, rgba, bundle, digest, sprites, entries):
+    """Split a tileArt/variants strip into '<key>#<i>' entries, one per square frame."""
+    size = rgba.shape[0]
+    for i in range(rgba.shape[1] // size):
+        strip, (ox, oy, tw, th) = trim(rgba[:, i * size:(i + 1) * size])
+        vkey = f'{key}#{i + 1}'
+        entries[vkey] = {
+            'category': category_of(key),
+            'bundle': bundle,
+            'hash': digest[:12],
+            'w': tw, 'h': th,
+            'sourceW': size, 'sourceH': size,
+            'offsetX': ox, 'offsetY': oy,
+            'variantOf': key, 'variant': i + 1,
+        }
+        sprites[vkey] = strip
+
+
+def _write_page(path, canvas, quantize):
+    """Write one page, RGBA or palette-quantized. Returns its manifest fields."""
+    h, w = canvas.shape[:2]
+    if not quantize:
+        return {'bytes': write_png_stream(path, w, h, iter_bands(canvas))}
+    index, palette = quantize_page(canvas, **quantize)
+    score = psnr(canvas, palette[index])
+    nbytes = write_png_stream(path, w, h, iter_bands(index), palette=palette)
+    # An exact palette has infinite PSNR, which JSON cannot hold
+    return {'bytes': nbytes, 'colors': len(palette),
+            'psnr': None if score == float('inf') else round(score, 2)}
+
+
+def _build_bundle(bundle, bhash, members, out_dir, page_size, padding, quantize=None):
+    sprites = {}
+    entries = {}
+    for key, cat, source, digest in members:
+        rgba = _load(source)
+        if cat == VARIANTS:
+            _add_texture_variants(key[len(VARIANTS) + 1:], rgba, bundle, digest, sprites, entries)
+            continue
+        h, w = rgba.shape[:2]
+        frames = frame_count(key, w, h)
+        strip, (ox, oy, tw, th) = trim(rgba, frames)
+        entry = {
+            'category': cat,
+            'bundle': bundle,
+            'hash': digest[:12],
+            'w': tw, 'h': th,
+            'sourceW': w // frames, 'sourceH': h,
+            'offsetX': ox, 'offsetY': oy,
+        }
+        if frames > 1:
+            entry['frames'] = frames
+        entries[key] = entry
+        sprites[key] = strip
+    _add_enemy_variants(sprites, entries)
+
+    # Identical strips are packed once; the first key in sort order owns the slot
+    owner = {}
+    shared = {}
+    for key in sorted(sprites):
+        if sprites[key].size:
+            first = owner.setdefault(pixel_digest(sprites[key]), key)
+            if first != key:
+                shared[key] = first
+
+    sizes = [(k, s.shape[1], s.shape[0]) for k, s in sprites.items() if s.size and k not in shared]
+    placements, page_sizes = pack(sizes, page_size, padding)
+
+    canvases = [np.zeros((ph, pw, 4), dtype=np.uint8) for pw, ph in page_sizes]
+    for key, (page, x, y) in placements.items():
+        strip = sprites[key]
+        canvases[page][y:y + strip.shape[0], x:x + strip.shape[1]] = strip
+        entries[key].update(page=page, x=x, y=y)
+    for key, first in shared.items():
+        entries[key].update(page=entries[first]['page'], x=entries[first]['x'],
+                            y=entries[first]['y'], sameAs=first)
+
+    pages = []
+    for i, canvas in enumerate(canvases):
+        name = f'{bundle}-{bhash}-{i}.png'
+        page = {'file': name, 'url': f'{ATLAS_URL}/{name}', 'bundle': bundle,
+                'hash': bhash, 'w': canvas.shape[1], 'h': canvas.shape[0]}
+        page.update(_write_page(os.path.join(out_dir, name), canvas, quantize))
+        pages.append(page)
+    return pages, entries
+
+
+def build_atlas(root=ART_DIR, out_dir=ATLAS_DIR, page_size=PAGE_SIZE, padding=PADDING,
+                biome_dir=BIOME_DIR, quantize=None, sprites=None):
+    """Trim and pack every sprite under root. Writes pages + manifest.json.
+
+    Each load bundle (see bundles.py) gets its own pages. Page files are
+    named after the hash of their inputs, so they can be served as
+    immutable. Bundles whose inputs are unchanged since the last build keep
+    their pages (and URLs) without being decoded again.
+
+    `quantize` is None (RGBA pages) or quantize.quantize() keyword
+    arguments, e.g. {'colors': 256, 'dither': False}.
+
+    `sprites` replaces the scan of root with (key, width, height, data)
+    tuples, e.g. registry.render(); see collect_sprites().
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    cache = BuildCache(os.path.join(out_dir, CACHE_FILE))
+    previous = load_manifest(out_dir)
+
+    if sprites is None:
+        found, variants = scan_sprites(root), scan_variants(root)
+    else:
+        found, variants = collect_sprites(sprites)
+    assign, bundles, load_order = plan_bundles([(key, cat) for key, cat, _ in found], biome_dir)
+    # Variant strips travel with their base sprite, except that the first
+    # frame only needs the base: critical sprites' variants load with common
+    for base, source in variants.items():
+        if base in assign:
+            key = f'{VARIANTS}/{base}'
+            assign[key] = COMMON if assign[base] == CRITICAL else assign[base]
+            found.append((key, VARIANTS, source))
+    by_bundle = {}
+    for key, cat, source in found:
+        by_bundle.setdefault(assign[key], []).append((key, cat, source,
+                                                      _source_digest(cache, source)))
+
+    pages = []
+    entries = {}
+    rebuilt = []
+    for bundle in sorted(by_bundle):
+        members = by_bundle[bundle]
+        bhash = bundle_hash(members, page_size, padding, quantize)
+        result = _reuse_bundle(previous, bundle, bhash, members, out_dir)
+        if result is None:
+            result = _build_bundle(bundle, bhash, members, out_dir, page_size, padding, quantize)
+            rebuilt.append(bundle)
+        bundle_pages, bundle_entries = result
+        for entry in bundle_entries.values():
+            if 'page' in entry:
+                entry['page'] += len(pages)
+        pages.extend(bundle_pages)
+        entries.update(bundle_entries)
+
+    # Variant strips may sit in another bundle than their base sprite
+    for entry in entries.values():
+        entry.pop('variantCount', None)
+    for entry in entries.values():
+        if isinstance(entry.get('variant'), int):
+            base = entries[entry['variantOf']]
+            base['variantCount'] = max(base.get('variantCount', 1), entry['variant'] + 1)
+
+    keep = {p['file'] for p in pages}
+    for name in os.listdir(out_dir):
+        if name.endswith('.png') and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+
+    for name, bundle in bundles.items():
+        bundle['pages'] = [i for i, p in enumerate(pages) if p['bundle'] == name]
+    manifest = {'version': MANIFEST_VERSION, 'pages': pages, 'sprites': entries,
+                'bundles': bundles, 'loadOrder': load_order}
+    tmp = os.path.join(out_dir, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    cache.save()
+    return manifest, rebuilt
+
+
+def trim_stats(manifest):
+    """(source_area, trimmed_area) summed over all sprites and frames."""
+    src = trimmed = 0
+    for e in manifest['sprites'].values():
+        n = e.get('frames', 1)
+        src += e['sourceW'] * e['sourceH'] * n
+        trimmed += e['w'] * e['h'] * n
+    return src, trimmed
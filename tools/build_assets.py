@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Asset pipeline driver for the generated sprites in tileArt/.
+
+Run the gen_*.py scripts first, then:
+
+    python tools/build_assets.py atlas       # trim + pack into tileArt/atlas/
+    python tools/build_assets.py report      # per-category size budget
+    python tools/build_assets.py ops         # record/optimize/replay draw ops
+    python tools/build_assets.py map         # overview PNG of the saved world
+    python tools/build_assets.py dedup       # identical and near-identical sprites
+    python tools/build_assets.py watch       # re-render sprites as generators are edited
+    python tools/build_assets.py render ID   # regenerate single sprites by id
+    python tools/build_assets.py render '*' --sink tileArt.tar   # or .zip, cas:DIR
+    python tools/build_assets.py verify      # tileArt/ against tileArt.lock, no generators run
+    python tools/build_assets.py index       # list the generator registry index
+    python tools/build_assets.py profile     # time, primitive calls and overdraw per sprite
+
+Needs NumPy 2 (pip install -r tools/requirements.txt); the pycairo
+generators are optional.
+
+Stages are imported when their subcommand runs, so `render items/stick`
+loads NumPy and gen_item_icons and nothing else (see registry.py).
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+
+import registry
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+asset_report = lazy_import('asset_report')
+atlas = lazy_import('atlas')
+dedup = lazy_import('dedup')
+lockfile = lazy_import('lockfile')
+drawops = lazy_import('drawops')
+pngio = lazy_import('pngio')
+postfx = lazy_import('postfx')
+profiling = lazy_import('profiling')
+sinks = lazy_import('sinks')
+watch = lazy_import('watch')
+world_map = lazy_import('world_map')
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+def cmd_atlas(args):
+    quantize = {'colors': args.colors, 'dither': args.dither} if args.quantize else None
+    sprites = registry.render(png=args.png) if args.from_generators else None
+    manifest, rebuilt = atlas.build_atlas(_or(args.root, atlas.ART_DIR), _or(args.out, atlas.ATLAS_DIR),
+                                          _or(args.page_size, atlas.PAGE_SIZE),
+                                          _or(args.padding, atlas.PADDING), quantize=quantize,
+                                          sprites=sprites)
+    for page in manifest['pages']:
+        state = 'rebuilt' if page['bundle'] in rebuilt else 'unchanged'
+        extra = ''
+        if 'colors' in page:
+            quality = 'lossless' if page['psnr'] is None else f"PSNR {page['psnr']:.1f} dB"
+            extra = f", {page['colors']} colours, {quality}"
+        print(f"  {page['file']} ({page['w']}x{page['h']}, {page['bytes']} bytes{extra}, {state})")
+    src, trimmed = atlas.trim_stats(manifest)
+    saved = 100.0 * (src - trimmed) / src if src else 0.0
+    print(f"\nPacked {len(manifest['sprites'])} sprites into {len(manifest['pages'])} "
+          f"atlas pages in {os.path.abspath(_or(args.out, atlas.ATLAS_DIR))} (trim saved {saved:.1f}% of sprite area)")
+    print('Load order: ' + ' -> '.join(', '.join(tier) for tier in manifest['loadOrder']))
+
+
+def cmd_report(args):
+    report = asset_report.build_report(_or(args.root, atlas.ART_DIR), _or(args.atlas, atlas.ATLAS_DIR),
+                                       check_refs=not args.no_refs)
+    if args.json:
+        print(json.dumps(report, indent=1))
+    else:
+        print(asset_report.format_report(report, args.top))
+    if args.strict and any(report['missing'].values()):
+        return 1
+    return 0
+
+
+def cmd_ops(args):
+    failed = 0
+    for name in args.module or registry.PIXEL_MODULES:
+        module = importlib.import_module(name)
+        raw_ops = opt_ops = count = 0
+        start = time.perf_counter()
+        for sprite, gen in drawops.generator_entries(module):
+            oplist = drawops.load_or_record(module, sprite, gen)
+            if args.check:
+                raw = drawops.record(module, gen, name=sprite)
+                raw_ops += len(raw['ops'])
+                ref = gen()
+                ref = drawops.to_array(ref[0] if isinstance(ref, tuple) else ref)
+                ref = postfx.apply_passes(ref, postfx.declared_passes(module, sprite))
+                if not np.array_equal(drawops.replay(oplist), ref):
+                    print(f'  {name}.{sprite}: replay does not match generator output')
+                    failed += 1
+            opt_ops += len(oplist['ops'])
+            count += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        ops = f'{raw_ops} -> {opt_ops} ops' if args.check else f'{opt_ops} ops'
+        print(f'  {name}: {count} sprites, {ops} ({elapsed:.1f} ms)')
+    return 1 if failed else 0
+
+
+def cmd_map(args):
+    start = time.perf_counter()
+    bounds = tuple(args.bounds) if args.bounds else None
+    try:
+        w, h, nbytes, count = world_map.render_world(args.out, _or(args.chunks, world_map.CHUNK_DIR),
+                                                     args.scale, bounds, args.workers)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f'Rendered {count} chunks to {os.path.abspath(args.out)} '
+          f'({w}x{h}, {nbytes} bytes, {elapsed:.1f} s)')
+    return 0
+
+
+def cmd_dedup(args):
+    min_similarity = _or(args.min_similarity, dedup.MIN_SIMILARITY)
+    if args.from_generators:
+        found, _ = atlas.collect_sprites(registry.render())
+        sprites = {key: rgba for key, _, rgba in found}
+    else:
+        sprites = {key: pngio.read_png(path)
+                   for key, _, path in atlas.scan_sprites(_or(args.root, atlas.ART_DIR))}
+    groups = dedup.exact_groups(sprites)
+    pairs = dedup.near_duplicates(sprites, min_similarity)
+    if args.json:
+        print(json.dumps({'identical': groups, 'similar': pairs}, indent=1))
+        return 0
+    print(f'{len(groups)} groups of identical sprites (share one atlas slot):')
+    for keys in groups:
+        print('  ' + ' = '.join(keys))
+    print(f'\n{len(pairs)} near-duplicate pairs (similarity >= {min_similarity}):')
+    for a, b, score in pairs[:args.top]:
+        print(f'  {score:.3f}  {a}  ~  {b}')
+    if len(pairs) > args.top:
+        print(f'  ... {len(pairs) - args.top} more (--top)')
+    return 0
+
+
+def cmd_watch(args):
+    atlas_out = _or(args.atlas_out, atlas.ATLAS_DIR) if args.atlas else None
+    watcher = watch.Watcher(args.module or watch.REGISTRY_MODULES, args.root, atlas_out)
+    watcher.run(_or(args.interval, watch.POLL_INTERVAL))
+    return 0
+
+
+def cmd_render(args):
+    index = registry.load_index()
+    try:
+        ids = registry.select(index, args.ids)
+        sink = None if args.dry_run else sinks.open_sink(_or(args.sink, registry.ART_DIR))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    # The lock describes tileArt/, so only a render into it updates the lock
+    into_art = isinstance(sink, sinks.DirectorySink) and \
+        os.path.realpath(sink.root) == os.path.realpath(registry.ART_DIR)
+    lock = lockfile.Lock() if into_art else None
+    memo = {}
+    skipped = {}
+    kept = [i for i in ids if i in registry.HAND_DRAWN]
+    with sink or contextlib.nullcontext():
+        for sprite in ids:
+            entry = index[sprite]
+            if sprite in registry.HAND_DRAWN:
+                # Other sinks get the committed strip; tileArt/ already has it
+                if lock is not None:
+                    lock.record_committed(sprite, [f'{sprite}.png'], replace=args.accept)
+                elif sink is not None:
+                    with open(os.path.join(registry.ART_DIR, *sprite.split('/')) + '.png', 'rb') as f:
+                        sink.put(f'{sprite}.png', f.read())
+                continue
+            try:
+                module, gen = registry.resolve(entry)
+                rgba = registry.render_entry(module, entry.name, gen)
+            except ModuleNotFoundError as e:
+                skipped.setdefault(e.name, []).append(sprite)
+                if lock is not None and os.path.exists(os.path.join(registry.ART_DIR, f'{sprite}.png')):
+                    lock.record_committed(sprite, [f'{sprite}.png'], replace=args.accept)
+                continue
+            if sink is None:
+                continue
+            outputs = [(path, pngio.encode_png(img))
+                       for path, img in registry.entry_outputs(module, entry.name, rgba)]
+            for path, data in outputs:
+                sink.put(f'{registry.output_id(path)}.png', data)
+            if lock is not None:
+                lock.record(sprite, module, entry.name, gen, outputs, memo)
+    swept = []
+    if lock is not None:
+        if len(ids) == len(index):
+            # Every entry is recorded now, so what is left is committed art no entry writes
+            swept = lock.record_committed(None, lockfile.unlocked_files(lock.outputs))
+        lock.save()
+    written = sink.changed if sink is not None else []
+    for name in written:
+        print(f'  {name}')
+    elapsed = (time.perf_counter() - start) * 1000
+    missing = {i for found in skipped.values() for i in found}
+    rendered = [i for i in ids if i not in registry.HAND_DRAWN and i not in missing]
+    modules = sorted({index[i].module for i in rendered})
+    print(f'Rendered {len(rendered)} sprites from {", ".join(modules) or "no modules"} '
+          f'({len(written)} files changed, {elapsed:.1f} ms)')
+    if kept:
+        print(f'Kept {len(kept)} committed sprites no generator reproduces (registry.HAND_DRAWN)')
+    if swept:
+        print(f'Locked {len(swept)} committed files no registry entry writes')
+    for name, found in skipped.items():
+        print(f'Skipped {len(found)} sprites: {name} is not installed', file=sys.stderr)
+    return 1 if skipped else 0
+
+
+def cmd_verify(args):
+    start = time.perf_counter()
+    try:
+        report = lockfile.verify(_or(args.lock, lockfile.LOCK_PATH), workers=args.workers)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+    problems = {**report.stale, **report.unlocked}
+    for out, reason in list(problems.items())[:args.top]:
+        print(f'  {out:48s} {reason}')
+    if len(problems) > args.top:
+        print(f'  ... and {len(problems) - args.top} more')
+    state = []
+    if report.stale:
+        state.append(f'{len(report.stale)} stale')
+    if report.unlocked:
+        state.append(f'{len(report.unlocked)} not in the lock')
+    print(f'{report.checked} locked files: {", ".join(state) or "up to date"} ({elapsed:.1f} ms)')
+    return 1 if problems else 0
+
+
+def cmd_profile(args):
+    try:
+        rows = profiling.profile(args.ids or None, cprofile=args.cprofile, memory=args.memory,
+                                 log=print)
+        report = profiling.format_report(rows, args.sort, args.top)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(report)
+    out = _or(args.out, profiling.PROFILE_DIR)
+    if args.heatmaps:
+        with sinks.DirectorySink(out) as sink:
+            for p in rows:
+                if p.heat is not None:
+                    sink.put(f'{p.id}.png', pngio.encode_png(profiling.heatmap(p)))
+        print(f'Overdraw heatmaps in {os.path.abspath(out)}')
+    if args.cprofile:
+        for p in rows:
+            path = os.path.join(out, f'{p.id}.prof')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            p.stats.dump_stats(path)
+        print(f'cProfile stats (.prof) in {os.path.abspath(out)}')
+    return 0
+
+
+def cmd_index(args):
+    if args.bench:
+        return _bench_imports(args.bench)
+    index = registry.load_index()
+    try:
+        ids = registry.select(index, args.ids) if args.ids else list(index)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({i: index[i]._asdict() for i in ids}, indent=1))
+        return 0
+    for i in ids:
+        e = index[i]
+        args_text = ', '.join(json.dumps(a) for a in e.args)
+        print(f'  {i:40s} {e.module}.{e.function}({args_text})')
+    print(f'{len(ids)} sprites from {len({index[i].module for i in ids})} modules')
+    return 0
+
+
+def _bench_imports(sprite):
+    """Import cost of `render --dry-run <sprite>` against importing every generator module."""
+    script = os.path.abspath(__file__)
+    registry.load_index()   # time the cached path, not the first index build
+    runs = {
+        'render': [script, 'render', '--dry-run', sprite],
+        'all generators': ['-c', f'import sys; sys.path.insert(0, {registry.TOOLS_DIR!r}); '
+                           + '; '.join(f'import {m}' for m in registry.MODULES)],
+    }
+    for label, argv in runs.items():
+        rows = registry.importtime(argv)
+        total = sum(cum for _, _, cum, depth in rows if depth == 0)
+        tools = [(name, cum) for name, _, cum, depth in rows
+                 if depth == 0 and os.path.exists(os.path.join(registry.TOOLS_DIR, f'{name}.py'))]
+        print(f'{label}: {total / 1000:.1f} ms of imports, {len(rows)} modules')
+        for name, cum in sorted(tools, key=lambda t: -t[1]):
+            print(f'    {cum / 1000:7.1f} ms  {name}')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('atlas', help='trim sprites and pack them into atlas pages')
+    p.add_argument('--root', help='tileArt directory to scan')
+    p.add_argument('--out', help='output directory (default: tileArt/atlas)')
+    p.add_argument('--page-size', type=int)
+    p.add_argument('--padding', type=int)
+    p.add_argument('--quantize', action='store_true',
+                   help='write palette pages (median-cut + k-means, one palette per page)')
+    p.add_argument('--colors', type=int, default=256, help='palette size with --quantize')
+    p.add_argument('--dither', action='store_true', help='ordered (Bayer) dithering with --quantize')
+    p.add_argument('--from-generators', action='store_true',
+                   help='pack freshly rendered sprites from memory instead of tileArt/')
+    p.add_argument('--png', action='store_true',
+                   help='with --from-generators, hash encoded PNGs so page names match a tileArt/ build')
+    p.set_defaults(func=cmd_atlas)
+
+    p = sub.add_parser('report', help='file count, wire bytes and decoded memory per category')
+    p.add_argument('--root', help='tileArt directory to scan')
+    p.add_argument('--atlas', help='atlas directory (for page totals)')
+    p.add_argument('--top', type=int, default=10, help='number of largest files to list')
+    p.add_argument('--json', action='store_true', help='print the raw report as JSON')
+    p.add_argument('--no-refs', action='store_true',
+                   help='skip the ITEM_DB / ENEMY_IDS missing-sprite check (needs node)')
+    p.add_argument('--strict', action='store_true',
+                   help='exit non-zero if a referenced id has no sprite')
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('ops', help='record pixel generators as cached, optimized draw-op lists')
+    p.add_argument('--module', action='append', choices=registry.PIXEL_MODULES,
+                   help='generator module to record (default: all pixel modules)')
+    p.add_argument('--check', action='store_true',
+                   help='re-run each generator and verify the replayed ops match it')
+    p.set_defaults(func=cmd_ops)
+
+    p = sub.add_parser('map', help='render saved chunks to one overview PNG')
+    p.add_argument('--chunks', help='ChunkStore save directory')
+    p.add_argument('--out', default='world-map.png', help='output PNG path')
+    p.add_argument('--scale', type=int, default=1, choices=(1, 2, 4, 8, 16, 32),
+                   help='downscale factor (tile size = 32 / scale pixels)')
+    p.add_argument('--bounds', type=int, nargs=4, metavar=('X0', 'Y0', 'X1', 'Y1'),
+                   help='chunk rectangle to render, end-exclusive (default: all saved chunks)')
+    p.add_argument('--workers', type=int, help='parse/compress workers (default: all cores)')
+    p.set_defaults(func=cmd_map)
+
+    p = sub.add_parser('dedup', help='report identical and near-duplicate sprites')
+    p.add_argument('--root', help='tileArt directory to scan')
+    p.add_argument('--min-similarity', type=float,
+                   help='report pairs scoring at least this (0..1)')
+    p.add_argument('--top', type=int, default=20, help='number of near-duplicate pairs to list')
+    p.add_argument('--from-generators', action='store_true',
+                   help='compare freshly rendered sprites from memory instead of tileArt/')
+    p.add_argument('--json', action='store_true', help='print groups and pairs as JSON')
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser('watch', help='hot-reload edited generator modules and re-render what changed')
+    p.add_argument('--module', action='append', choices=sorted(registry.MODULES),
+                   help='registry module to re-render (default: the pixel-art modules)')
+    p.add_argument('--interval', type=float,
+                   help='seconds between polls of tools/*.py')
+    p.add_argument('--atlas', action='store_true',
+                   help='rebuild changed atlas bundles after each batch')
+    p.add_argument('--root', help='tileArt directory (with --atlas)')
+    p.add_argument('--atlas-out', help='atlas directory (with --atlas)')
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser('render', help='regenerate sprites by id, importing only their modules')
+    p.add_argument('ids', nargs='+', help="sprite ids or patterns, e.g. items/stick 'skills/*'; "
+                                          "ids in registry.HAND_DRAWN are never overwritten")
+    p.add_argument('--dry-run', action='store_true', help='render but do not write or lock')
+    p.add_argument('--sink', help="where to write: a directory, out.zip, out.tar or cas:DIR "
+                                  "(default: tileArt/); only a render into tileArt/ updates "
+                                  "tileArt.lock, other sinks leave it alone")
+    p.add_argument('--accept', action='store_true',
+                   help='re-lock the committed files of the selected hand-drawn or skipped ids '
+                        'as they are now (a changed one is otherwise reported by verify)')
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser('verify', help='check tileArt/ against tileArt.lock without running generators')
+    p.add_argument('--lock', help='lockfile path (default: tileArt.lock)')
+    p.add_argument('--workers', type=int, help='hashing threads (default: ThreadPoolExecutor default)')
+    p.add_argument('--top', type=int, default=50, help='number of stale or unlocked files to list')
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser('profile', help='time, primitive calls and overdraw per generator')
+    p.add_argument('ids', nargs='*', help='sprite ids or patterns (default: all)')
+    p.add_argument('--sort', default='overdraw',
+                   help='column to rank by: overdraw, overwritten, writes, calls, ms, memory '
+                        'or id (default: %(default)s)')
+    p.add_argument('--top', type=int, default=20, help='number of sprites to list')
+    p.add_argument('--cprofile', action='store_true',
+                   help='also run each generator under cProfile and save <id>.prof files')
+    p.add_argument('--memory', action='store_true', help='also record the tracemalloc peak')
+    p.add_argument('--heatmaps', action='store_true', help='write an overdraw heatmap PNG per sprite')
+    p.add_argument('--out', help='heatmap and .prof directory (default: .asset-cache/profile)')
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser('index', help='list sprite id -> module, function, args')
+    p.add_argument('ids', nargs='*', help='sprite ids or patterns (default: all)')
+    p.add_argument('--json', action='store_true', help='print the index entries as JSON')
+    p.add_argument('--bench', metavar='ID',
+                   help='compare -X importtime of rendering ID with importing every generator')
+    p.set_defaults(func=cmd_index)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
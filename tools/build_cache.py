@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Persistent digest cache for incremental asset builds.
+
+Maps each input path to (size, mtime_ns, sha1). A file whose stat is
+unchanged since the last build reuses its stored digest instead of being
+read again, so an unchanged tree costs one stat() per sprite. digests()
+hashes the files that did change through mmap in a thread pool (hashlib
+releases the GIL while it works).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def file_sha1(path):
+    """sha1 hex digest of a file's bytes, read through mmap."""
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return hashlib.sha1(m).hexdigest()
+        except ValueError:   # empty files cannot be mapped
+            return hashlib.sha1(b'').hexdigest()
+
+
+class BuildCache:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def digest(self, path):
+        """sha1 hex digest of a file's bytes, reused while its stat is unchanged."""
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        hit = self._entries.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        sha = file_sha1(path)
+        self._entries[key] = [st.st_size, st.st_mtime_ns, sha]
+        self._dirty = True
+        return sha
+
+    def digests(self, paths, workers=None):
+        """{path: sha1 hex} for many files (None for missing ones)."""
+        out = {}
+        todo = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                out[path] = None
+                continue
+            hit = self._entries.get(os.path.abspath(path))
+            if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+                out[path] = hit[2]
+            else:
+                todo.append((path, st))
+        if todo:
+            with ThreadPoolExecutor(workers) as pool:
+                shas = pool.map(file_sha1, [path for path, _ in todo])
+                for (path, st), sha in zip(todo, shas):
+                    self._entries[os.path.abspath(path)] = [st.st_size, st.st_mtime_ns, sha]
+                    out[path] = sha
+            self._dirty = True
+        return out
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._entries, f, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Partition atlas sprites into load bundles using the biome data.
+
+    critical   terrain, player and UI - everything the first frame needs
+    <biome>    enemies and resource nodes listed in data/biomes/<biome>/
+    common     items, skills, stations, NPCs, sorting and anything no biome spawns
+
+A sprite spawned by several biomes lives in the lowest-tier one; later
+biomes list that bundle under 'requires'. The load order puts the biome
+containing the town (where new players spawn) right after critical.
+"""
+
+import json
+import os
+
+BIOME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'biomes')
+
+CRITICAL = 'critical'
+COMMON = 'common'
+CRITICAL_CATEGORIES = ('terrain', 'player', 'ui')
+# Sprite category -> (spawn table file, list key) in each biome directory
+SPAWN_TABLES = {
+    'enemies': ('enemies.json', 'enemies'),
+    'resources': ('resources.json', 'resources'),
+}
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_biomes(biome_dir=BIOME_DIR):
+    """Return (biome ids by tier, start biome id, {biome: set of sprite keys})."""
+    index = _read_json(os.path.join(biome_dir, 'biomeIndex.json'))
+    biomes = sorted(index['biomes'], key=lambda b: b['tier'])
+    start = biomes[0]['id']
+    for b in biomes:
+        if b['startChunkX'] <= index['townChunkX'] < b['endChunkX'] \
+                and b['startChunkY'] <= index['townChunkY'] < b['endChunkY']:
+            start = b['id']
+            break
+
+    spawns = {}
+    for b in biomes:
+        keys = set()
+        for cat, (filename, list_key) in SPAWN_TABLES.items():
+            path = os.path.join(biome_dir, b['id'], filename)
+            if os.path.exists(path):
+                keys.update(f"{cat}/{e['id']}" for e in _read_json(path)[list_key])
+        spawns[b['id']] = keys
+    return [b['id'] for b in biomes], start, spawns
+
+
+def plan_bundles(sprites, biome_dir=BIOME_DIR):
+    """Assign each (key, category) to a bundle.
+
+    Returns ({key: bundle}, {bundle: {'requires': [...]}}, load_order) where
+    load_order is a list of tiers, each a list of bundles that may load in
+    parallel once the previous tier is done.
+    """
+    order, start, spawns = load_biomes(biome_dir)
+    home = {}
+    for biome in order:
+        for key in spawns[biome]:
+            home.setdefault(key, biome)
+
+    assign = {}
+    for key, cat in sprites:
+        if cat in CRITICAL_CATEGORIES:
+            assign[key] = CRITICAL
+        elif key in home:
+            assign[key] = home[key]
+        else:
+            assign[key] = COMMON
+
+    present = set(assign)
+    bundles = {CRITICAL: {'requires': []}, COMMON: {'requires': [CRITICAL]}}
+    for biome in order:
+        deps = {home[k] for k in spawns[biome] if k in present and home[k] != biome}
+        bundles[biome] = {'requires': [CRITICAL] + [b for b in order if b in deps]}
+
+    rest = [b for b in order if b != start]
+    load_order = [[CRITICAL], [start, COMMON], rest]
+    return assign, bundles, load_order
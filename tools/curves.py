@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Arc, ring, spiral and polyline primitives for the list-of-rows pixel generators.
+
+Each primitive computes all of its sample points as one NumPy array and
+then hands them to plot(). plot() clips them to the canvas, drops every
+write to a pixel except the last one, and writes what is left in a
+single pass. The point sets are identical to the per-sample loops they
+replace:
+
+    for t in range(n):
+        a = t * math.pi * 2 / n
+        set_px(px, int(cx + r * math.cos(a)), int(cy + r * math.sin(a)), c)
+
+  * angles and radii are built with the same float operations in the
+    same order, so they are bit-identical
+  * np.cos/np.sin may differ from libm in the last ulp. A coordinate whose
+    fractional part lies within PIXEL_EDGE of a pixel edge is therefore
+    recomputed with math.cos/math.sin, so int() truncates exactly as it
+    did before
+  * polyline() uses a closed form of draw_line's Bresenham stepping:
+    along the major axis, step i lands at minor offset
+    (2 * i * minor + major) // (2 * major)
+
+Colours are either one (r, g, b, a) tuple or a sequence with one colour
+per radius (arc/ring) or per step (spiral). Later samples win, as they did
+with consecutive set_px calls.
+"""
+
+import math
+
+import numpy as np
+
+PIXEL_EDGE = 1e-9
+
+
+def _is_color(c):
+    return len(c) in (3, 4) and isinstance(c[0], (int, np.integer))
+
+
+def _truncate(origin, r, angle, trig, fn):
+    """int(origin + r * fn(angle)) elementwise, exact against the math module."""
+    v = origin + r * trig
+    near = np.abs(v - np.rint(v)) < PIXEL_EDGE
+    if near.any():
+        for i in zip(*np.nonzero(near)):
+            v[i] = origin + float(r[i]) * fn(float(angle[i]))
+    return np.trunc(v).astype(np.intp)
+
+
+def polar(cx, cy, r, angle, ry=None):
+    """Pixel coordinates (int(cx + r cos a), int(cy + ry sin a)) for arrays of radii and angles."""
+    angle = np.asarray(angle, dtype=np.float64)
+    rx = np.broadcast_to(np.asarray(r, dtype=np.float64), angle.shape)
+    ry = rx if ry is None else np.broadcast_to(np.asarray(ry, dtype=np.float64), angle.shape)
+    xs = _truncate(cx, rx, angle, np.cos(angle), math.cos)
+    ys = _truncate(cy, ry, angle, np.sin(angle), math.sin)
+    return xs, ys
+
+
+def plot(px, xs, ys, colors):
+    """Write samples in order: one colour, or one per sample; clipped, one write per pixel.
+
+    `px` is a list-of-rows canvas or an (h, w, 4) array; an array gets a
+    single fancy-index assignment.
+    """
+    xs = np.ravel(xs)
+    ys = np.ravel(ys)
+    h, w = len(px), len(px[0])
+    if _is_color(colors):
+        colors = [tuple(colors)] * len(xs)
+    keep = np.nonzero((xs >= 0) & (xs < w) & (ys >= 0) & (ys < h))[0]
+    # Last write wins: keep each pixel's final occurrence
+    _, last = np.unique((ys[keep] * w + xs[keep])[::-1], return_index=True)
+    keep = keep[len(keep) - 1 - last]
+    if isinstance(px, np.ndarray):
+        px[ys[keep], xs[keep]] = np.asarray(colors, dtype=px.dtype)[keep]
+        return
+    for x, y, i in zip(xs[keep].tolist(), ys[keep].tolist(), keep.tolist()):
+        px[y][x] = colors[i]
+
+
+# ── Primitives ─────────────────────────────────────────────────────────
+
+def arc(px, cx, cy, r, angles, colors, ry=None):
+    """Points at every angle of `angles` and every radius of `r` (angle-major order).
+
+    `colors` is one colour or one per radius; `ry` makes the arc elliptical.
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    radii = np.atleast_1d(np.asarray(r, dtype=np.float64))
+    grid = np.broadcast_to(angles[:, None], (len(angles), len(radii)))
+    yr = radii if ry is None else np.atleast_1d(np.asarray(ry, dtype=np.float64))
+    xs, ys = polar(cx, cy, radii[None, :], grid, yr[None, :])
+    if not _is_color(colors):
+        colors = [colors[k] for _ in range(len(angles)) for k in range(len(radii))]
+    plot(px, xs, ys, colors)
+
+
+def ring(px, cx, cy, r, n, colors, ry=None):
+    """n evenly spaced points around a full turn, angle t * pi * 2 / n, at each radius in `r`."""
+    arc(px, cx, cy, r, np.arange(n) * math.pi * 2 / n, colors, ry)
+
+
+def spiral(px, cx, cy, r0, dr, da, n, colors, arms=1):
+    """`arms` spirals of n steps each: radius r0 + t * dr at angle arm * pi * 2 / arms + t * da.
+
+    `colors` is one colour or one per step, shared by every arm.
+    """
+    t = np.arange(n)
+    angle = np.arange(arms)[:, None] * math.pi * 2 / arms + t * da
+    xs, ys = polar(cx, cy, np.broadcast_to(r0 + t * dr, angle.shape), angle)
+    plot(px, xs, ys, colors if _is_color(colors) else list(colors) * arms)
+
+
+def line_points(x0, y0, x1, y1):
+    """The pixels draw_line visits from (x0, y0) to (x1, y1), in order."""
+    dx, dy = abs(x1 - x0), abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    major, minor = max(dx, dy), min(dx, dy)
+    i = np.arange(major + 1)
+    j = (2 * i * minor + major) // (2 * major) if major else i
+    if dx >= dy:
+        return x0 + sx * i, y0 + sy * j
+    return x0 + sx * j, y0 + sy * i
+
+
+def polyline(px, xs, ys, colors, closed=False):
+    """draw_line between consecutive vertices (and back to the first if `closed`)."""
+    pts = list(zip(xs, ys))
+    if closed:
+        pts.append(pts[0])
+    segs = [line_points(*a, *b) for a, b in zip(pts, pts[1:])]
+    if segs:
+        plot(px, np.concatenate([s[0] for s in segs]), np.concatenate([s[1] for s in segs]), colors)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Exact and perceptual duplicate detection for generated sprites.
+
+    pixel_digest      SHA-1 over a sprite's shape and RGBA bytes
+    exact_groups      keys whose pixels are byte-identical
+    dhash / phash     64-bit difference / DCT hashes of a [N, h, w, 4] stack
+    near_duplicates   pairs whose hashes and mean colours are close, with
+                      a similarity score in 0..1
+
+Every sprite is reduced to its first square frame, resampled to 32x32 and
+stacked, so hashing and the all-pairs Hamming distances are a handful of
+array operations for the whole of tileArt/. Hashes work on luma
+premultiplied by alpha (the silhouette counts, fully transparent pixels
+are black). Since tier recolours share a silhouette, the score is the
+hash similarity scaled down by the mean difference of 8x8 colour
+thumbnails: only sprites that look the same *and* have the same colours
+in the same places score near 1.
+
+The atlas stage uses pixel_digest() so identical sprites share one slot.
+"""
+
+import hashlib
+
+import numpy as np
+
+HASH_SIZE = 8           # 8x8 = 64-bit hashes
+SAMPLE = 32             # sprites are resampled to SAMPLE x SAMPLE first
+MIN_SIMILARITY = 0.95
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def pixel_digest(rgba):
+    """Digest of an RGBA array that is equal exactly when shape and pixels are."""
+    h = hashlib.sha1(repr(rgba.shape).encode())
+    h.update(np.ascontiguousarray(rgba).tobytes())
+    return h.hexdigest()
+
+
+def exact_groups(sprites):
+    """[[key, ...], ...] of every set of identical sprites in {key: rgba}, in key order."""
+    groups = {}
+    for key in sorted(sprites):
+        groups.setdefault(pixel_digest(sprites[key]), []).append(key)
+    return [keys for keys in groups.values() if len(keys) > 1]
+
+
+# ── Perceptual hashes ──────────────────────────────────────────────────
+
+def first_frame(rgba):
+    """The leftmost square frame of a horizontal strip (the whole image if not a strip)."""
+    h, w = rgba.shape[:2]
+    return rgba[:, :h] if w > h and w % h == 0 else rgba
+
+
+def resample(rgba, size=SAMPLE):
+    """Nearest-neighbour resize of one (h, w, 4) image to (size, size, 4)."""
+    h, w = rgba.shape[:2]
+    ys = (np.arange(size) * h) // size
+    xs = (np.arange(size) * w) // size
+    return rgba[ys[:, None], xs[None, :]]
+
+
+def stack_sprites(images, size=SAMPLE):
+    """[N, size, size, 4] uint8 stack of the first frames of a list of sprites."""
+    out = np.zeros((len(images), size, size, 4), dtype=np.uint8)
+    for i, img in enumerate(images):
+        if img.size:
+            out[i] = resample(first_frame(img), size)
+    return out
+
+
+def _signal(stack):
+    """[N, s, s] float32 luma premultiplied by alpha, 0..1."""
+    rgb = stack[..., :3].astype(np.float32) / 255.0
+    return (rgb @ _LUMA) * (stack[..., 3].astype(np.float32) / 255.0)
+
+
+def _bin_mean(a, bins, axis):
+    """Average a over `bins` near-equal slices along `axis`."""
+    n = a.shape[axis]
+    edges = np.linspace(0, n, bins + 1).astype(np.intp)
+    sums = np.add.reduceat(a, edges[:-1], axis=axis)
+    shape = [1] * a.ndim
+    shape[axis] = bins
+    return sums / np.diff(edges).reshape(shape)
+
+
+def _pack(bits):
+    """[N, 64] bool -> [N] uint64."""
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def dhash(stack, size=HASH_SIZE):
+    """Difference hash: is each cell of a size x (size + 1) grid brighter than its left neighbour."""
+    grid = _bin_mean(_bin_mean(_signal(stack), size, 1), size + 1, 2)
+    return _pack((grid[:, :, 1:] > grid[:, :, :-1]).reshape(len(stack), -1))
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+def phash(stack, size=HASH_SIZE):
+    """DCT hash: is each low-frequency coefficient above the median (DC excluded)."""
+    signal = _signal(stack)
+    d = _dct_matrix(signal.shape[-1])
+    low = (d @ signal @ d.T)[:, :size, :size].reshape(len(stack), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack(low > median)
+
+
+def hamming(hashes):
+    """[N, N] pairwise Hamming distances of [N] uint64 hashes."""
+    return np.bitwise_count(hashes[:, None] ^ hashes[None, :]).astype(np.int32)
+
+
+# ── Near duplicates ────────────────────────────────────────────────────
+
+def thumbnails(stack, size=HASH_SIZE):
+    """[N, size * size, 4] float32 premultiplied RGBA block means, 0..1."""
+    rgba = stack.astype(np.float32) / 255.0
+    rgba[..., :3] *= rgba[..., 3:]
+    return _bin_mean(_bin_mean(rgba, size, 1), size, 2).reshape(len(stack), -1, 4)
+
+
+def similarity(stack):
+    """[N, N] similarity in 0..1: dHash + pHash agreement times (1 - thumbnail colour difference).
+
+    The colour difference is averaged over the thumbnail cells either
+    sprite covers, so small sprites are not excused by their empty margins.
+    """
+    bits = 2 * HASH_SIZE * HASH_SIZE
+    shape = 1.0 - (hamming(dhash(stack)) + hamming(phash(stack))) / bits
+    thumb = thumbnails(stack)
+    covered = thumb[..., 3] > 0
+    delta = np.zeros_like(shape)
+    for i in range(len(thumb)):
+        either = covered | covered[i]
+        diff = (np.abs(thumb - thumb[i]).mean(axis=-1) * either).sum(axis=1)
+        np.divide(diff, either.sum(axis=1), out=delta[i], where=either.any(axis=1))
+    return shape * (1.0 - delta)
+
+
+def near_duplicates(sprites, min_similarity=MIN_SIMILARITY):
+    """[(key_a, key_b, score), ...] best first, for sprites in {key: rgba} that are
+    similar but not identical.
+    """
+    keys = sorted(sprites)
+    if len(keys) < 2:
+        return []
+    digests = [pixel_digest(sprites[k]) for k in keys]
+    score = similarity(stack_sprites([sprites[k] for k in keys]))
+    a, b = np.nonzero(np.triu(score >= min_similarity, k=1))
+    pairs = [(keys[i], keys[j], round(float(score[i, j]), 4))
+             for i, j in zip(a.tolist(), b.tolist()) if digests[i] != digests[j]]
+    return sorted(pairs, key=lambda p: (-p[2], p[0], p[1]))
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Per-definition source hashes and dependency sets for the generator modules.
+
+    definitions(path)   the top-level statements of a module file that bind
+                        names (def, class, assignment), each with the SHA-1
+                        of its source text
+    dependencies(gen)   {(module, unit), ...}: the top-level definitions a
+                        registry entry can reach through global names
+    entry_key(gen)      digest of those definitions' sources plus the
+                        entry's own arguments
+
+A unit is named after the first name its statement binds, so
+`WEAPON_MAP = {...}` is the unit 'WEAPON_MAP' and a lambda inside
+CONSUMABLE_GENERATORS belongs to the unit 'CONSUMABLE_GENERATORS'. Hashes
+cover only a statement's own text, so editing one function leaves every
+other unit's hash alone even though the lines below it move.
+
+dependencies() follows global names from code objects (nested ones
+included), functools.partial arguments, classes and their methods, the
+types of module-level instances such as a generator's PALETTE, and
+`module.attr` references into other tools/ modules. Only modules in tools/
+are followed; NumPy and the standard library count as fixed.
+
+An entry whose key is unchanged renders the same pixels, which is what
+build_assets.py watch and the draw-op cache (drawops.py) rely on.
+"""
+
+import ast
+import bisect
+import functools
+import hashlib
+import os
+import sys
+import types
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_DEFINITIONS = {}   # path -> ((size, mtime_ns), Definitions)
+
+
+class Definitions:
+    """The name-binding top-level statements of one module file."""
+
+    def __init__(self, source):
+        self.hashes = {}    # unit -> sha1 hex of its statement(s)
+        self.units = {}     # bound name -> unit
+        self._starts = []
+        self._spans = []    # (first line, last line, unit), in file order
+        lines = source.splitlines(keepends=True)
+        for node in ast.parse(source).body:
+            names = _bound_names(node)
+            if not names:
+                continue
+            unit = names[0]
+            first = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', ())])
+            h = hashlib.sha1(self.hashes.get(unit, '').encode())
+            h.update(''.join(lines[first - 1:node.end_lineno]).encode())
+            self.hashes[unit] = h.hexdigest()
+            for name in names:
+                self.units.setdefault(name, unit)
+            self._starts.append(first)
+            self._spans.append((first, node.end_lineno, unit))
+
+    def unit_at(self, lineno):
+        """The unit whose statement contains line `lineno`, or None."""
+        i = bisect.bisect_right(self._starts, lineno) - 1
+        if i >= 0 and self._spans[i][1] >= lineno:
+            return self._spans[i][2]
+        return None
+
+
+def _bound_names(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+        targets = [node.target]
+    else:
+        return []
+    return [n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)]
+
+
+def definitions(path):
+    """Definitions of a module file, re-parsed only when its stat changes."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    hit = _DEFINITIONS.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    with open(path, encoding='utf-8') as f:
+        defs = Definitions(f.read())
+    _DEFINITIONS[path] = (stamp, defs)
+    return defs
+
+
+def is_tracked(module):
+    """True for modules loaded from tools/."""
+    path = getattr(module, '__file__', None)
+    return bool(path) and os.path.dirname(os.path.abspath(path)) == TOOLS_DIR
+
+
+def imported_from(module):
+    """Names of the tools/ modules whose objects `module` holds in its globals."""
+    found = set()
+    for value in vars(module).values():
+        source = value if isinstance(value, types.ModuleType) else sys.modules.get(
+            getattr(value, '__module__', None) or '')
+        if source is not None and source is not module and is_tracked(source):
+            found.add(source.__name__)
+    return found
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+# ── Dependencies ───────────────────────────────────────────────────────
+
+def _edges(obj):
+    """(units obj itself depends on, objects to follow from it)."""
+    units = set()
+    follow = []
+    if isinstance(obj, functools.partial):
+        follow += [obj.func, *obj.args, *obj.keywords.values()]
+    elif isinstance(obj, (types.MethodType, staticmethod, classmethod)):
+        follow.append(obj.__func__)
+    elif isinstance(obj, property):
+        follow += [obj.fget, obj.fset]
+    elif isinstance(obj, types.FunctionType):
+        module = sys.modules.get(obj.__module__)
+        if not is_tracked(module):
+            return units, follow
+        defs = definitions(module.__file__)
+        unit = defs.unit_at(obj.__code__.co_firstlineno)
+        if unit is not None:
+            units.add((module.__name__, unit))
+        names = _code_names(obj.__code__)
+        for name in names:
+            if name not in obj.__globals__:
+                continue
+            value = obj.__globals__[name]
+            if not isinstance(value, types.ModuleType):
+                if name in defs.units:
+                    units.add((module.__name__, defs.units[name]))
+                follow.append(value)
+            elif is_tracked(value):
+                # module.attr: depend on the attributes this code names
+                other = definitions(value.__file__)
+                for attr in names & vars(value).keys():
+                    if attr in other.units:
+                        units.add((value.__name__, other.units[attr]))
+                    follow.append(vars(value)[attr])
+    elif isinstance(obj, type):
+        module = sys.modules.get(obj.__module__)
+        if is_tracked(module):
+            unit = definitions(module.__file__).units.get(obj.__name__)
+            if unit is not None:
+                units.add((module.__name__, unit))
+            follow += list(vars(obj).values())
+    elif is_tracked(sys.modules.get(type(obj).__module__)):
+        follow.append(type(obj))
+    return units, follow
+
+
+_ATOMS = (str, bytes, int, float, tuple, type(None))
+
+
+def dependencies(gen, memo=None):
+    """{(module name, unit)} of the tools/ definitions gen can reach.
+
+    `memo` ({} shared across calls) keeps each object's edges, so keying a
+    whole registry visits every helper once.
+    """
+    memo = {} if memo is None else memo
+    deps = set()
+    seen = set()
+    stack = [gen]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, _ATOMS) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if id(obj) not in memo:
+            # obj rides along so its id cannot be reused while the memo lives
+            memo[id(obj)] = (obj,) + _edges(obj)
+        _, units, follow = memo[id(obj)]
+        deps |= units
+        stack += follow
+    return deps
+
+
+def _describe(gen):
+    """The entry's own arguments; functions by name, since their source is hashed."""
+    if isinstance(gen, functools.partial):
+        return [_describe(gen.func), [_describe(a) for a in gen.args],
+                {k: _describe(v) for k, v in sorted(gen.keywords.items())}]
+    if callable(gen):
+        return f'{getattr(gen, "__module__", "")}.{getattr(gen, "__qualname__", type(gen).__name__)}'
+    return repr(gen)
+
+
+def entry_key(gen, memo=None):
+    """sha1 hex that changes whenever gen's reachable source or its arguments do."""
+    h = hashlib.sha1(repr(_describe(gen)).encode())
+    for module_name, unit in sorted(dependencies(gen, memo)):
+        defs = definitions(sys.modules[module_name].__file__)
+        h.update(f'{module_name}.{unit}:{defs.hashes[unit]}\n'.encode())
+    return h.hexdigest()
+
+
+def entry_keys(entries):
+    """{name: entry_key} for (name, gen) pairs, sharing one memo."""
+    memo = {}
+    return {name: entry_key(gen, memo) for name, gen in entries}
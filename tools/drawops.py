@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Draw-op recording and replay for the list-of-rows pixel generators.
+
+record() runs a gen_* function against a RecordingCanvas. Each fill_rect
+becomes one 'rect' op and every other pixel write (set_px, fill_circle,
+draw_border, draw_line, ...) becomes a 'px' op. The result is a flat,
+JSON-serializable op list:
+
+    {'w': 32, 'h': 32, 'ops': [['rect', x, y, w, h, [r, g, b, a]],
+                               ['px', x, y, [r, g, b, a]],
+                               ['pixels', [r, g, b, a], [flat_index, ...]]]}
+
+Post-process passes the module declares for the entry in its POSTFX dict
+(see postfx.py) are appended as trailing ['fx', pass_name, params] ops.
+
+optimize() drops ops that later writes fully cover (all writes replace,
+nothing blends), merges touching same-colour rects and batches runs of
+single pixels into one index array per colour. replay() executes an op
+list with NumPy slice and fancy-index assignments.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+from functools import partial
+
+import numpy as np
+
+import depgraph
+import postfx
+from registry import MODULES
+
+OP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.asset-cache', 'ops')
+
+
+def generator_entries(module):
+    """(name, gen) for every entry of a module's registries (see registry.MODULES)."""
+    for name in MODULES.get(module.__name__, ('GENERATORS', 'ANIMATED_GENERATORS')):
+        yield from getattr(module, name, {}).items()
+
+
+# ── Recording ──────────────────────────────────────────────────────────
+
+class _RecordingRow(list):
+    __slots__ = ('_y', '_ops')
+
+    def __setitem__(self, x, c):
+        list.__setitem__(self, x, c)
+        self._ops.append(['px', x % len(self), self._y, list(c)])
+
+
+class RecordingCanvas(list):
+    """A new_canvas() stand-in that logs every write as a draw op."""
+
+    def __init__(self, w, h, fill=(0, 0, 0, 0)):
+        self.ops = []
+        rows = []
+        for y in range(h):
+            row = _RecordingRow([fill] * w)
+            row._y = y
+            row._ops = self.ops
+            rows.append(row)
+        super().__init__(rows)
+        self.w = w
+        self.h = h
+
+    def fill_rect(self, x, y, w, h, c):
+        self.ops.append(['rect', x, y, w, h, list(c)])
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.w), min(y + h, self.h)
+        for row in self[y0:y1]:
+            list.__setitem__(row, slice(x0, x1), [c] * max(x1 - x0, 0))
+
+    def oplist(self):
+        return {'w': self.w, 'h': self.h, 'ops': self.ops}
+
+
+@contextlib.contextmanager
+def _patched(module, **overrides):
+    saved = {name: getattr(module, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(module, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def record(module, gen, *args, name=None):
+    """Run gen(*args) from a pixel generator module and return its op list.
+
+    With a registry `name`, the entry's declared POSTFX passes are appended.
+    """
+    def new_canvas(w=module.SIZE, h=module.SIZE):
+        return RecordingCanvas(w, h)
+
+    def fill_rect(px, x, y, w, h, c):
+        px.fill_rect(x, y, w, h, c)
+
+    with _patched(module, new_canvas=new_canvas, fill_rect=fill_rect):
+        result = gen(*args)
+    canvas = result[0] if isinstance(result, tuple) else result
+    oplist = canvas.oplist()
+    if name is not None:
+        oplist['ops'] += [['fx', fx, params] for fx, params in postfx.declared_passes(module, name)]
+    return oplist
+
+
+# ── Optimizer ──────────────────────────────────────────────────────────
+
+def _clip(op, w, h):
+    """(x0, y0, x1, y1) of the pixels an op writes, clipped to the canvas."""
+    if op[0] == 'rect':
+        _, x, y, rw, rh, _ = op
+        return max(x, 0), max(y, 0), min(x + rw, w), min(y + rh, h)
+    _, x, y, _ = op
+    return x, y, x + 1, y + 1
+
+
+def drop_overdrawn(oplist):
+    """Remove ops whose every pixel is rewritten by a later op."""
+    w, h = oplist['w'], oplist['h']
+    covered = np.zeros((h, w), dtype=bool)
+    kept = []
+    for op in reversed(oplist['ops']):
+        x0, y0, x1, y1 = _clip(op, w, h)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        region = covered[y0:y1, x0:x1]
+        if region.all():
+            continue
+        region[...] = True
+        kept.append(op)
+    kept.reverse()
+    return {'w': w, 'h': h, 'ops': kept}
+
+
+def merge_rects(oplist):
+    """Merge consecutive same-colour rects that share a full edge."""
+    merged = []
+    for op in oplist['ops']:
+        prev = merged[-1] if merged else None
+        if op[0] == 'rect' and prev and prev[0] == 'rect' and prev[5] == op[5]:
+            _, px, py, pw, ph, c = prev
+            _, x, y, w, h, _ = op
+            if px == x and pw == w and (py + ph == y or y + h == py):
+                merged[-1] = ['rect', x, min(py, y), w, ph + h, c]
+                continue
+            if py == y and ph == h and (px + pw == x or x + w == px):
+                merged[-1] = ['rect', min(px, x), y, pw + w, h, c]
+                continue
+        merged.append(op)
+    return {'w': oplist['w'], 'h': oplist['h'], 'ops': merged}
+
+
+def batch_pixels(oplist):
+    """Collapse each run of 'px' ops into one 'pixels' op per colour.
+
+    Only valid after drop_overdrawn(): no two surviving px ops hit the same
+    pixel, so reordering them within a run cannot change the result.
+    """
+    w = oplist['w']
+    out = []
+    run = {}
+
+    def flush():
+        for c, idx in run.items():
+            out.append(['pixels', list(c), idx])
+        run.clear()
+
+    for op in oplist['ops']:
+        if op[0] == 'px':
+            _, x, y, c = op
+            run.setdefault(tuple(c), []).append(y * w + x)
+        else:
+            flush()
+            out.append(op)
+    flush()
+    return {'w': w, 'h': oplist['h'], 'ops': out}
+
+
+def optimize(oplist):
+    """Optimize the draw ops; trailing 'fx' passes read every pixel and are kept as-is."""
+    ops = oplist['ops']
+    n = len(ops)
+    while n and ops[n - 1][0] == 'fx':
+        n -= 1
+    draw = {'w': oplist['w'], 'h': oplist['h'], 'ops': ops[:n]}
+    out = batch_pixels(merge_rects(drop_overdrawn(draw)))
+    out['ops'] += ops[n:]
+    return out
+
+
+# ── Replay ─────────────────────────────────────────────────────────────
+
+def replay(oplist):
+    """Execute an op list into a (h, w, 4) uint8 RGBA array."""
+    w, h = oplist['w'], oplist['h']
+    out = np.zeros((h, w, 4), dtype=np.uint8)
+    flat = out.reshape(-1, 4)
+    for op in oplist['ops']:
+        kind = op[0]
+        if kind == 'rect':
+            x0, y0, x1, y1 = _clip(op, w, h)
+            if x1 > x0 and y1 > y0:
+                out[y0:y1, x0:x1] = op[5]
+        elif kind == 'pixels':
+            flat[np.asarray(op[2], dtype=np.intp)] = op[1]
+        elif kind == 'px':
+            out[op[2], op[1]] = op[3]
+        elif kind == 'fx':
+            out = postfx.apply_passes(out, [(op[1], op[2])])
+            flat = out.reshape(-1, 4)
+        else:
+            raise ValueError(f'unknown draw op {kind!r}')
+    return out
+
+
+def to_array(px):
+    """Convert a list-of-rows canvas of (r, g, b, a) tuples to a uint8 array."""
+    return np.array(px, dtype=np.uint8).reshape(len(px), len(px[0]), 4)
+
+
+def source_key(module, name, gen, *args):
+    """Cache key: the source gen(*args) can reach (see depgraph.py), the entry's
+    declared post-process passes and the postfx module that runs them.
+    """
+    h = hashlib.sha1(depgraph.entry_key(partial(gen, *args)).encode())
+    with open(postfx.__file__, 'rb') as f:
+        h.update(f.read())
+    h.update(repr((name, args, postfx.declared_passes(module, name))).encode())
+    return h.hexdigest()
+
+
+def load_or_record(module, name, gen, *args, cache_dir=OP_CACHE_DIR):
+    """Optimized op list for gen(*args), recorded again only when its source changes."""
+    key = source_key(module, name, gen, *args)
+    path = os.path.join(cache_dir, module.__name__, f'{name}.json')
+    if os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['oplist']
+    oplist = optimize(record(module, gen, *args, name=name))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(dumps({'key': key, 'oplist': oplist}))
+    os.replace(tmp, path)
+    return oplist
+
+
+def dumps(oplist):
+    return json.dumps(oplist, separators=(',', ':'))
+
+
+def loads(data):
+    return json.loads(data)
+
+
+def stats(oplist):
+    """Op count and number of pixel writes an op list performs."""
+    w, h = oplist['w'], oplist['h']
+    writes = 0
+    for op in oplist['ops']:
+        if op[0] == 'pixels':
+            writes += len(op[2])
+        elif op[0] == 'fx':
+            writes += w * h
+        else:
+            x0, y0, x1, y1 = _clip(op, w, h)
+            writes += max(x1 - x0, 0) * max(y1 - y0, 0)
+    return len(oplist['ops']), writes
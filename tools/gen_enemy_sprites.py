@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
-"""Generate pixel-art enemy sprites as 32x32 PNGs using only stdlib."""
+"""Generate pixel-art enemy sprites as 32x32 PNGs.
 
-import struct, zlib, os
+The drake is built on a layers.LayeredCanvas with one layer per body part
+(body, head, wings, tail, legs); gen_drake flattens it.
+"""
+
+import os, sys
+
+from layers import LayeredCanvas
+from pngio import encode_png
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'enemies')
 SIZE = 32
@@ -21,19 +30,6 @@ def blend(c1, c2, t):
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -1192,8 +1188,9 @@ def gen_wolf():
 
 
 # --- 19. DRAKE: ice dragon/wyvern with wings ---
-def gen_drake():
-    px = new_canvas()
+def drake_layers():
+    canvas = LayeredCanvas(SIZE, SIZE, new_canvas, mode='replace')
+    px = canvas.layer('body')
     body = hex_to_rgba('#3498db')
     body_dk = darken(body)
     body_lt = lighten(body)
@@ -1210,6 +1207,7 @@ def gen_drake():
     fill_rect(px, 13, 17, 8, 4, ice)
 
     # Head (angular dragon head)
+    px = canvas.layer('head')
     fill_rect(px, 8, 8, 8, 6, body)
     fill_rect(px, 6, 9, 4, 4, body)
     fill_rect(px, 4, 10, 3, 3, body)
@@ -1232,6 +1230,7 @@ def gen_drake():
     set_px(px, 2, 12, hex_to_rgba('#aaddff', 180))
 
     # Wings (spread, large)
+    px = canvas.layer('wings')
     # Left wing
     fill_rect(px, 4, 5, 3, 8, wing)
     fill_rect(px, 1, 4, 4, 6, wing)
@@ -1252,6 +1251,7 @@ def gen_drake():
     set_px(px, 28, 5, wing_dk)
 
     # Tail (curving)
+    px = canvas.layer('tail')
     fill_rect(px, 22, 18, 4, 3, body)
     fill_rect(px, 25, 20, 3, 2, body_dk)
     set_px(px, 28, 21, body_dk)
@@ -1261,6 +1261,7 @@ def gen_drake():
     set_px(px, 30, 21, body_lt)
 
     # Legs (short, clawed)
+    px = canvas.layer('legs')
     fill_rect(px, 13, 22, 3, 5, body_dk)
     fill_rect(px, 18, 22, 3, 5, body_dk)
     # Claws
@@ -1269,7 +1270,11 @@ def gen_drake():
     set_px(px, 17, 27, ice)
     set_px(px, 20, 27, ice)
 
-    return px
+    return canvas
+
+
+def gen_drake():
+    return drake_layers().rows()
 
 
 # --- 20. STONE GOLEM: BOSS - massive stone giant ---
@@ -2068,25 +2073,26 @@ ANIMATED_GENERATORS = {
     'rabbit': gen_rabbit,
 }
 
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_enemy_sprites'], png=png)
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
+    module = sys.modules[__name__]
     total = 0
-    for name, gen in GENERATORS.items():
-        pixels = gen()
-        png_data = make_png(pixels, SIZE, SIZE)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({len(png_data)} bytes)')
-        total += 1
-    for name, gen in ANIMATED_GENERATORS.items():
-        pixels, w, h = gen()
-        png_data = make_png(pixels, w, h)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({w}x{h}, {len(png_data)} bytes)')
-        total += 1
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            png_data = registry.entry_png(module, name, gen)
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({len(png_data)} bytes)')
+            total += 1
+        for name, gen in ANIMATED_GENERATORS.items():
+            rgba = registry.render_entry(module, name, gen)
+            h, w = rgba.shape[:2]
+            png_data = encode_png(rgba)
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({w}x{h}, {len(png_data)} bytes)')
+            total += 1
     print(f'Generated {total} enemy sprites in {os.path.abspath(OUT_DIR)}')
 
 if __name__ == '__main__':
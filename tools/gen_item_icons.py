@@ -1,53 +1,46 @@
 #!/usr/bin/env python3
-"""Generate pixel-art item icons as 32x32 PNGs using only stdlib."""
+"""Generate pixel-art item icons as 32x32 PNGs.
 
-import struct, zlib, os
+Icons are drawn on palette-indexed canvases (palette.py): colours are
+interned in the 'items' palette and expanded to RGBA only when encoding.
+"""
+
+import math, os, sys
+from functools import partial
+
+import numpy as np
+
+from curves import arc, plot, polar, ring
+from palette import get_palette
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'items')
 SIZE = 32
+PALETTE = get_palette('items')
 
 def hex_to_rgba(h, a=255):
-    h = h.lstrip('#')
-    return (int(h[0:2],16), int(h[2:4],16), int(h[4:6],16), a)
+    return PALETTE.hex(h, a)
 
 def darken(c, f=0.65):
-    return (int(c[0]*f), int(c[1]*f), int(c[2]*f), c[3])
+    return PALETTE.darken(c, f)
 
 def lighten(c, f=1.4):
-    return (min(255,int(c[0]*f)), min(255,int(c[1]*f)), min(255,int(c[2]*f)), c[3])
+    return PALETTE.lighten(c, f)
 
 def blend(c1, c2, t):
-    return (int(c1[0]*(1-t)+c2[0]*t), int(c1[1]*(1-t)+c2[1]*t),
-            int(c1[2]*(1-t)+c2[2]*t), int(c1[3]*(1-t)+c2[3]*t))
+    return PALETTE.blend(c1, c2, t)
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
-    return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
+    return PALETTE.canvas(w, h)
 
 def fill_rect(px, x, y, w, h, c):
-    for dy in range(h):
-        for dx in range(w):
-            py, pxx = y+dy, x+dx
-            if 0 <= py < len(px) and 0 <= pxx < len(px[0]):
-                px[py][pxx] = c
+    px.fill_rect(x, y, w, h, c)
 
 def set_px(px, x, y, c):
-    if 0 <= y < len(px) and 0 <= x < len(px[0]):
-        px[y][x] = c
+    px.set_px(x, y, c)
 
 def draw_border(px, x, y, w, h, c):
     for dx in range(w):
@@ -261,13 +254,9 @@ def draw_bow(px, pal):
     hd_l = lighten(hd)
     string = hex_to_rgba('#ccccaa')
     # Bow limbs (curved)
-    import math
-    for t in range(30):
-        a = -math.pi*0.7 + t * math.pi * 1.4 / 30
-        x = int(12 + 10 * math.cos(a))
-        y = int(15 + 12 * math.sin(a))
-        set_px(px, x, y, hd)
-        set_px(px, x+1, y, hd_l)
+    limb = -math.pi*0.7 + np.arange(30) * math.pi * 1.4 / 30
+    x, y = polar(12, 15, 10, limb, ry=12)
+    plot(px, np.stack([x, x+1], axis=-1), np.stack([y, y], axis=-1), [hd, hd_l] * 30)
     # Metal tips
     set_px(px, 12, 3, m); set_px(px, 13, 3, ml)
     set_px(px, 12, 27, m); set_px(px, 13, 27, ml)
@@ -330,12 +319,7 @@ def draw_shield(px, pal):
     draw_circle(px, 14, 14, 10, ml)
     draw_circle(px, 15, 15, 10, m)
     # Rim
-    import math
-    for t in range(48):
-        a = t * math.pi * 2 / 48
-        x = int(15 + 12 * math.cos(a))
-        y = int(15 + 12 * math.sin(a))
-        set_px(px, x, y, md)
+    ring(px, 15, 15, 12, 48, md)
     # Boss (center)
     draw_circle(px, 15, 15, 3, ac)
     draw_circle(px, 14, 14, 2, lighten(ac))
@@ -433,14 +417,7 @@ def draw_ring(px, pal):
     m = pal_c(pal,'metal'); ml = pal_c(pal,'metal_light'); md = pal_c(pal,'metal_dark')
     ac = pal_c(pal,'accent')
     # Ring circle
-    import math
-    for t in range(48):
-        a = t * math.pi * 2 / 48
-        for r in range(7, 11):
-            x = int(15 + r * math.cos(a))
-            y = int(15 + r * math.sin(a))
-            c = ml if r == 7 else m if r < 10 else md
-            set_px(px, x, y, c)
+    ring(px, 15, 15, range(7, 11), 48, [ml, m, m, md])
     # Gem setting at top
     draw_circle(px, 15, 6, 3, ac)
     draw_circle(px, 14, 5, 2, lighten(ac))
@@ -662,12 +639,7 @@ def gen_mage_hood():
     fill_rect(px, 10, 14, 12, 8, hex_to_rgba('#111111'))
     fill_rect(px, 11, 13, 10, 2, hex_to_rgba('#111111'))
     # Gold trim
-    for t in range(20):
-        import math
-        a = math.pi * 0.3 + t * math.pi * 0.4 / 20
-        x = int(15 + 10 * math.cos(a))
-        y = int(12 + 10 * math.sin(a))
-        set_px(px, x, y, gold)
+    arc(px, 15, 12, 10, math.pi * 0.3 + np.arange(20) * math.pi * 0.4 / 20, gold)
     return px
 
 def gen_mage_robe():
@@ -1374,14 +1346,14 @@ CONSUMABLE_GENERATORS = {
     'mushroom_soup': gen_mushroom_soup, 'cooked_rabbit': gen_cooked_rabbit,
     'rabbit_stew': gen_rabbit_stew,
     'bomb': gen_bomb, 'fire_bomb': gen_fire_bomb, 'frost_bomb': gen_frost_bomb,
-    'grilled_trout': lambda: gen_grilled_fish('#B8763A'),
-    'grilled_carp': lambda: gen_grilled_fish('#DAA520'),
-    'grilled_bass': lambda: gen_grilled_fish('#8B7355'),
-    'grilled_pike': lambda: gen_grilled_fish('#556B2F'),
-    'grilled_eel': lambda: gen_grilled_fish('#4A4A4A'),
-    'grilled_salmon': lambda: gen_grilled_fish('#E9967A'),
-    'grilled_lava_eel': lambda: gen_grilled_fish('#CC4400'),
-    'grilled_fish': lambda: gen_grilled_fish('#B8763A'),
+    'grilled_trout': partial(gen_grilled_fish, '#B8763A'),
+    'grilled_carp': partial(gen_grilled_fish, '#DAA520'),
+    'grilled_bass': partial(gen_grilled_fish, '#8B7355'),
+    'grilled_pike': partial(gen_grilled_fish, '#556B2F'),
+    'grilled_eel': partial(gen_grilled_fish, '#4A4A4A'),
+    'grilled_salmon': partial(gen_grilled_fish, '#E9967A'),
+    'grilled_lava_eel': partial(gen_grilled_fish, '#CC4400'),
+    'grilled_fish': partial(gen_grilled_fish, '#B8763A'),
 }
 
 # Gem colors and tiers
@@ -1391,235 +1363,159 @@ GEM_COLORS = [
 ]
 GEM_TIERS = ['rough', 'flawed', 'clear', 'perfect', 'pristine']
 
-def write_png(name, pixels):
-    png_data = make_png(pixels, SIZE, SIZE)
-    path = os.path.join(OUT_DIR, f'{name}.png')
-    with open(path, 'wb') as f:
-        f.write(png_data)
-    print(f'  {name}.png ({len(png_data)} bytes)')
+# Materials and parts drawn from one colour (or tier) by a shared generator
+NAMED_BOWS = {
+    'dark_oak_bow': '#4A3520', 'pine_bow': '#6B8E23',
+    'fine_wood_bow': '#DEB887', 'frost_bow': '#5dade2',
+    'ashwood_bow': '#8B4513',
+}
 
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    count = 0
-
-    # Templated weapons
-    for item_id, (tmpl, tier) in WEAPON_MAP.items():
-        px = new_canvas()
-        tmpl(px, TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    # Templated armor
-    for item_id, (tmpl, tier) in ARMOR_MAP.items():
-        px = new_canvas()
-        tmpl(px, TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    # Shields
-    for item_id, (tmpl, tier) in SHIELD_MAP.items():
-        px = new_canvas()
-        tmpl(px, TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
+ORES = {
+    'copper_ore': ('#CD7F32', '#DAA06D'), 'tin_ore': ('#C0C0C0', '#E0E0E0'),
+    'iron_ore': ('#555555', '#777777'), 'coal': ('#222222', '#333333'),
+    'silver_ore': ('#C0C0C0', '#FFFFFF'), 'obsidian_shard': ('#2A1A3A', '#6A3A7A'),
+    'flametal_ore': ('#CC4400', '#FF6600'), 'sulfite': ('#CCCC00', '#FFFF44'),
+    'crystal_geode': ('#9b59b6', '#CC99FF'),
+}
 
-    # Rings
-    for item_id, (tmpl, tier) in {**RING_MAP, **SPECIAL_RING_MAP}.items():
-        px = new_canvas()
-        tmpl(px, TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    # Tools
-    for item_id, (tmpl, tier) in TOOL_MAP.items():
-        px = new_canvas()
-        tmpl(px, TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    # Unique items
-    for item_id, gen_func in UNIQUE_GENERATORS.items():
-        px = gen_func()
-        write_png(item_id, px)
-        count += 1
-
-    # Consumables
-    for item_id, gen_func in CONSUMABLE_GENERATORS.items():
-        px = gen_func()
-        write_png(item_id, px)
-        count += 1
-
-    # Named bows
-    named_bows = {
-        'dark_oak_bow': '#4A3520', 'pine_bow': '#6B8E23',
-        'fine_wood_bow': '#DEB887', 'frost_bow': '#5dade2',
-        'ashwood_bow': '#8B4513',
-    }
-    for item_id, wood_hex in named_bows.items():
-        px = gen_named_bow(wood_hex)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Ores
-    ores = {
-        'copper_ore': ('#CD7F32', '#DAA06D'), 'tin_ore': ('#C0C0C0', '#E0E0E0'),
-        'iron_ore': ('#555555', '#777777'), 'coal': ('#222222', '#333333'),
-        'silver_ore': ('#C0C0C0', '#FFFFFF'), 'obsidian_shard': ('#2A1A3A', '#6A3A7A'),
-        'flametal_ore': ('#CC4400', '#FF6600'), 'sulfite': ('#CCCC00', '#FFFF44'),
-        'crystal_geode': ('#9b59b6', '#CC99FF'),
-    }
-    for item_id, (c, v) in ores.items():
-        px = gen_ore(c, v)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Ingots
-    ingots = {
-        'copper_ingot': '#CD7F32', 'tin_ingot': '#C0C0C0', 'bronze_ingot': '#CD7F32',
-        'iron_ingot': '#808080', 'steel_ingot': '#A0A0A0', 'silver_ingot': '#C0C0C0',
-        'obsidian_plate': '#2A1A3A', 'flametal_ingot': '#CC4400',
-    }
-    for item_id, c in ingots.items():
-        px = gen_ingot(c)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Planks
-    planks = {
-        'oak_plank': '#8B6914', 'dark_oak_plank': '#4A3520', 'ancient_plank': '#6B5535',
-    }
-    for item_id, c in planks.items():
-        px = gen_plank(c)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Wood types
-    wood_types = {
-        'dark_oak_log': '#4A3520', 'pine_wood': '#6B8E23', 'fine_wood': '#DEB887',
-        'frost_wood': '#5dade2', 'ashwood_log': '#8B4513', 'ancient_bark': '#5A4A3A',
-    }
-    for item_id, c in wood_types.items():
-        px = new_canvas()
-        w = hex_to_rgba(c); wd = darken(w); wl = lighten(w)
-        fill_rect(px, 6, 8, 20, 16, w)
-        draw_circle(px, 22, 16, 7, wl)
-        draw_circle(px, 22, 16, 5, w)
-        fill_rect(px, 6, 8, 2, 16, wd)
-        fill_rect(px, 6, 8, 16, 1, wd)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Hides
-    hides = {
-        'greyling_hide': '#708090', 'troll_hide': '#2e5e2e', 'cured_leather': '#A0522D',
-        'cured_troll_hide': '#3a7a3a', 'rabbit_pelt': '#C8A870',
-    }
-    for item_id, c in hides.items():
-        px = gen_hide(c)
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Simple items
-    simple_items = {
-        'gold': gen_gold, 'arrow': gen_arrow, 'stick': gen_stick,
-        'wood': gen_wood, 'stone': gen_stone, 'flax': gen_flax,
-        'berries': gen_berries, 'leather_scrap': gen_leather_scrap,
-        'bone_fragment': gen_bone_fragment, 'resin': gen_resin,
-        'mushroom': gen_mushroom, 'thistle': gen_thistle,
-        'blasting_powder': gen_blasting_powder, 'lasso': gen_lasso,
-    }
-    for item_id, gen_func in simple_items.items():
-        px = gen_func()
-        write_png(item_id, px)
-        count += 1
-
-    # Materials - Misc simple items (using basic shapes)
-    misc_items = {
-        'charcoal': '#333333', 'raw_meat': '#cc4444', 'rabbit_meat': '#cc6644',
-        'guck': '#556B2F', 'iron_scrap': '#666666', 'frost_core': '#5dade2',
-        'dragon_scale': '#228B22', 'magma_core': '#FF4400', 'linen_thread': '#F5DEB3',
-        'bronze_nails': '#CD7F32', 'crystal_lens': '#CC99FF', 'arcane_essence': '#9933FF',
-        'greyling_tear': '#5dade2', 'rabbit_foot': '#C8A870',
-    }
-    for item_id, c in misc_items.items():
-        px = new_canvas()
-        color = hex_to_rgba(c)
-        draw_circle(px, 15, 15, 7, color)
-        draw_circle(px, 14, 14, 5, lighten(color))
-        set_px(px, 12, 12, lighten(lighten(color)))
-        write_png(item_id, px)
-        count += 1
-
-    # Fish (raw)
-    fish_items = {
-        'river_trout': '#B8763A', 'golden_carp': '#DAA520', 'lake_bass': '#6B8E6B',
-        'shadow_pike': '#4A4A6A', 'swamp_eel': '#556B2F', 'poison_catfish': '#8B4513',
-        'frost_salmon': '#E9967A', 'lava_eel': '#CC4400',
-    }
-    for item_id, c in fish_items.items():
-        px = gen_raw_fish(c)
-        write_png(item_id, px)
-        count += 1
-
-    # Raw gems
-    for tier_idx, tier_name in enumerate(GEM_TIERS):
-        px = gen_raw_gem(tier_idx)
-        write_png(f'raw_gem_{tier_name}', px)
-        count += 1
+INGOTS = {
+    'copper_ingot': '#CD7F32', 'tin_ingot': '#C0C0C0', 'bronze_ingot': '#CD7F32',
+    'iron_ingot': '#808080', 'steel_ingot': '#A0A0A0', 'silver_ingot': '#C0C0C0',
+    'obsidian_plate': '#2A1A3A', 'flametal_ingot': '#CC4400',
+}
+
+PLANKS = {
+    'oak_plank': '#8B6914', 'dark_oak_plank': '#4A3520', 'ancient_plank': '#6B5535',
+}
+
+WOOD_TYPES = {
+    'dark_oak_log': '#4A3520', 'pine_wood': '#6B8E23', 'fine_wood': '#DEB887',
+    'frost_wood': '#5dade2', 'ashwood_log': '#8B4513', 'ancient_bark': '#5A4A3A',
+}
+
+HIDES = {
+    'greyling_hide': '#708090', 'troll_hide': '#2e5e2e', 'cured_leather': '#A0522D',
+    'cured_troll_hide': '#3a7a3a', 'rabbit_pelt': '#C8A870',
+}
+
+SIMPLE_GENERATORS = {
+    'gold': gen_gold, 'arrow': gen_arrow, 'stick': gen_stick,
+    'wood': gen_wood, 'stone': gen_stone, 'flax': gen_flax,
+    'berries': gen_berries, 'leather_scrap': gen_leather_scrap,
+    'bone_fragment': gen_bone_fragment, 'resin': gen_resin,
+    'mushroom': gen_mushroom, 'thistle': gen_thistle,
+    'blasting_powder': gen_blasting_powder, 'lasso': gen_lasso,
+}
+
+# Misc simple items (using basic shapes)
+MISC_ITEMS = {
+    'charcoal': '#333333', 'raw_meat': '#cc4444', 'rabbit_meat': '#cc6644',
+    'guck': '#556B2F', 'iron_scrap': '#666666', 'frost_core': '#5dade2',
+    'dragon_scale': '#228B22', 'magma_core': '#FF4400', 'linen_thread': '#F5DEB3',
+    'bronze_nails': '#CD7F32', 'crystal_lens': '#CC99FF', 'arcane_essence': '#9933FF',
+    'greyling_tear': '#5dade2', 'rabbit_foot': '#C8A870',
+}
+
+FISH_ITEMS = {
+    'river_trout': '#B8763A', 'golden_carp': '#DAA520', 'lake_bass': '#6B8E6B',
+    'shadow_pike': '#4A4A6A', 'swamp_eel': '#556B2F', 'poison_catfish': '#8B4513',
+    'frost_salmon': '#E9967A', 'lava_eel': '#CC4400',
+}
+
+# Chest items (placeable): body, trim
+CHEST_ITEMS = {
+    'wooden_chest': ('#8B6914', '#888888'),
+    'reinforced_chest': ('#A0782C', '#707070'),
+    'iron_chest': ('#6A6A6A', '#DAA520'),
+    'obsidian_vault': ('#2A1A3A', '#FFD700'),
+}
+
+FISHING_REELS = {
+    'wooden_reel': 0, 'bronze_reel': 1, 'iron_reel': 2, 'silver_reel': 3,
+}
+
+FISHING_LINES = {
+    'hemp_line': '#C8A870', 'silk_line': '#F5F5F5', 'spider_silk_line': '#AAAACC',
+}
+
+FISHING_HOOKS = {
+    'bone_hook': 0, 'bronze_hook': 1, 'barbed_hook': 2,
+}
+
+FISHING_BAITS = {
+    'worm_bait': '#cc6644', 'insect_bait': '#556B2F', 'fish_chunk_bait': '#cc4444',
+}
+
+def gen_templated(tmpl, tier):
+    px = new_canvas()
+    tmpl(px, TIER_PALETTES[tier])
+    return px
 
-    # Cut gems (5 colors x 5 tiers)
+def gen_wood_log(c):
+    px = new_canvas()
+    w = hex_to_rgba(c); wd = darken(w); wl = lighten(w)
+    fill_rect(px, 6, 8, 20, 16, w)
+    draw_circle(px, 22, 16, 7, wl)
+    draw_circle(px, 22, 16, 5, w)
+    fill_rect(px, 6, 8, 2, 16, wd)
+    fill_rect(px, 6, 8, 16, 1, wd)
+    return px
+
+def gen_misc_item(c):
+    px = new_canvas()
+    color = hex_to_rgba(c)
+    draw_circle(px, 15, 15, 7, color)
+    draw_circle(px, 14, 14, 5, lighten(color))
+    set_px(px, 12, 12, lighten(lighten(color)))
+    return px
+
+def gen_tiered(gen, tier):
+    return gen(TIER_PALETTES[tier])
+
+def _registry():
+    """item_id -> zero-argument generator, in the order main() writes them."""
+    gens = {}
+    for table in (WEAPON_MAP, ARMOR_MAP, SHIELD_MAP, RING_MAP, SPECIAL_RING_MAP, TOOL_MAP):
+        for item_id, (tmpl, tier) in table.items():
+            gens[item_id] = partial(gen_templated, tmpl, tier)
+    gens.update(UNIQUE_GENERATORS)
+    gens.update(CONSUMABLE_GENERATORS)
+    gens.update({item_id: partial(gen_named_bow, c) for item_id, c in NAMED_BOWS.items()})
+    gens.update({item_id: partial(gen_ore, c, v) for item_id, (c, v) in ORES.items()})
+    for gen, table in ((gen_ingot, INGOTS), (gen_plank, PLANKS), (gen_wood_log, WOOD_TYPES),
+                       (gen_hide, HIDES)):
+        gens.update({item_id: partial(gen, c) for item_id, c in table.items()})
+    gens.update(SIMPLE_GENERATORS)
+    for gen, table in ((gen_misc_item, MISC_ITEMS), (gen_raw_fish, FISH_ITEMS)):
+        gens.update({item_id: partial(gen, c) for item_id, c in table.items()})
+    for tier_idx, tier_name in enumerate(GEM_TIERS):
+        gens[f'raw_gem_{tier_name}'] = partial(gen_raw_gem, tier_idx)
     for gem_name, gem_color in GEM_COLORS:
         for tier_idx, tier_name in enumerate(GEM_TIERS):
-            px = gen_cut_gem(gem_color, tier_idx)
-            write_png(f'cut_{gem_name}_{tier_name}', px)
-            count += 1
-
-    # Chest items (placeable)
-    chest_items = {
-        'wooden_chest': ('#8B6914', '#888888'),
-        'reinforced_chest': ('#A0782C', '#707070'),
-        'iron_chest': ('#6A6A6A', '#DAA520'),
-        'obsidian_vault': ('#2A1A3A', '#FFD700'),
-    }
-    for item_id, (body, trim) in chest_items.items():
-        px = gen_chest_item(body, trim)
-        write_png(item_id, px)
-        count += 1
-
-    # Fishing parts
-    fishing_reels = {
-        'wooden_reel': 0, 'bronze_reel': 1, 'iron_reel': 2, 'silver_reel': 3,
-    }
-    for item_id, tier in fishing_reels.items():
-        px = gen_reel(TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    fishing_lines = {
-        'hemp_line': '#C8A870', 'silk_line': '#F5F5F5', 'spider_silk_line': '#AAAACC',
-    }
-    for item_id, c in fishing_lines.items():
-        px = gen_line(c)
-        write_png(item_id, px)
-        count += 1
-
-    fishing_hooks = {
-        'bone_hook': 0, 'bronze_hook': 1, 'barbed_hook': 2,
-    }
-    for item_id, tier in fishing_hooks.items():
-        px = gen_hook(TIER_PALETTES[tier])
-        write_png(item_id, px)
-        count += 1
-
-    fishing_baits = {
-        'worm_bait': '#cc6644', 'insect_bait': '#556B2F', 'fish_chunk_bait': '#cc4444',
-    }
-    for item_id, c in fishing_baits.items():
-        px = gen_bait(c)
-        write_png(item_id, px)
-        count += 1
-
-    print(f'\nGenerated {count} item icons in {os.path.abspath(OUT_DIR)}')
+            gens[f'cut_{gem_name}_{tier_name}'] = partial(gen_cut_gem, gem_color, tier_idx)
+    gens.update({item_id: partial(gen_chest_item, b, t) for item_id, (b, t) in CHEST_ITEMS.items()})
+    gens.update({item_id: partial(gen_tiered, gen_reel, t) for item_id, t in FISHING_REELS.items()})
+    gens.update({item_id: partial(gen_line, c) for item_id, c in FISHING_LINES.items()})
+    gens.update({item_id: partial(gen_tiered, gen_hook, t) for item_id, t in FISHING_HOOKS.items()})
+    gens.update({item_id: partial(gen_bait, c) for item_id, c in FISHING_BAITS.items()})
+    return gens
+
+GENERATORS = _registry()
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_item_icons'], png=png)
+
+def write_png(sink, name, gen):
+    png_data = registry.entry_png(sys.modules[__name__], name, gen)
+    sink.put(f'{name}.png', png_data)
+    print(f'  {name}.png ({len(png_data)} bytes)')
+
+def main():
+    with DirectorySink(OUT_DIR) as sink:
+        for item_id, gen in GENERATORS.items():
+            write_png(sink, item_id, gen)
+    print(f'\nGenerated {len(GENERATORS)} item icons in {os.path.abspath(OUT_DIR)}')
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
-"""Generate pixel-art NPC sprites as 32x32 PNGs using only stdlib."""
+"""Generate pixel-art NPC sprites as 32x32 PNGs.
 
-import struct, zlib, os
+The vendor is drawn into named layers (hat, head, body, apron, ... goods)
+of a layers.LayeredCanvas; gen_vendor returns the flattened canvas.
+"""
+
+import os, sys
+
+from layers import LayeredCanvas
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'npcs')
 SIZE = 32
@@ -18,19 +26,6 @@ def lighten(c, f=1.4):
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -194,8 +189,9 @@ def gen_quest_giver():
 
 # ─── VENDOR ───
 # Round/stocky merchant with apron, satchel, friendly mercantile look.
-def gen_vendor():
-    px = new_canvas()
+def vendor_layers():
+    canvas = LayeredCanvas(SIZE, SIZE, new_canvas, mode='replace')
+    px = canvas.layer('hat')
 
     # Palette
     shirt      = hex_to_rgba('#C2955A')   # tan/khaki shirt
@@ -221,6 +217,7 @@ def gen_vendor():
     fill_rect(px, 13, 3, 6, 1, hat_lt)
 
     # --- Head / Face ---
+    px = canvas.layer('head')
     # Rounder face for stocky look (wider)
     fill_rect(px, 12, 6, 8, 5, SKIN)
     # Forehead highlight
@@ -246,6 +243,7 @@ def gen_vendor():
     fill_rect(px, 13, 10, 6, 1, SKIN_DARK)
 
     # --- Body (stocky/round) ---
+    px = canvas.layer('body')
     # Neck
     fill_rect(px, 14, 11, 4, 1, SKIN)
 
@@ -261,6 +259,7 @@ def gen_vendor():
     fill_rect(px, 23, 14, 1, 6, shirt_dk)
 
     # --- Apron (over shirt, front) ---
+    px = canvas.layer('apron')
     fill_rect(px, 11, 13, 10, 9, apron)
     # Apron neck strap
     fill_rect(px, 14, 11, 1, 2, apron_dk)
@@ -277,12 +276,14 @@ def gen_vendor():
     set_px(px, 20, 15, apron_dk)
 
     # --- Belt ---
+    px = canvas.layer('belt')
     fill_rect(px, 8, 21, 16, 1, belt_col)
     # Belt buckle
     set_px(px, 15, 21, hex_to_rgba('#C8A84E'))
     set_px(px, 16, 21, hex_to_rgba('#C8A84E'))
 
     # --- Arms ---
+    px = canvas.layer('arms')
     # Left arm
     fill_rect(px, 6, 12, 3, 8, shirt)
     fill_rect(px, 6, 12, 1, 8, shirt_lt)
@@ -298,6 +299,7 @@ def gen_vendor():
     set_px(px, 25, 21, SKIN_DARK)
 
     # --- Satchel (on right hip) ---
+    px = canvas.layer('satchel')
     fill_rect(px, 23, 15, 5, 7, satchel)
     fill_rect(px, 23, 15, 5, 1, satchel_lt)
     fill_rect(px, 23, 21, 5, 1, satchel_dk)
@@ -310,6 +312,7 @@ def gen_vendor():
     fill_rect(px, 23, 12, 1, 3, satchel_dk)
 
     # --- Pants ---
+    px = canvas.layer('pants')
     fill_rect(px, 9, 22, 14, 5, pants)
     fill_rect(px, 8, 22, 1, 5, pants_lt)
     # Leg separation
@@ -320,12 +323,14 @@ def gen_vendor():
     fill_rect(px, 21, 22, 2, 5, pants_dk)
 
     # --- Feet/Boots ---
+    px = canvas.layer('feet')
     fill_rect(px, 9, 27, 5, 3, SHOE_BROWN)
     fill_rect(px, 18, 27, 5, 3, SHOE_BROWN)
     fill_rect(px, 9, 27, 5, 1, lighten(SHOE_BROWN, 1.3))
     fill_rect(px, 18, 27, 5, 1, lighten(SHOE_BROWN, 1.3))
 
     # --- Small goods display (in left hand) ---
+    px = canvas.layer('goods')
     # A small pouch/bag of wares
     fill_rect(px, 3, 18, 4, 4, hex_to_rgba('#A67C52'))
     fill_rect(px, 3, 18, 4, 1, lighten(hex_to_rgba('#A67C52'), 1.3))
@@ -334,7 +339,11 @@ def gen_vendor():
     set_px(px, 5, 17, hex_to_rgba('#CC3333'))
     set_px(px, 4, 16, hex_to_rgba('#EE4444'))
 
-    return px
+    return canvas
+
+
+def gen_vendor():
+    return vendor_layers().rows()
 
 
 # ─── GUARD ───
@@ -620,15 +629,17 @@ GENERATORS = {
     'citizen': gen_citizen,
 }
 
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_npc_sprites'], png=png)
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    for name, gen in GENERATORS.items():
-        pixels = gen()
-        png_data = make_png(pixels, SIZE, SIZE)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({len(png_data)} bytes)')
+    module = sys.modules[__name__]
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            png_data = registry.entry_png(module, name, gen)
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({len(png_data)} bytes)')
     print(f'Generated {len(GENERATORS)} NPC sprites in {os.path.abspath(OUT_DIR)}')
 
 if __name__ == '__main__':
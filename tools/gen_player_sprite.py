@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
-"""Generate grayscale player base sprite as 32x32 PNG using only stdlib."""
+"""Generate grayscale player base sprite as 32x32 PNG."""
 
-import struct, zlib, os
+import os, sys
+
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt')
 SIZE = 32
@@ -11,19 +14,6 @@ TRANSPARENT = (0,0,0,0)
 def gray(v, a=255):
     return (v, v, v, a)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -318,13 +308,20 @@ def gen_player():
     return px
 
 
+GENERATORS = {
+    'player': gen_player,
+}
+
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_player_sprite'], png=png)
+
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    pixels = gen_player()
-    png_data = make_png(pixels, SIZE, SIZE)
-    path = os.path.join(OUT_DIR, 'player.png')
-    with open(path, 'wb') as f:
-        f.write(png_data)
+    png_data = registry.entry_png(sys.modules[__name__], 'player', GENERATORS['player'])
+    with DirectorySink(OUT_DIR) as sink:
+        sink.put('player.png', png_data)
     print(f'  player.png ({len(png_data)} bytes)')
     print(f'Generated player sprite in {os.path.abspath(OUT_DIR)}')
 
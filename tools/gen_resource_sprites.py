@@ -1,12 +1,33 @@
 #!/usr/bin/env python3
-"""Generate 64x64 resource node sprites using pycairo. Transparent backgrounds."""
+"""Generate 64x64 resource node sprites using pycairo. Transparent backgrounds.
 
-import cairo
+With --variants N, also renders variants 1..N-1 of every node from their own
+RNG streams into tileArt/variants/resources/<id>.png strips (variant 0 is the
+regular sprite).
+
+The committed tileArt/resources PNGs predate the rng.py streams and are
+listed in registry.HAND_DRAWN until they are re-rendered with main().
+"""
+
+import argparse
 import os
+import sys
 import math
-import random
+
+import numpy as np
+
+from lazy import lazy_import
+from pngio import encode_png
+from rng import sprite_rng
+import registry
+from sinks import DirectorySink
+
+# pycairo is imported when the first node is drawn
+cairo = lazy_import('cairo')
 
 OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tileArt', 'resources')
+VARIANT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tileArt', 'variants',
+                           'resources')
 SIZE = 64
 CX = SIZE / 2
 CY = SIZE / 2
@@ -35,9 +56,18 @@ def lighten(r, g, b, f=0.3):
     return r + (1 - r) * f, g + (1 - g) * f, b + (1 - b) * f
 
 
+_rng = sprite_rng('gen_resource_sprites', '')
+_variant = 0
+
+
 def seed_rng(name):
-    """Seed random from resource name for deterministic output."""
-    random.seed(hash(name) & 0xFFFFFFFF)
+    """Switch to the resource's own rng.py stream for deterministic output."""
+    global _rng
+    _rng = sprite_rng('gen_resource_sprites', name, _variant)
+
+
+def rand():
+    return _rng.random()
 
 
 # ── Shared drawing helpers ─────────────────────────────────────────────
@@ -47,13 +77,13 @@ def draw_irregular_rock(ctx, cx, cy, radius, points=8, jitter=0.25):
     angles = []
     for i in range(points):
         a = (i / points) * 2 * math.pi - math.pi / 2
-        a += (random.random() - 0.5) * 0.3
+        a += (rand() - 0.5) * 0.3
         angles.append(a)
     angles.sort()
 
     verts = []
     for a in angles:
-        r = radius * (1 + (random.random() - 0.5) * jitter * 2)
+        r = radius * (1 + (rand() - 0.5) * jitter * 2)
         verts.append((cx + r * math.cos(a), cy + r * math.sin(a)))
 
     ctx.move_to(*verts[0])
@@ -67,20 +97,20 @@ def draw_ore_veins(ctx, cx, cy, radius, ore_color, num_veins=3):
     """Draw colored ore vein streaks inside a rock shape."""
     r, g, b = ore_color
     for _ in range(num_veins):
-        angle = random.random() * 2 * math.pi
-        dist = random.random() * radius * 0.6
+        angle = rand() * 2 * math.pi
+        dist = rand() * radius * 0.6
         sx = cx + dist * math.cos(angle)
         sy = cy + dist * math.sin(angle)
-        length = radius * (0.3 + random.random() * 0.4)
-        end_angle = angle + (random.random() - 0.5) * 1.2
+        length = radius * (0.3 + rand() * 0.4)
+        end_angle = angle + (rand() - 0.5) * 1.2
         ex = sx + length * math.cos(end_angle)
         ey = sy + length * math.sin(end_angle)
 
-        ctx.set_source_rgba(r, g, b, 0.7 + random.random() * 0.3)
-        ctx.set_line_width(2 + random.random() * 2)
+        ctx.set_source_rgba(r, g, b, 0.7 + rand() * 0.3)
+        ctx.set_line_width(2 + rand() * 2)
         ctx.move_to(sx, sy)
-        mid_x = (sx + ex) / 2 + (random.random() - 0.5) * 8
-        mid_y = (sy + ey) / 2 + (random.random() - 0.5) * 8
+        mid_x = (sx + ex) / 2 + (rand() - 0.5) * 8
+        mid_y = (sy + ey) / 2 + (rand() - 0.5) * 8
         ctx.curve_to(mid_x, mid_y, mid_x, mid_y, ex, ey)
         ctx.stroke()
 
@@ -108,9 +138,9 @@ def draw_cave_overlay(ctx):
     # Stalactite-like shadows at top
     ctx.set_source_rgba(0.1, 0.1, 0.15, 0.3)
     for i in range(3):
-        x = 12 + i * 18 + random.random() * 6
-        w = 4 + random.random() * 4
-        h = 6 + random.random() * 6
+        x = 12 + i * 18 + rand() * 6
+        w = 4 + rand() * 4
+        h = 6 + rand() * 6
         ctx.move_to(x, 0)
         ctx.line_to(x + w, 0)
         ctx.line_to(x + w / 2, h)
@@ -146,9 +176,9 @@ def gen_wood_oak():
 
     # Canopy highlights
     for _ in range(6):
-        hx = CX + (random.random() - 0.5) * 28
-        hy = 28 + (random.random() - 0.5) * 28
-        hr = 4 + random.random() * 6
+        hx = CX + (rand() - 0.5) * 28
+        hy = 28 + (rand() - 0.5) * 28
+        hr = 4 + rand() * 6
         ctx.set_source_rgba(0.35, 0.58, 0.22, 0.5)
         ctx.arc(hx, hy, hr, 0, 2 * math.pi)
         ctx.fill()
@@ -242,9 +272,9 @@ def gen_wood_dark_oak():
 
     # Canopy depth
     for _ in range(5):
-        hx = CX + (random.random() - 0.5) * 36
-        hy = 26 + (random.random() - 0.5) * 26
-        hr = 3 + random.random() * 5
+        hx = CX + (rand() - 0.5) * 36
+        hy = 26 + (rand() - 0.5) * 26
+        hr = 3 + rand() * 5
         ctx.set_source_rgba(0.15, 0.18, 0.05, 0.4)
         ctx.arc(hx, hy, hr, 0, 2 * math.pi)
         ctx.fill()
@@ -296,9 +326,9 @@ def gen_ancient_tree():
 
     # Moss/lichen highlights
     for _ in range(8):
-        hx = CX + (random.random() - 0.5) * 40
-        hy = 22 + (random.random() - 0.5) * 28
-        hr = 3 + random.random() * 5
+        hx = CX + (rand() - 0.5) * 40
+        hy = 22 + (rand() - 0.5) * 28
+        hr = 3 + rand() * 5
         ctx.set_source_rgba(0.22, 0.35, 0.12, 0.4)
         ctx.arc(hx, hy, hr, 0, 2 * math.pi)
         ctx.fill()
@@ -338,9 +368,9 @@ def gen_frost_pine():
     # Frost/snow patches
     ctx.set_source_rgba(0.85, 0.92, 0.95, 0.5)
     for _ in range(8):
-        fx = CX + (random.random() - 0.5) * 24
-        fy = 14 + random.random() * 30
-        fr = 2 + random.random() * 3
+        fx = CX + (rand() - 0.5) * 24
+        fy = 14 + rand() * 30
+        fr = 2 + rand() * 3
         ctx.arc(fx, fy, fr, 0, 2 * math.pi)
         ctx.fill()
 
@@ -348,8 +378,8 @@ def gen_frost_pine():
     ctx.set_source_rgba(0.7, 0.85, 0.95, 0.6)
     ctx.set_line_width(1)
     for _ in range(3):
-        sx = CX + (random.random() - 0.5) * 18
-        sy = 16 + random.random() * 24
+        sx = CX + (rand() - 0.5) * 18
+        sy = 16 + rand() * 24
         for a in range(3):
             angle = a * math.pi * 2 / 3
             ex = sx + 3 * math.cos(angle)
@@ -382,10 +412,10 @@ def _gen_rock_base(name, rock_color, ore_color=None, num_veins=3,
 
     # Rock texture noise
     for _ in range(15):
-        nx = CX + (random.random() - 0.5) * 32
-        ny = CY + 4 + (random.random() - 0.5) * 32
-        ns = 1 + random.random() * 2
-        shade = (random.random() - 0.5) * 0.15
+        nx = CX + (rand() - 0.5) * 32
+        ny = CY + 4 + (rand() - 0.5) * 32
+        ns = 1 + rand() * 2
+        shade = (rand() - 0.5) * 0.15
         ctx.set_source_rgba(rr + shade, rg + shade, rb + shade, 0.4)
         ctx.arc(nx, ny, ns, 0, 2 * math.pi)
         ctx.fill()
@@ -435,8 +465,8 @@ def gen_silver_vein():
     def silver_sparkle(ctx):
         ctx.set_source_rgba(0.95, 0.95, 1.0, 0.6)
         for _ in range(4):
-            sx = CX + (random.random() - 0.5) * 24
-            sy = CY + 4 + (random.random() - 0.5) * 24
+            sx = CX + (rand() - 0.5) * 24
+            sy = CY + 4 + (rand() - 0.5) * 24
             ctx.arc(sx, sy, 1.5, 0, 2 * math.pi)
             ctx.fill()
     return _gen_rock_base('silver_vein', '#808080', ore_color='#c0c0c0', num_veins=4,
@@ -585,7 +615,7 @@ def gen_loose_stone():
         ctx.fill()
 
         # Pebble
-        shade = 0.5 + random.random() * 0.2
+        shade = 0.5 + rand() * 0.2
         ctx.set_source_rgb(shade, shade, shade)
         ctx.arc(px, py, pr, 0, 2 * math.pi)
         ctx.fill()
@@ -618,17 +648,17 @@ def gen_berry_bush():
 
     # Leaf highlights
     for _ in range(6):
-        lx = CX + (random.random() - 0.5) * 24
-        ly = CY + (random.random() - 0.5) * 22
-        lr = 3 + random.random() * 4
+        lx = CX + (rand() - 0.5) * 24
+        ly = CY + (rand() - 0.5) * 22
+        lr = 3 + rand() * 4
         ctx.set_source_rgba(0.3, 0.55, 0.2, 0.4)
         ctx.arc(lx, ly, lr, 0, 2 * math.pi)
         ctx.fill()
 
     # Berries
     for _ in range(7):
-        bx = CX + (random.random() - 0.5) * 22
-        by = CY + (random.random() - 0.5) * 20
+        bx = CX + (rand() - 0.5) * 22
+        by = CY + (rand() - 0.5) * 20
         ctx.set_source_rgb(0.75, 0.15, 0.15)
         ctx.arc(bx, by, 2.5, 0, 2 * math.pi)
         ctx.fill()
@@ -655,7 +685,7 @@ def gen_flax_plant():
 
         # Blue flower at top
         fx = sx + sway * 0.5
-        fy = 13 + random.random() * 3
+        fy = 13 + rand() * 3
         ctx.set_source_rgba(0.4, 0.5, 0.85, 0.8)
         ctx.arc(fx, fy, 3, 0, 2 * math.pi)
         ctx.fill()
@@ -696,8 +726,8 @@ def gen_mushroom_cluster():
 
         # Cap spots
         for _ in range(3):
-            sx = mx + (random.random() - 0.5) * cap_r
-            sy = cap_y - random.random() * cap_r * 0.4
+            sx = mx + (rand() - 0.5) * cap_r
+            sy = cap_y - rand() * cap_r * 0.4
             ctx.set_source_rgba(1, 1, 0.9, 0.5)
             ctx.arc(sx, sy, 1.5, 0, 2 * math.pi)
             ctx.fill()
@@ -867,9 +897,9 @@ def gen_charred_bone_pile():
     # Char/ash overlay
     ctx.set_source_rgba(0, 0, 0, 0.15)
     for _ in range(8):
-        ax = CX + (random.random() - 0.5) * 30
-        ay = CY + (random.random() - 0.5) * 20
-        ar = 2 + random.random() * 3
+        ax = CX + (rand() - 0.5) * 30
+        ay = CY + (rand() - 0.5) * 20
+        ar = 2 + rand() * 3
         ctx.arc(ax, ay, ar, 0, 2 * math.pi)
         ctx.fill()
 
@@ -897,10 +927,10 @@ def _gen_cave_rock(name, rock_color, ore_color, num_veins=3, glow_color=None):
 
     # Rock texture
     for _ in range(12):
-        nx = CX + (random.random() - 0.5) * 28
-        ny = CY + 4 + (random.random() - 0.5) * 28
-        ns = 1 + random.random() * 2
-        shade = (random.random() - 0.5) * 0.1
+        nx = CX + (rand() - 0.5) * 28
+        ny = CY + 4 + (rand() - 0.5) * 28
+        ns = 1 + rand() * 2
+        shade = (rand() - 0.5) * 0.1
         ctx.set_source_rgba(rr + shade, rg + shade, rb + shade, 0.35)
         ctx.arc(nx, ny, ns, 0, 2 * math.pi)
         ctx.fill()
@@ -1071,15 +1101,60 @@ RESOURCES = {
 }
 
 
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    for name, gen_func in RESOURCES.items():
-        surface = gen_func()
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        surface.write_to_png(path)
-        print(f'  {name}.png')
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_resource_sprites'], png=png)
+
+
+# ── Variants ──────────────────────────────────────────────────────────
+
+def surfaces_to_rgba(surfaces):
+    """Stack ARGB32 surfaces into one [N, SIZE, SIZE, 4] straight-alpha RGBA array."""
+    for surface in surfaces:
+        surface.flush()
+    bgra = np.stack([np.ndarray((SIZE, SIZE, 4), np.uint8, s.get_data(), strides=(s.get_stride(), 4, 1))
+                     for s in surfaces])
+    alpha = bgra[..., 3:4].astype(np.float32)
+    rgb = bgra[..., 2::-1] * 255.0 / np.maximum(alpha, 1)   # un-premultiply, BGR -> RGB
+    out = np.empty_like(bgra)
+    out[..., :3] = np.clip(np.rint(rgb), 0, 255)
+    out[..., 3] = bgra[..., 3]
+    return out
+
+
+def render_variants(gen_func, count):
+    """Variants 1..count-1 of one resource, side by side in a [SIZE, (count-1) * SIZE, 4] strip."""
+    global _variant
+    surfaces = []
+    try:
+        for variant in range(1, count):
+            _variant = variant
+            surfaces.append(gen_func())
+    finally:
+        _variant = 0
+    stack = surfaces_to_rgba(surfaces)
+    return stack.transpose(1, 0, 2, 3).reshape(SIZE, len(surfaces) * SIZE, 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate resource node sprites.')
+    parser.add_argument('--variants', type=int, default=1,
+                        help='also write N-1 seeded variants per node to tileArt/variants/resources/')
+    args = parser.parse_args(argv)
+
+    module = sys.modules[__name__]
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen_func in RESOURCES.items():
+            sink.put(f'{name}.png', registry.surface_png(module, name, gen_func))
+            print(f'  {name}.png')
     print(f'\nGenerated {len(RESOURCES)} resource sprites in {os.path.abspath(OUT_DIR)}')
 
+    if args.variants > 1:
+        with DirectorySink(VARIANT_DIR) as sink:
+            for name, gen_func in RESOURCES.items():
+                sink.put(f'{name}.png', encode_png(render_variants(gen_func, args.variants)))
+        print(f'Generated {args.variants - 1} variants of each in {os.path.abspath(VARIANT_DIR)}')
+
 
 if __name__ == '__main__':
     main()
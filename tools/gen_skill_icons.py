@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
-"""Generate pixel-art skill icons as 32x32 PNGs using only stdlib."""
+"""Generate pixel-art skill icons as 32x32 PNGs.
 
-import struct, zlib, os
+Also prebakes each icon's UI states with NumPy: a desaturated disabled icon
+and a clockwise cooldown-sweep sheet of COOLDOWN_STEPS frames.
+"""
+
+import math, os, sys
+
+import numpy as np
+
+from curves import arc, ring, spiral
+from pngio import encode_png
+from postfx import desaturate, sweep_masks
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'skills')
+DISABLED_DIR = os.path.join(OUT_DIR, 'disabled')
+COOLDOWN_DIR = os.path.join(OUT_DIR, 'cooldown')
 SIZE = 32
+COOLDOWN_STEPS = 12  # must match client/entities/SkillSprites.js
 
 def hex_to_rgba(h, a=255):
     h = h.lstrip('#')
@@ -22,19 +37,6 @@ def blend(c1, c2, t):
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -159,19 +161,9 @@ def gen_precision_strike():
     orange_l = lighten(orange)
     white = hex_to_rgba('#ffffff', 200)
     # Outer ring
-    for angle_idx in range(32):
-        import math
-        a = angle_idx * math.pi * 2 / 32
-        x = int(15 + 10 * math.cos(a))
-        y = int(15 + 10 * math.sin(a))
-        set_px(px, x, y, orange)
+    ring(px, 15, 15, 10, 32, orange)
     # Inner ring
-    for angle_idx in range(20):
-        import math
-        a = angle_idx * math.pi * 2 / 20
-        x = int(15 + 5 * math.cos(a))
-        y = int(15 + 5 * math.sin(a))
-        set_px(px, x, y, orange)
+    ring(px, 15, 15, 5, 20, orange)
     # Crosshair lines
     draw_line(px, 15, 3, 15, 10, orange_l)
     draw_line(px, 15, 20, 15, 27, orange_l)
@@ -241,20 +233,10 @@ def gen_cleave():
     orange_d = darken(orange)
     white = hex_to_rgba('#ffffff', 180)
     # Sweeping arc blade
-    import math
-    for t in range(40):
-        a = math.pi * 0.2 + t * math.pi * 0.6 / 40
-        for r in range(10, 14):
-            x = int(15 + r * math.cos(a))
-            y = int(15 + r * math.sin(a))
-            c = orange_l if r == 13 else orange if r > 10 else orange_d
-            set_px(px, x, y, c)
+    sweep = math.pi * 0.2 + np.arange(40) * math.pi * 0.6 / 40
+    arc(px, 15, 15, range(10, 14), sweep, [orange_d, orange, orange, orange_l])
     # Arc trail (white edge)
-    for t in range(40):
-        a = math.pi * 0.2 + t * math.pi * 0.6 / 40
-        x = int(15 + 13 * math.cos(a))
-        y = int(15 + 13 * math.sin(a))
-        set_px(px, x, y, white)
+    arc(px, 15, 15, 13, sweep, white)
     # Motion lines from center
     draw_line(px, 15, 15, 8, 8, hex_to_rgba('#e67e22', 120))
     draw_line(px, 15, 15, 6, 16, hex_to_rgba('#e67e22', 120))
@@ -277,15 +259,9 @@ def gen_war_cry():
     set_px(px, 13, 12, hex_to_rgba('#ffffff'))
     set_px(px, 17, 12, hex_to_rgba('#ffffff'))
     # Sound waves (arcs to the right)
-    import math
-    for wave in range(3):
-        r = 6 + wave * 4
-        for t in range(12):
-            a = -math.pi/3 + t * math.pi * 2/3 / 12
-            x = int(20 + r * math.cos(a))
-            y = int(15 + r * math.sin(a))
-            c = yellow_l if wave == 0 else yellow if wave == 1 else orange
-            set_px(px, x, y, c)
+    sweep = -math.pi/3 + np.arange(12) * math.pi * 2/3 / 12
+    for r, c in ((6, yellow_l), (10, yellow), (14, orange)):
+        arc(px, 20, 15, r, sweep, c)
     return px
 
 def gen_iron_skin():
@@ -317,16 +293,7 @@ def gen_whirlwind():
     purple_l = lighten(purple)
     purple_d = darken(purple)
     # Spinning blade lines (spiral)
-    import math
-    for arm in range(3):
-        offset = arm * math.pi * 2 / 3
-        for t in range(20):
-            r = 2 + t * 0.55
-            a = offset + t * 0.3
-            x = int(15 + r * math.cos(a))
-            y = int(15 + r * math.sin(a))
-            c = purple_l if t < 7 else purple if t < 14 else purple_d
-            set_px(px, x, y, c)
+    spiral(px, 15, 15, 2, 0.55, 0.3, 20, [purple_l] * 7 + [purple] * 7 + [purple_d] * 6, arms=3)
     # Center glow
     draw_circle(px, 15, 15, 2, lighten(purple, 1.6))
     set_px(px, 15, 15, hex_to_rgba('#ffffff', 200))
@@ -431,13 +398,7 @@ def gen_life_steal():
     # Heart highlight
     draw_circle(px, 11, 12, 2, purple_l)
     # Incoming drain swirl lines
-    import math
-    for t in range(25):
-        a = t * 0.4
-        r = 14 - t * 0.4
-        x = int(15 + r * math.cos(a))
-        y = int(15 + r * math.sin(a))
-        set_px(px, x, y, red)
+    spiral(px, 15, 15, 14, -0.4, 0.4, 25, red)
     return px
 
 def gen_shadow_step():
@@ -921,15 +882,7 @@ def gen_ice_nova():
     ice_l = hex_to_rgba('#5dade2')
     white = hex_to_rgba('#ddeeff')
     # Expanding rings
-    import math
-    for ring in range(3):
-        r = 4 + ring * 4
-        for t in range(32):
-            a = t * math.pi * 2 / 32
-            x = int(15 + r * math.cos(a))
-            y = int(15 + r * math.sin(a))
-            c = white if ring == 0 else ice_l if ring == 1 else ice
-            set_px(px, x, y, c)
+    ring(px, 15, 15, [4, 8, 12], 32, [white, ice_l, ice])
     # Crystal points at cardinal directions
     for dx, dy in [(0,-12),(0,12),(-12,0),(12,0)]:
         set_px(px, 15+dx, 15+dy, white)
@@ -1194,16 +1147,41 @@ GENERATORS = {
     'dash': gen_dash,
 }
 
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_skill_icons'], png=png)
+
+# ─── UI STATES ───
+
+def gen_state_variants(icons, steps=COOLDOWN_STEPS):
+    """Disabled icons and cooldown sheets for {name: pixels}, in one pass over the stack.
+
+    Frame i of a sheet shows the icon with the part the sweep has not reached
+    yet (i / steps of a turn from 12 o'clock, clockwise) in the disabled look.
+    Returns {name: (disabled [32, 32, 4], sheet [32, 32 * steps, 4])}.
+    """
+    names = list(icons)
+    stack = np.array([icons[n] for n in names], dtype=np.uint8)        # [S, 32, 32, 4]
+    disabled = desaturate(stack, amount=1.0, value=0.55)
+    covered = sweep_masks(SIZE, SIZE, steps, cx=15, cy=15)              # [N, 32, 32], icon_bg centre
+    frames = np.where(covered[None, ..., None], disabled[:, None], stack[:, None])
+    sheets = frames.transpose(0, 2, 1, 3, 4).reshape(len(names), SIZE, steps * SIZE, 4)
+    return {n: (disabled[i], sheets[i]) for i, n in enumerate(names)}
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    for name, gen in GENERATORS.items():
-        pixels = gen()
-        png_data = make_png(pixels, SIZE, SIZE)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({len(png_data)} bytes)')
+    module = sys.modules[__name__]
+    icons = {}
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            icons[name] = registry.render_entry(module, name, gen)
+            png_data = encode_png(icons[name])
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({len(png_data)} bytes)')
+        for name, (disabled, sheet) in gen_state_variants(icons).items():
+            sink.put(f'disabled/{name}.png', encode_png(disabled))
+            sink.put(f'cooldown/{name}.png', encode_png(sheet))
     print(f'Generated {len(GENERATORS)} skill icons in {os.path.abspath(OUT_DIR)}')
+    print(f'  + disabled/ icons and {COOLDOWN_STEPS}-frame cooldown/ sheets')
 
 if __name__ == '__main__':
     main()
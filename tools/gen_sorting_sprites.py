@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Generate pixel-art sorting minigame sprites as 32x32 PNGs."""
 
-import struct, zlib, os
+import os, sys
+from functools import partial
+
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'sorting')
 SIZE = 32
@@ -18,19 +22,6 @@ def lighten(c, f=1.4):
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -219,11 +210,9 @@ def gen_delicate(variant):
     px = new_canvas()
     box_c = hex_to_rgba(DELICATE_COLORS[variant][0])
     mark_c = hex_to_rgba(DELICATE_COLORS[variant][1])
-    dark = darken(box_c, 0.55)
 
-    # Box body
-    fill_rect(px, 4, 6, 24, 22, box_c)
-    draw_border(px, 4, 6, 24, 22, dark)
+    # Box body; its dark border is the outline pass declared in POSTFX
+    fill_rect(px, 5, 7, 22, 20, box_c)
 
     # Bubble wrap texture (small circles pattern)
     bubble = lighten(box_c, 1.2)
@@ -266,26 +255,33 @@ def gen_delicate(variant):
 # GENERATE ALL SPRITES
 # ═══════════════════════════════════════════════════════
 
+VARIANTS = 5
+
+POSTFX = {
+    f'delicate_{v}': [('outline', {'color': darken(hex_to_rgba(box_hex), 0.55), 'corners': True})]
+    for v, (box_hex, _) in enumerate(DELICATE_COLORS)
+}
+
+GENERATORS = {
+    f'{name}_{v}': partial(gen_fn, v)
+    for name, gen_fn in (('letter', gen_letter), ('box', gen_box),
+                         ('parcel', gen_parcel), ('delicate', gen_delicate))
+    for v in range(VARIANTS)
+}
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_sorting_sprites'], png=png)
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-
-    generators = {
-        'letter': gen_letter,
-        'box': gen_box,
-        'parcel': gen_parcel,
-        'delicate': gen_delicate,
-    }
-
-    for name, gen_fn in generators.items():
-        for v in range(5):
-            px = gen_fn(v)
-            data = make_png(px, SIZE, SIZE)
-            path = os.path.join(OUT_DIR, f'{name}_{v}.png')
-            with open(path, 'wb') as f:
-                f.write(data)
-            print(f'  {name}_{v}.png')
-
-    print(f'\nGenerated {4 * 5} sorting sprites in {OUT_DIR}')
+    module = sys.modules[__name__]
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            data = registry.entry_png(module, name, gen)
+            sink.put(f'{name}.png', data)
+            print(f'  {name}.png')
+
+    print(f'\nGenerated {len(GENERATORS)} sorting sprites in {OUT_DIR}')
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
-"""Generate pixel-art station sprites as 32x32 PNGs using only stdlib."""
+"""Generate pixel-art station sprites as 32x32 PNGs.
 
-import struct, zlib, os
+forge_layers() keeps the forge's stone body, fire pit, bellows, anvil and
+hammer on separate layers.LayeredCanvas layers, e.g. to swap the fire.
+"""
+
+import os, sys
+
+from layers import LayeredCanvas
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'stations')
 SIZE = 32  # pixels
@@ -21,22 +29,6 @@ def blend(c1, c2, t):
 
 TRANSPARENT = (0,0,0,0)
 
-def make_png(pixels, w, h):
-    """Create a PNG file from a 2D list of (r,g,b,a) tuples."""
-    def chunk(ctype, data):
-        c = ctype + data
-        return struct.pack('>I', len(data)) + c + struct.pack('>I', zlib.crc32(c) & 0xffffffff)
-
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'  # filter: none
-        for r,g,b,a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)  # 8-bit RGBA
-    return sig + chunk(b'IHDR', ihdr) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -158,8 +150,9 @@ def gen_furnace():
     return px
 
 # ─── FORGE ───
-def gen_forge():
-    px = new_canvas()
+def forge_layers():
+    canvas = LayeredCanvas(SIZE, SIZE, new_canvas, mode='replace')
+    px = canvas.layer('body')
     stone = hex_to_rgba('#4A4A4A')
     stone_dark = darken(stone)
     stone_light = lighten(stone, 1.3)
@@ -179,17 +172,20 @@ def gen_forge():
             set_px(px, x+1, y, stone_dark)
 
     # Fire pit (center)
+    px = canvas.layer('fire')
     fill_rect(px, 8, 12, 10, 8, hex_to_rgba('#222222'))
     fill_rect(px, 9, 14, 8, 5, fire)
     fill_rect(px, 10, 15, 6, 3, fire_y)
     fill_rect(px, 11, 16, 4, 1, ember)
 
     # Bellows (right side)
+    px = canvas.layer('bellows')
     fill_rect(px, 20, 13, 7, 6, hex_to_rgba('#8B6914'))
     fill_rect(px, 20, 13, 7, 1, lighten(hex_to_rgba('#8B6914')))
     fill_rect(px, 22, 15, 3, 2, hex_to_rgba('#666666'))
 
     # Anvil on top
+    px = canvas.layer('anvil')
     fill_rect(px, 6, 5, 14, 5, iron)
     fill_rect(px, 4, 7, 3, 3, iron)      # horn left
     fill_rect(px, 19, 7, 4, 3, iron)     # horn right
@@ -197,10 +193,14 @@ def gen_forge():
     fill_rect(px, 9, 3, 8, 2, lighten(iron)) # flat top
 
     # Hammer resting
+    px = canvas.layer('hammer')
     fill_rect(px, 22, 3, 2, 6, hex_to_rgba('#8B6914'))
     fill_rect(px, 20, 2, 6, 2, hex_to_rgba('#888888'))
 
-    return px
+    return canvas
+
+def gen_forge():
+    return forge_layers().rows()
 
 # ─── COOKING FIRE ───
 def gen_cooking_fire():
@@ -722,15 +722,17 @@ GENERATORS = {
     'fish_smoker': gen_fish_smoker,
 }
 
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_station_sprites'], png=png)
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    for name, gen in GENERATORS.items():
-        pixels = gen()
-        png_data = make_png(pixels, SIZE, SIZE)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({len(png_data)} bytes)')
+    module = sys.modules[__name__]
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            png_data = registry.entry_png(module, name, gen)
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({len(png_data)} bytes)')
     print(f'Generated {len(GENERATORS)} sprites in {os.path.abspath(OUT_DIR)}')
 
 if __name__ == '__main__':
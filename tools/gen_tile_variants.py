@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Generate extra seeded variants of every autotile texture.
+
+Covers the terrain textures of scripts/generateTileArt.js and the town
+textures of gen_town_tiles.py. The per-pixel patterns are re-expressed as
+NumPy expressions over a [N, 3, 3, 32, 32] grid (variant, sub-tile row,
+sub-tile column, y, x), so all variants of a texture are one pass. Each
+pixel draws a fixed number of values from its variant's mulberry32 stream
+(see rng.py) instead of the scripts' data-dependent draw order, so the
+variants are new textures in the same style, not copies of the originals.
+Lava, swamp, snow and ice also layer seamless coherent noise (noise.py)
+over each sub-tile, with one permutation table per variant.
+
+Variants 1..N-1 of tileArt/<name>.png are written side by side to
+tileArt/variants/<name>.png; the original texture stays variant 0. The
+atlas stage splits the strip into '<name>#<i>' entries.
+
+Usage:
+    python tools/gen_tile_variants.py [--count 16]
+"""
+
+import argparse
+import os
+import time
+from functools import partial
+
+import numpy as np
+
+from gen_town_tiles import TOWN_TILES
+from noise import domain_warp, fbm, permutation, value2
+from pngio import encode_png
+from rng import mulberry32, stable_seed
+import registry
+from sinks import DirectorySink
+
+TILE = 32          # individual sub-tile size
+GRID = 3           # 3x3 sub-tile grid
+SIZE = TILE * GRID # 96 - full texture size
+
+OUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tileArt', 'variants')
+VARIANT_COUNT = 16
+
+PIXEL_DRAWS = 5    # random values per pixel
+CELL_DRAWS = 24    # random values per sub-tile (floor_stone's stone centres)
+
+# Same table as TILES in scripts/generateTileArt.js
+TERRAIN_TILES = {
+    'grass':         ((74, 124, 63),   'grass'),
+    'dirt':          ((139, 105, 20),  'noise'),
+    'sand':          ((194, 178, 128), 'dots'),
+    'stone':         ((128, 128, 128), 'cracks'),
+    'water':         ((41, 128, 185),  'waves'),
+    'deep_water':    ((26, 82, 118),   'waves'),
+    'path':          ((160, 137, 110), 'noise'),
+    'flower_grass':  ((93, 168, 78),   'flowers'),
+    'farmland':      ((107, 66, 38),   'rows'),
+    'dark_grass':    ((45, 90, 30),    'grass'),
+    'mushroom':      ((61, 46, 30),    'mushroom'),
+    'dense_bush':    ((26, 61, 12),    'bush'),
+    'mud':           ((92, 64, 51),    'noise'),
+    'bog':           ((59, 83, 35),    'swamp'),
+    'marsh_water':   ((74, 103, 65),   'waves'),
+    'snow':          ((240, 240, 240), 'snow'),
+    'ice':           ((176, 224, 230), 'ice'),
+    'gravel':        ((160, 160, 160), 'gravel'),
+    'cliff':         ((85, 85, 85),    'cracks'),
+    'ash':           ((58, 58, 58),    'noise'),
+    'lava':          ((255, 69, 0),    'lava'),
+    'obsidian':      ((26, 26, 46),    'shiny'),
+    'charred_stone': ((42, 42, 42),    'cracks'),
+}
+
+# Textures in tileArt/ that were redrawn by hand after generateTileArt.js;
+# pattern variants would not match them, so they keep a single variant.
+HAND_DRAWN = {'grass', 'dark_grass', 'dirt', 'flower_grass', 'gravel', 'sand', 'stone'}
+
+
+# ── Pattern helpers ────────────────────────────────────────────────────
+#
+# A pattern takes (base, u, cell, perm, x, y) and returns float (r, g, b) arrays:
+#   u     [N, 3, 3, T, T, PIXEL_DRAWS] uniforms per pixel
+#   cell  [N, 3, 3, 1, 1, CELL_DRAWS] uniforms per sub-tile
+#   perm  [N, 512] noise permutation table per variant
+#   x, y  [T, T] pixel coordinates within the sub-tile
+
+def _noise(u, amount):
+    return (u - 0.5) * amount
+
+
+def _add(rgb, mask, dr, dg, db):
+    r, g, b = rgb
+    return r + np.where(mask, dr, 0), g + np.where(mask, dg, 0), b + np.where(mask, db, 0)
+
+
+def _set(rgb, mask, sr, sg, sb):
+    r, g, b = rgb
+    return np.where(mask, sr, r), np.where(mask, sg, g), np.where(mask, sb, b)
+
+
+def _base(base, n, kr=1.0, kg=1.0, kb=1.0):
+    br, bg, bb = base
+    return br + n * kr, bg + n * kg, bb + n * kb
+
+
+def _coherent(perm, u, x, y, cell_px=8, octaves=3, warp=0.0):
+    """Value-noise fBm, -1..1, that wraps at the sub-tile edges, [N, 3, 3, T, T].
+
+    All nine sub-tiles of a variant read the same periodic field, so any two
+    of them placed side by side in a chunk join without a seam.
+    """
+    period = TILE // cell_px
+    gx = np.broadcast_to(x / cell_px, u.shape[:-1])
+    gy = np.broadcast_to(y / cell_px, u.shape[:-1])
+    if warp:
+        return domain_warp(gx, gy, perm, warp, octaves, basis=value2, period=period)
+    return fbm(gx, gy, perm, octaves, basis=value2, period=period)
+
+
+def _clamp(v):
+    """Math.round + clamp to 0..255, as clamp() in the generators."""
+    return np.clip(np.floor(v + 0.5), 0, 255)
+
+
+# ── Terrain patterns (scripts/generateTileArt.js applyPattern) ─────────
+
+def terrain_grass(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 30), 0.5, 1.0, 0.3)
+    rgb = _add(rgb, u[..., 1] < 0.08, 0, 30 + u[..., 2] * 20, 0)
+    return _add(rgb, u[..., 3] < 0.04, -15, -15, -10)
+
+
+def terrain_noise(base, u, cell, perm, x, y):
+    return _base(base, _noise(u[..., 0], 40))
+
+
+def terrain_dots(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 20))
+    return _add(rgb, u[..., 1] < 0.03, 20, 15, 5)
+
+
+def terrain_cracks(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 25))
+    vertical = ((x == 8) | (x == 24)) & (y > 4) & (y < 28) & (u[..., 1] < 0.6)
+    rgb = _add(rgb, vertical, -30, -30, -30)
+    horizontal = ((y == 12) | (y == 20)) & (x > 2) & (x < 30) & (u[..., 2] < 0.5)
+    return _add(rgb, horizontal, -25, -25, -25)
+
+
+def terrain_waves(base, u, cell, perm, x, y):
+    wave = np.sin((x + y * 0.5) * 0.4) * 15
+    n = _noise(u[..., 0], 10)
+    br, bg, bb = base
+    rgb = (br + wave * 0.3 + n, bg + wave * 0.5 + n, bb + wave + n)
+    return _add(rgb, np.abs(np.sin((x + y * 0.3) * 0.6)) > 0.9, 15, 20, 30)
+
+
+FLOWER_COLORS = np.array([(220, 60, 60), (240, 220, 50), (240, 240, 240), (180, 80, 200)],
+                         dtype=np.float64)
+
+
+def terrain_flowers(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 25), 0.5, 1.0, 0.3)
+    flower = FLOWER_COLORS[np.minimum((u[..., 2] * 4).astype(np.intp), 3)]
+    return _set(rgb, u[..., 1] < 0.05, flower[..., 0], flower[..., 1], flower[..., 2])
+
+
+def terrain_rows(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 20))
+    return _add(rgb, y % 6 < 2, -15, -10, -8)
+
+
+def terrain_mushroom(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 25))
+    rgb = _add(rgb, u[..., 1] < 0.03, 50, 20, -10)
+    return _add(rgb, u[..., 2] < 0.02, 30, 40, 10)
+
+
+def terrain_bush(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 30), 0.3, 1.0, 0.2)
+    rgb = _add(rgb, u[..., 1] < 0.1, 0, 25 + u[..., 2] * 15, 0)
+    return _add(rgb, u[..., 3] < 0.06, -5, -20, -5)
+
+
+def terrain_swamp(base, u, cell, perm, x, y):
+    murk = _coherent(perm, u, x, y)
+    rgb = _base(base, _noise(u[..., 0], 12) + murk * 16, 0.5, 1.0, 0.3)
+    rgb = _add(rgb, (murk > 0.3) & (u[..., 1] < 0.5), -10, 10, -5)   # algae patches
+    return _add(rgb, u[..., 2] < 0.02, 20, 25, 15)
+
+
+def terrain_snow(base, u, cell, perm, x, y):
+    drift = _coherent(perm, u, x, y, octaves=2)
+    rgb = _base(base, _noise(u[..., 0], 8) + drift * 8)
+    rgb = _set(rgb, u[..., 1] < 0.04, 255, 255, 255)
+    rgb = _add(rgb, drift < -0.45, -18, -16, -6)                     # drift shadows
+    return _add(rgb, u[..., 2] < 0.03, -20, -20, -15)
+
+
+def terrain_ice(base, u, cell, perm, x, y):
+    frost = _coherent(perm, u, x, y)
+    rgb = _base(base, _noise(u[..., 0], 8) + frost * 14, 0.5, 0.8, 1.0)
+    rgb = _add(rgb, ((x + y) % 11 == 0) & (u[..., 1] < 0.7), -20, -10, 10)
+    return _add(rgb, u[..., 2] < 0.03, 30, 30, 30)
+
+
+def terrain_gravel(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 40))
+    rgb = _add(rgb, u[..., 1] < 0.06, 25, 25, 25)
+    return _add(rgb, u[..., 2] < 0.06, -25, -25, -25)
+
+
+def terrain_lava(base, u, cell, perm, x, y):
+    flow = _coherent(perm, u, x, y, warp=1.5)
+    glow = flow * 30
+    n = _noise(u[..., 0], 14)
+    br, bg, bb = base
+    rgb = (br + n + glow, bg + n * 2 + glow * 1.5, bb + n)
+    rgb = _set(rgb, (flow > 0.45) & (u[..., 1] < 0.3), 255, _clamp(180 + u[..., 2] * 75), 0)
+    crust = 20 * _noise(u[..., 3], 1)
+    return _set(rgb, flow < -0.4, 80 + crust, 20 + crust * 0.5, 0)   # cooled crust
+
+
+def terrain_shiny(base, u, cell, perm, x, y):
+    rgb = _base(base, _noise(u[..., 0], 12), 1.0, 1.0, 2.0)
+    return _add(rgb, u[..., 1] < 0.03, 40, 30, 60)
+
+
+TERRAIN_PATTERNS = {
+    'grass': terrain_grass, 'noise': terrain_noise, 'dots': terrain_dots,
+    'cracks': terrain_cracks, 'waves': terrain_waves, 'flowers': terrain_flowers,
+    'rows': terrain_rows, 'mushroom': terrain_mushroom, 'bush': terrain_bush,
+    'swamp': terrain_swamp, 'snow': terrain_snow, 'ice': terrain_ice,
+    'gravel': terrain_gravel, 'lava': terrain_lava, 'shiny': terrain_shiny,
+}
+
+
+# ── Town patterns (gen_town_tiles.py pattern_*) ────────────────────────
+
+def town_wall(base, u, cell, perm, x, y):
+    br, bg, bb = base
+    brick_h, mortar_w = 6, 1
+    brick_row = y // brick_h
+    local_y = y % brick_h
+    brick_x = (x + np.where(brick_row % 2, 10, 0)) % TILE
+    brick_w = 12 + (brick_row % 3) * 2
+    brick_col = brick_x // brick_w
+    is_mortar = (local_y < mortar_w) | (brick_x % brick_w < mortar_w)
+
+    variation = ((brick_row * 17 + brick_col * 7) * 31) % 30 - 15
+    n = _noise(u[..., 0], 14)
+    body = (br + variation + n, bg + variation * 0.7 + n * 0.8, bb + variation * 0.5 + n * 0.6)
+    body = _add(body, local_y == mortar_w, 12, 10, 8)
+    body = _add(body, local_y == brick_h - 1, -10, -8, -6)
+    m = _noise(u[..., 1], 12)
+    mortar = (br * 0.55 + m, bg * 0.55 + m, bb * 0.55 + m)
+    return tuple(np.where(is_mortar, mc, bc) for mc, bc in zip(mortar, body))
+
+
+def town_floor_wood(base, u, cell, perm, x, y):
+    br, bg, bb = base
+    plank_w = 8
+    plank_idx = x // plank_w
+    local_x = x % plank_w
+    variation = (plank_idx * 23 + 11) % 20 - 10
+    grain = np.sin((y + plank_idx * 7) * 0.6 + plank_idx * 2.1) * 6
+    n = _noise(u[..., 0], 10)
+    rgb = (br + variation + grain * 0.8 + n,
+           bg + variation * 0.8 + grain * 0.5 + n * 0.8,
+           bb + variation * 0.5 + grain * 0.3 + n * 0.5)
+    rgb = _add(rgb, local_x == 0, -30, -25, -20)
+    rgb = _add(rgb, u[..., 1] < 0.003, -20, -15, -10)
+    joint_y = (plank_idx * 13 + 5) % 24
+    return _add(rgb, (y == joint_y) & (local_x > 0), -15, -12, -8)
+
+
+def town_floor_stone(base, u, cell, perm, x, y):
+    br, bg, bb = base
+    num_stones = CELL_DRAWS // 3
+    sx = np.floor(cell[..., 0:num_stones] * TILE)
+    sy = np.floor(cell[..., num_stones:2 * num_stones] * TILE)
+    shade = _noise(cell[..., 2 * num_stones:3 * num_stones], 30)
+    d = np.hypot(x[..., None] - sx, y[..., None] - sy)          # [N, 3, 3, T, T, stones]
+    order = np.argsort(d, axis=-1, kind='stable')
+    min_d = np.take_along_axis(d, order[..., :1], axis=-1)[..., 0]
+    min2_d = np.take_along_axis(d, order[..., 1:2], axis=-1)[..., 0]
+    nearest = np.take_along_axis(np.broadcast_to(shade, d.shape), order[..., :1], axis=-1)[..., 0]
+    mortar_factor = min2_d - min_d
+
+    n = _noise(u[..., 1], 12)
+    edge = np.where(mortar_factor < 3.5, (1.0 - (mortar_factor - 1.8) / 1.7) * 8, 0)
+    stone = (br + nearest + n - edge, bg + nearest * 0.9 + n - edge, bb + nearest * 0.8 + n - edge)
+    m = _noise(u[..., 0], 8)
+    mortar = (br * 0.5 + m, bg * 0.5 + m, bb * 0.5 + m)
+    is_mortar = mortar_factor < 1.8
+    return tuple(np.where(is_mortar, mc, sc) for mc, sc in zip(mortar, stone))
+
+
+def town_door(base, u, cell, perm, x, y):
+    br, bg, bb = base
+    ts, frame_size, plank_w = TILE, 3, 7
+    is_frame = (x < frame_size) | (x >= ts - frame_size) | (y < frame_size) | (y >= ts - frame_size)
+
+    inner_x = x - frame_size
+    plank_idx = inner_x // plank_w
+    local_x = inner_x % plank_w
+    variation = (plank_idx * 19 + 7) % 16 - 8
+    grain = np.sin((x + plank_idx * 3) * 0.4) * 5
+    n = _noise(u[..., 0], 10)
+    body = (br + variation + grain * 0.6 + n,
+            bg + variation * 0.7 + grain * 0.4 + n * 0.7,
+            bb + variation * 0.4 + grain * 0.2 + n * 0.4)
+    body = _add(body, local_x == 0, -25, -20, -15)
+    stud = (local_x == plank_w // 2) & ((np.abs(y - frame_size - ts // 4) < 2)
+                                        | (np.abs(y - frame_size - 3 * ts // 4) < 2))
+    body = _set(body, stud, 50, 50, 55)
+    handle = (np.abs(x - (ts - frame_size - 6)) < 2) & (np.abs(y - ts // 2) < 3)
+    body = _set(body, handle, 70, 65, 60)
+
+    f = _noise(u[..., 1], 8)
+    frame = (br * 0.65 + f, bg * 0.65 + f * 0.8, bb * 0.65 + f * 0.5)
+    return tuple(np.where(is_frame, fc, bc) for fc, bc in zip(frame, body))
+
+
+def town_market_stall(base, u, cell, perm, x, y):
+    br, bg, bb = base
+    rgb = _base(base, _noise(u[..., 0], 22), 0.9, 0.8, 0.5)
+    rgb = _add(rgb, (x % 10 == 0) | (y % 10 == 0), -8, -7, -5)
+    rv, a, b, c = u[..., 1], u[..., 2], u[..., 3], u[..., 4]
+    # Checked in reverse so the first matching band of rv wins
+    rgb = _set(rgb, rv < 0.04, br + 30, bg + 25, bb - 10)                          # straw/hay
+    rgb = _set(rgb, rv < 0.025, 50 + a * 20, 120 + b * 40, 40 + c * 20)            # green produce
+    rgb = _set(rgb, rv < 0.018, 40 + a * 20, 60 + b * 30, 140 + c * 40)            # blue cloth
+    return _set(rgb, rv < 0.01, 160 + a * 40, 40 + b * 20, 30 + c * 20)            # red fabric
+
+
+TOWN_PATTERNS = {
+    'wall': town_wall, 'floor_wood': town_floor_wood, 'floor_stone': town_floor_stone,
+    'door': town_door, 'market_stall': town_market_stall,
+}
+
+
+def texture_table():
+    """{texture name: (base colour, pattern fn)} for every terrain and town texture."""
+    table = {name: (color, TERRAIN_PATTERNS[p]) for name, (color, p) in TERRAIN_TILES.items()
+             if name not in HAND_DRAWN}
+    for name, definition in TOWN_TILES.items():
+        table[name] = (definition['color'], TOWN_PATTERNS[name])
+    return table
+
+
+# ── Edge darkening (generateTileArt.js applyEdgeDarkening) ─────────────
+
+def edge_factors(ts=TILE):
+    """[3, 3, ts, ts] brightness factor per sub-tile pixel for the open borders."""
+    BORDER = 4
+    DARKEN = 0.70
+    OUTLINE_DARKEN = 0.55
+    y, x = np.mgrid[0:ts, 0:ts]
+    out = np.ones((GRID, GRID, ts, ts))
+    for row in range(GRID):
+        for col in range(GRID):
+            dists = [d for d, is_open in ((y, row == 0), (ts - 1 - y, row == 2),
+                                          (x, col == 0), (ts - 1 - x, col == 2)) if is_open]
+            if not dists:
+                continue
+            min_dist = np.minimum.reduce(dists)
+            factor = 1.0 - (1.0 - min_dist / BORDER) * (1.0 - DARKEN)
+            factor = np.where(min_dist == 0, OUTLINE_DARKEN, factor)
+            out[row, col] = np.where(min_dist < BORDER, factor, 1.0)
+    return out
+
+
+# ── Generation ─────────────────────────────────────────────────────────
+
+def render_variants(name, color, pattern, variants):
+    """[len(variants), SIZE, SIZE, 4] uint8 textures for the given variant indices, in one pass."""
+    seeds = np.array([stable_seed('gen_tile_variants', name, v) for v in variants], dtype=np.uint64)
+    n = len(variants)
+    per_pixel = GRID * GRID * TILE * TILE * PIXEL_DRAWS
+    draws = mulberry32(seeds, 0, per_pixel + GRID * GRID * CELL_DRAWS)
+    u = draws[:, :per_pixel].reshape(n, GRID, GRID, TILE, TILE, PIXEL_DRAWS)
+    cell = draws[:, per_pixel:].reshape(n, GRID, GRID, 1, 1, CELL_DRAWS)
+    perm = permutation(seeds)
+    y, x = np.mgrid[0:TILE, 0:TILE]
+
+    r, g, b = pattern(color, u, cell, perm, x, y)
+    rgb = np.stack([np.broadcast_to(c, u.shape[:-1]) for c in (r, g, b)], axis=-1)
+    rgb = _clamp(_clamp(rgb) * edge_factors()[None, ..., None])
+
+    out = np.full((n, GRID, GRID, TILE, TILE, 4), 255, dtype=np.uint8)
+    out[..., :3] = rgb
+    # (n, row, col, y, x, c) -> (n, row, y, col, x, c) -> n full textures
+    return out.transpose(0, 1, 3, 2, 4, 5).reshape(n, SIZE, SIZE, 4)
+
+
+def variant_strip(textures):
+    """[N, h, w, 4] -> one [h, N * w, 4] strip, variants left to right."""
+    n, h, w, _ = textures.shape
+    return textures.transpose(1, 0, 2, 3).reshape(h, n * w, 4)
+
+
+def gen_variant_strip(name, count=VARIANT_COUNT):
+    """Variants 1..count-1 of one texture as a strip."""
+    color, pattern = texture_table()[name]
+    return variant_strip(render_variants(name, color, pattern, range(1, count)))
+
+
+GENERATORS = {name: partial(gen_variant_strip, name) for name in texture_table()}
+
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_tile_variants'], png=png)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate seeded autotile texture variants.')
+    parser.add_argument('--count', type=int, default=VARIANT_COUNT,
+                        help='variants per texture, including the original (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    table = texture_table()
+    with DirectorySink(OUT_DIR) as sink:
+        for name, (color, pattern) in table.items():
+            strip = variant_strip(render_variants(name, color, pattern, range(1, args.count)))
+            data = encode_png(strip)
+            sink.put(f'{name}.png', data)
+            print(f'  {name}.png ({args.count - 1} variants, {len(data)} bytes)')
+    elapsed = time.perf_counter() - start
+    print(f'\nGenerated {args.count - 1} variants of {len(table)} textures in '
+          f'{os.path.abspath(OUT_DIR)} ({elapsed:.1f} s)')
+
+
+if __name__ == '__main__':
+    main()
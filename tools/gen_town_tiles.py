@@ -2,13 +2,19 @@
 """
 Generate 96x96 autotile PNG sprites for town tiles.
 Each texture is a 3x3 grid of 32x32 sub-tiles (same format as generateTileArt.js).
-Uses raw PNG encoding (no external deps beyond stdlib).
+Drawing and PNG encoding are plain Python; render() goes through
+registry.py and needs NumPy (tools/requirements.txt).
 """
 
 import struct
 import zlib
 import os
+import sys
 import math
+from functools import partial
+
+import registry
+from sinks import DirectorySink
 
 TILE = 32          # individual sub-tile size
 GRID = 3           # 3x3 sub-tile grid
@@ -464,16 +470,28 @@ def generate_tile(name, definition):
     return encode_png(pixels, SIZE, SIZE)
 
 
+def gen_town_tile(name):
+    """PNG bytes of one TOWN_TILES texture."""
+    return generate_tile(name, TOWN_TILES[name])
+
+
+GENERATORS = {name: partial(gen_town_tile, name) for name in TOWN_TILES}
+
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_town_tiles'], png=png)
+
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
+    module = sys.modules[__name__]
     count = 0
-    for name, definition in TOWN_TILES.items():
-        png_data = generate_tile(name, definition)
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        with open(path, 'wb') as f:
-            f.write(png_data)
-        print(f'  {name}.png ({len(png_data)} bytes)')
-        count += 1
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen in GENERATORS.items():
+            png_data = registry.entry_png(module, name, gen)
+            sink.put(f'{name}.png', png_data)
+            print(f'  {name}.png ({len(png_data)} bytes)')
+            count += 1
 
     print(f'\nGenerated {count} town autotile sprites ({SIZE}x{SIZE}) in {os.path.abspath(OUT_DIR)}')
 
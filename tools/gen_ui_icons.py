@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Generate 64x64 touch UI icons using pycairo. White silhouettes on transparent."""
 
-import cairo
 import os
+import sys
 import math
 
+from lazy import lazy_import
+import registry
+from sinks import DirectorySink
+
+# pycairo is imported when the first icon is drawn
+cairo = lazy_import('cairo')
+
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'ui')
 SIZE = 64
 CX = SIZE / 2
@@ -514,13 +521,17 @@ ICONS = {
 }
 
 
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_ui_icons'], png=png)
+
+
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    for name, gen_func in ICONS.items():
-        surface = gen_func()
-        path = os.path.join(OUT_DIR, f'{name}.png')
-        surface.write_to_png(path)
-        print(f'  {name}.png')
+    module = sys.modules[__name__]
+    with DirectorySink(OUT_DIR) as sink:
+        for name, gen_func in ICONS.items():
+            sink.put(f'{name}.png', registry.surface_png(module, name, gen_func))
+            print(f'  {name}.png')
     print(f'\nGenerated {len(ICONS)} UI icons in {os.path.abspath(OUT_DIR)}')
 
 
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """Generate a wild_horse 32x32 pixel-art sprite PNG.
 
-Uses the same pure-Python PNG approach as gen_enemy_sprites.py so there is
-no dependency on Pillow or any third-party library.
+Drawn on a list-of-rows canvas like gen_enemy_sprites.py; main() encodes
+it through registry.entry_png (NumPy, pngio.py), so it needs the packages in
+tools/requirements.txt.
 """
 
-import struct, zlib, os
+import os, sys
+
+import registry
+from sinks import DirectorySink
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'tileArt', 'enemies')
 SIZE = 32
@@ -26,23 +30,6 @@ def lighten(c, f=1.4):
     return (min(255, int(c[0]*f)), min(255, int(c[1]*f)), min(255, int(c[2]*f)), c[3])
 
 
-def make_png(pixels, w, h):
-    def chunk(ctype, data):
-        c = ctype + data
-        return (struct.pack('>I', len(data)) + c +
-                struct.pack('>I', zlib.crc32(c) & 0xffffffff))
-    raw = b''
-    for row in pixels:
-        raw += b'\x00'
-        for r, g, b, a in row:
-            raw += struct.pack('BBBB', r, g, b, a)
-    sig = b'\x89PNG\r\n\x1a\n'
-    ihdr = struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0)
-    return (sig + chunk(b'IHDR', ihdr) +
-            chunk(b'IDAT', zlib.compress(raw)) +
-            chunk(b'IEND', b''))
-
-
 def new_canvas(w=SIZE, h=SIZE):
     return [[TRANSPARENT for _ in range(w)] for _ in range(h)]
 
@@ -153,12 +140,20 @@ def gen_wild_horse():
     return px
 
 
+GENERATORS = {
+    'wild_horse': gen_wild_horse,
+}
+
+
+def render(ids=None, png=False):
+    """(id, width, height, pixels or PNG bytes) for this module's entries, in memory."""
+    return registry.render(ids, modules=['gen_wild_horse'], png=png)
+
+
 # ---------- main ----------
 if __name__ == '__main__':
-    os.makedirs(OUT_DIR, exist_ok=True)
-    px = gen_wild_horse()
-    data = make_png(px, SIZE, SIZE)
+    data = registry.entry_png(sys.modules[__name__], 'wild_horse', GENERATORS['wild_horse'])
     out_path = os.path.join(OUT_DIR, 'wild_horse.png')
-    with open(out_path, 'wb') as f:
-        f.write(data)
+    with DirectorySink(OUT_DIR) as sink:
+        sink.put('wild_horse.png', data)
     print(f'Wrote {out_path}  ({len(data)} bytes)')
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Golden-image checks: rendered sprites against the committed tileArt/ PNGs.
+
+    check(rgba, path)    exact first: the rendered pixels are encoded and
+                         hashed against the golden file's digest (cached
+                         by stat, so an unchanged golden is never read
+                         again); only on a mismatch is the golden decoded
+                         and diffed
+    diff(a, b)           vectorized per-pixel comparison with a tolerance,
+                         on premultiplied RGBA so the colour of fully
+                         transparent pixels does not count
+    heatmap(a, b)        golden | rendered | difference strip, enlarged;
+                         changed pixels glow from yellow (small) to red
+
+The test suite (tests/test_golden_images.py) runs check() on every output
+of every registry entry and writes a heatmap PNG for each failure to
+.asset-cache/golden-diffs/. After an intended art change, regenerate the
+goldens with `build_assets.py render '*'`; it leaves the files in
+registry.HAND_DRAWN alone (hand-drawn strips and the legacy resource
+sprites), which no generator reproduces.
+"""
+
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from build_cache import BuildCache
+from pngio import encode_png, read_png, write_png
+from quantize import psnr
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.asset-cache',
+                          'golden-digests.json')
+DIFF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.asset-cache',
+                        'golden-diffs')
+TOLERANCE = 2         # max per-channel difference (0..255) that still passes
+HEATMAP_HEIGHT = 128  # panels are enlarged by whole factors to about this height
+
+Result = namedtuple('Result', 'passed exact max_delta changed psnr')
+
+
+def digest_cache(path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return BuildCache(path)
+
+
+def _premultiplied(rgba):
+    c = rgba.astype(np.float32)
+    c[..., :3] *= c[..., 3:] / 255.0
+    return c
+
+
+def delta(a, b):
+    """(h, w) largest premultiplied channel difference of two same-shape images."""
+    return np.abs(_premultiplied(a) - _premultiplied(b)).max(axis=-1)
+
+
+def diff(rendered, golden, tolerance=TOLERANCE):
+    """Result of a per-pixel comparison; differing shapes never pass."""
+    if rendered.shape != golden.shape:
+        return Result(False, False, 255.0, None, None)
+    d = delta(rendered, golden)
+    changed = int(np.count_nonzero(d > tolerance))
+    return Result(changed == 0, False, float(d.max()), changed,
+                  round(psnr(rendered, golden), 2))
+
+
+def check(rendered, path, cache=None, tolerance=TOLERANCE):
+    """Result of comparing rendered pixels with the golden PNG at path."""
+    if cache is not None:
+        if hashlib.sha1(encode_png(rendered)).hexdigest() == cache.digest(path):
+            return Result(True, True, 0.0, 0, None)
+    golden = read_png(path)
+    if rendered.shape == golden.shape and np.array_equal(rendered, golden):
+        return Result(True, True, 0.0, 0, None)
+    return diff(rendered, golden, tolerance)
+
+
+# ── Heatmap ────────────────────────────────────────────────────────────
+
+def _checker(h, w, cell=4):
+    ys, xs = np.mgrid[0:h, 0:w]
+    light = ((ys // cell + xs // cell) % 2).astype(np.float32)
+    return (96 + 48 * light)[..., None]
+
+
+def _panel(rgba, h, w):
+    """rgba over a grey checkerboard, padded to (h, w)."""
+    out = np.zeros((h, w, 3), dtype=np.float32)
+    ih, iw = rgba.shape[:2]
+    a = rgba[..., 3:].astype(np.float32) / 255.0
+    out[:ih, :iw] = rgba[..., :3] * a + _checker(ih, iw) * (1 - a)
+    return out
+
+
+def heatmap(rendered, golden, tolerance=TOLERANCE):
+    """(H, W, 4) uint8 strip: golden, rendered and their difference, side by side."""
+    h = max(rendered.shape[0], golden.shape[0])
+    w = max(rendered.shape[1], golden.shape[1])
+    heat = np.zeros((h, w), dtype=np.float32)
+    if rendered.shape == golden.shape:
+        heat = delta(rendered, golden)
+    else:
+        heat[:] = 255.0    # anything outside the overlap counts as changed
+        ch, cw = min(rendered.shape[0], golden.shape[0]), min(rendered.shape[1], golden.shape[1])
+        heat[:ch, :cw] = delta(rendered[:ch, :cw], golden[:ch, :cw])
+    # Dimmed golden luma underneath, changed pixels from yellow (small) to red
+    base = _panel(golden, h, w).mean(axis=-1, keepdims=True) * 0.35
+    t = np.clip(heat / 64.0, 0, 1)[..., None]
+    hot = np.concatenate([np.full_like(t, 255), 255 * (1 - t), np.zeros_like(t)], axis=-1)
+    diff_panel = np.where((heat > tolerance)[..., None], hot, base)
+
+    gap = np.full((h, 2, 3), 255, dtype=np.float32)
+    strip = np.concatenate([_panel(golden, h, w), gap, _panel(rendered, h, w), gap, diff_panel],
+                           axis=1)
+    scale = max(1, HEATMAP_HEIGHT // h)
+    strip = strip.repeat(scale, axis=0).repeat(scale, axis=1)
+    out = np.full(strip.shape[:2] + (4,), 255, dtype=np.uint8)
+    out[..., :3] = np.clip(np.rint(strip), 0, 255)
+    return out
+
+
+def write_heatmap(name, rendered, golden_path, out_dir=DIFF_DIR, tolerance=TOLERANCE):
+    """Write the heatmap of a failed check to out_dir/<name>.png and return its path."""
+    path = os.path.join(out_dir, f'{name}.png')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_png(path, heatmap(rendered, read_png(golden_path), tolerance))
+    return path
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Layered canvas for the list-of-rows pixel generators.
+
+A LayeredCanvas is a bottom-to-top stack of named layers. Each layer is
+created the first time it is asked for, and it can come from one of three
+sources:
+
+    canvas     a new_canvas()-style list of rows, drawn with the module's
+               own fill_rect/set_px/fill_circle helpers
+    array      an (h, w, 4) uint8 RGBA array, e.g. a layer taken from
+               another sprite
+    callable   fn(layered) -> (h, w, 4) uint8, evaluated at flatten time
+               and cached, so a shading pass derived from other layers
+               runs once however often the sprite is flattened
+
+Each layer has a blend mode and an opacity:
+
+    normal     source over (what consecutive draws on one canvas give
+               for opaque colours)
+    multiply   b * s, darkens
+    screen     b + s - b * s, lightens
+    overlay    multiply or screen depending on the backdrop
+    add        min(b + s, 1), for glows
+    replace    every drawn pixel of the layer replaces the backdrop, alpha
+               included, exactly like set_px on a single canvas
+
+normal matches a single canvas only for opaque colours: a translucent
+pixel is blended over the layers below instead of replacing them. Sprites
+moved from one canvas onto layers use LayeredCanvas(..., mode='replace'),
+so their output stays what the one-canvas code drew.
+
+Nothing is composited while drawing. flatten() stacks all non-empty
+layers into one [L, h, w, 4] array and folds them bottom-to-top with
+whole-array operations (W3C separable blending with straight alpha in
+and out). with_layer() returns a copy that differs in a single layer, so
+a variant can swap the wings or the shading and keep everything else.
+"""
+
+import numpy as np
+
+from pngio import encode_png
+
+
+def _blank(w, h):
+    return [[(0, 0, 0, 0) for _ in range(w)] for _ in range(h)]
+
+
+# ── Blend modes ────────────────────────────────────────────────────────
+# Each takes backdrop and source colour in 0..1 and returns the mixed colour
+
+def _normal(b, s):
+    return s
+
+
+def _multiply(b, s):
+    return b * s
+
+
+def _screen(b, s):
+    return b + s - b * s
+
+
+def _overlay(b, s):
+    return np.where(b <= 0.5, 2.0 * b * s, 1.0 - 2.0 * (1.0 - b) * (1.0 - s))
+
+
+def _add(b, s):
+    return np.minimum(b + s, 1.0)
+
+
+BLEND_MODES = {
+    'normal': _normal,
+    'multiply': _multiply,
+    'screen': _screen,
+    'overlay': _overlay,
+    'add': _add,
+}
+
+
+REPLACE = 'replace'
+
+
+def _check_mode(mode):
+    if mode not in BLEND_MODES and mode != REPLACE:
+        raise ValueError(f'unknown blend mode {mode!r}')
+
+
+def composite(stack, modes, opacity=None):
+    """Flatten an [L, ..., 4] uint8 layer stack (bottom first) to one [..., 4] uint8 image.
+
+    `modes` names the blend mode of every layer; `opacity` optionally scales
+    each layer's alpha. The bottom layer's mode has nothing to blend with.
+    """
+    for mode in modes:
+        _check_mode(mode)
+    s = stack.astype(np.float32) / 255.0
+    rgb, alpha = s[..., :3], s[..., 3:]
+    if opacity is not None:
+        alpha = alpha * np.asarray(opacity, dtype=np.float32).reshape((-1,) + (1,) * (alpha.ndim - 1))
+
+    # Accumulate premultiplied colour; un-premultiply only to feed the blend
+    acc_a = alpha[0]
+    acc = rgb[0] * acc_a
+    for i in range(1, len(stack)):
+        src, src_a = rgb[i], alpha[i]
+        if modes[i] == REPLACE:
+            drawn = stack[i, ..., 3:] > 0
+            acc = np.where(drawn, src * src_a, acc)
+            acc_a = np.where(drawn, src_a, acc_a)
+            continue
+        back = np.divide(acc, acc_a, out=np.zeros_like(acc), where=acc_a > 0)
+        # Where the backdrop is transparent the source shows unblended
+        mixed = src + acc_a * (BLEND_MODES[modes[i]](back, src) - src)
+        acc = src_a * mixed + acc * (1.0 - src_a)
+        acc_a = src_a + acc_a * (1.0 - src_a)
+
+    out = np.empty(stack.shape[1:], dtype=np.uint8)
+    rgb_out = np.divide(acc, acc_a, out=np.zeros_like(acc), where=acc_a > 0)
+    out[..., :3] = np.clip(np.rint(rgb_out * 255.0), 0, 255)
+    out[..., 3:] = np.clip(np.rint(acc_a * 255.0), 0, 255)
+    return out
+
+
+# ── Layered canvas ─────────────────────────────────────────────────────
+
+class LayeredCanvas:
+    """Named layers over one w x h sprite, composited only when flattened.
+
+    `new_canvas` is the generator module's canvas factory; layers drawn
+    with the module's helpers are made with it, and so is the canvas that
+    rows() returns. `mode` is the blend mode of layers created without one.
+    """
+
+    def __init__(self, w, h, new_canvas=None, mode='normal'):
+        _check_mode(mode)
+        self.w = w
+        self.h = h
+        self.mode = mode
+        self._new_canvas = new_canvas or _blank
+        self._order = []    # layer names, bottom to top
+        self._layers = {}   # name -> {'mode', 'opacity', 'source'}
+        self._cache = {}    # name -> evaluated array of a callable source
+
+    def __contains__(self, name):
+        return name in self._layers
+
+    @property
+    def names(self):
+        return list(self._order)
+
+    def layer(self, name, mode=None, opacity=1.0):
+        """The list-of-rows canvas of layer `name`, created on top of the stack if new."""
+        if name not in self._layers:
+            self.set_layer(name, self._new_canvas(self.w, self.h), mode or self.mode, opacity)
+        source = self._layers[name]['source']
+        if not isinstance(source, list):
+            raise TypeError(f'layer {name!r} is not a drawable canvas')
+        return source
+
+    def set_layer(self, name, source, mode=None, opacity=None):
+        """Set a layer's source (canvas, array or callable), keeping its stack position."""
+        if mode is not None:
+            _check_mode(mode)
+        if name in self._layers:
+            spec = dict(self._layers[name])
+        else:
+            self._order.append(name)
+            spec = {'mode': self.mode, 'opacity': 1.0}
+        spec['source'] = source
+        if mode is not None:
+            spec['mode'] = mode
+        if opacity is not None:
+            spec['opacity'] = opacity
+        self._layers[name] = spec
+        # A derived layer may read any other layer
+        self._cache.clear()
+
+    def with_layer(self, name, source, mode=None, opacity=None):
+        """A copy of this canvas with one layer replaced; the other sources are shared."""
+        other = LayeredCanvas(self.w, self.h, self._new_canvas, self.mode)
+        other._order = list(self._order)
+        other._layers = dict(self._layers)
+        other.set_layer(name, source, mode, opacity)
+        return other
+
+    def without(self, *names):
+        """A copy of this canvas without the named layers."""
+        other = LayeredCanvas(self.w, self.h, self._new_canvas, self.mode)
+        other._order = [n for n in self._order if n not in names]
+        other._layers = {n: self._layers[n] for n in other._order}
+        return other
+
+    def pixels(self, name):
+        """(h, w, 4) uint8 array of one layer, before blending."""
+        source = self._layers[name]['source']
+        if callable(source):
+            if name not in self._cache:
+                self._cache[name] = np.asarray(source(self), dtype=np.uint8)
+            return self._cache[name]
+        if isinstance(source, list):
+            return np.array(source, dtype=np.uint8).reshape(self.h, self.w, 4)
+        return np.asarray(source, dtype=np.uint8)
+
+    def flatten(self, names=None):
+        """Composite the stack (or only the named layers, in stack order) to (h, w, 4) uint8."""
+        order = [n for n in self._order if names is None or n in names]
+        if not order:
+            return np.zeros((self.h, self.w, 4), dtype=np.uint8)
+        stack = np.stack([self.pixels(n) for n in order])
+        if len(order) == 1 and self._layers[order[0]]['opacity'] == 1.0:
+            return stack[0].copy()
+        specs = [self._layers[n] for n in order]
+        return composite(stack, [sp['mode'] for sp in specs], [sp['opacity'] for sp in specs])
+
+    def rows(self):
+        """The flattened sprite as a list-of-rows canvas from the module's factory."""
+        px = self._new_canvas(self.w, self.h)
+        flat = self.flatten()
+        ys, xs = np.nonzero(flat[..., 3])
+        for y, x, c in zip(ys.tolist(), xs.tolist(), map(tuple, flat[ys, xs].tolist())):
+            px[y][x] = c
+        return px
+
+    def encode(self, level=-1):
+        return encode_png(self.flatten(), level)
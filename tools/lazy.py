@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Deferred imports.
+
+    cairo = lazy_import('cairo')
+
+binds a stand-in that imports the real module on first attribute access,
+so `import gen_ui_icons` costs nothing extra until a vector generator
+actually draws, and fails only then if pycairo is missing.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Module proxy: imports `name` the first time an attribute is read."""
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+        return getattr(self.__module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__module is not None else 'not loaded'
+        return f'<lazy module {self.__name!r} ({state})>'
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Asset lockfile: which generator wrote each file under tileArt/, from what
+source, with which bytes.
+
+tileArt.lock (JSON, next to tileArt/) maps every output path to
+
+    id          registry id of the entry that writes it
+    generator   module.function of that entry
+    inputs      digest of the source the entry can reach (depgraph.py),
+                its arguments and its declared post-process passes
+    deps        the top-level definitions that digest covers, plus the
+                shared path every output takes to its bytes: render_entry,
+                the draw-op replay for pixel modules, the postfx passes
+                and the PNG encoder
+    size, sha1  the bytes written
+
+and keeps the per-definition hashes of every source file involved.
+`build_assets.py render` updates the entries of the ids it renders, so
+`render '*'` refreshes the whole lock.
+
+Files no generator reproduces are locked by their bytes alone, with no
+generator: the registry.HAND_DRAWN ids, entries whose generator cannot be
+imported (pycairo missing) and, on `render '*'`, every other file under
+tileArt/ that no entry writes. Their record is kept once written, so an
+overwritten hand-drawn strip shows up as modified; `render --accept`
+records the files of the selected ids as they are now.
+
+    verify()    tileArt/ against the lock without importing a generator:
+                outputs are stat()ed first (a size mismatch needs no
+                read), then hashed through mmap in a thread pool, with
+                digests reused by stat from .asset-cache/lock-digests.json;
+                source files are hashed the same way and only a changed
+                one is re-parsed to see which definitions moved. Registry
+                ids (from the cached registry index) and files under
+                tileArt/ that the lock does not cover are listed as well
+
+An edit to a generator module outside everything its entries reach (a
+registry table, main()) marks all of that module's outputs stale, since
+the arguments it hands out are not known without importing it.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+import depgraph
+from build_cache import BuildCache, file_sha1
+from lazy import lazy_import
+
+drawops = lazy_import('drawops')
+pngio = lazy_import('pngio')
+postfx = lazy_import('postfx')
+registry = lazy_import('registry')
+
+TOOLS_DIR = depgraph.TOOLS_DIR
+ART_DIR = os.path.join(TOOLS_DIR, '..', 'tileArt')
+LOCK_PATH = os.path.join(TOOLS_DIR, '..', 'tileArt.lock')
+DIGEST_CACHE = os.path.join(TOOLS_DIR, '..', '.asset-cache', 'lock-digests.json')
+LOCK_VERSION = 1
+UNIT_HASH_LEN = 12
+UNLOCKED_DIRS = ('atlas',)   # build output under tileArt/ (gitignored)
+
+Report = namedtuple('Report', 'checked stale unlocked')   # {output path: reason} each
+
+
+def _unit_hashes(path):
+    return {u: h[:UNIT_HASH_LEN] for u, h in depgraph.definitions(path).hashes.items()}
+
+
+def pipeline_dependencies(module, memo=None):
+    """{(module, unit)} an entry's pixels pass through after its generator returns."""
+    fns = [registry.render_entry, registry.to_rgba, pngio.encode_png, postfx.apply_passes,
+           *postfx.PASSES.values()]
+    if module.__name__ in registry.PIXEL_MODULES:
+        fns += [drawops.load_or_record, drawops.replay]
+    deps = set()
+    for fn in fns:
+        deps |= depgraph.dependencies(fn, memo)
+    return deps
+
+
+class Lock:
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self.sources = {}   # file name -> {'sha1': ..., 'units': {unit: hash}}
+        self.outputs = {}   # path under tileArt/ -> record
+        self._hashed = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('version') != LOCK_VERSION:
+                raise ValueError(f'{path}: lock version {data.get("version")}, expected {LOCK_VERSION}')
+            self.sources = data['sources']
+            dep_sets = data['dep_sets']
+            for out, rec in data['outputs'].items():
+                self.outputs[out] = dict(rec, deps=dep_sets[rec['deps']])
+
+    def record(self, sprite, module, name, gen, outputs, memo=None):
+        """Lock the files one entry wrote: outputs is [(path, bytes), ...]."""
+        passes = postfx.declared_passes(module, name)
+        deps = depgraph.dependencies(gen, memo) | pipeline_dependencies(module, memo)
+        if hasattr(module, 'gen_state_variants'):
+            deps |= depgraph.dependencies(module.gen_state_variants, memo)
+        inputs = depgraph.entry_key(gen, memo)
+        h = hashlib.sha1(f'{inputs}{passes!r}'.encode())
+        for mod in ({m for m, _ in deps} | {module.__name__}) - self._hashed:
+            path = sys.modules[mod].__file__
+            self.sources[os.path.basename(path)] = {'sha1': file_sha1(path),
+                                                    'units': _unit_hashes(path)}
+            self._hashed.add(mod)
+        deps = sorted(f'{m}.{u}' for m, u in deps)
+        for path, data in outputs:
+            out = os.path.relpath(path, ART_DIR).replace(os.sep, '/')
+            self.outputs[out] = {
+                'id': sprite,
+                'generator': f'{module.__name__}.{getattr(gen, "func", gen).__name__}',
+                'inputs': h.hexdigest(),
+                'deps': deps,
+                'size': len(data),
+                'sha1': hashlib.sha1(data).hexdigest(),
+            }
+
+    def record_committed(self, sprite, outs, art_dir=ART_DIR, replace=False):
+        """Lock files under tileArt/ by their current bytes, with no generator.
+
+        An existing record is kept unless `replace`, so a later overwrite
+        stays visible to verify(). Returns the paths recorded.
+        """
+        recorded = []
+        for out in outs:
+            if out in self.outputs and not replace:
+                continue
+            with open(os.path.join(art_dir, *out.split('/')), 'rb') as f:
+                data = f.read()
+            self.outputs[out] = {'id': sprite, 'generator': None, 'inputs': None, 'deps': [],
+                                 'size': len(data), 'sha1': hashlib.sha1(data).hexdigest()}
+            recorded.append(out)
+        return recorded
+
+    def save(self):
+        dep_sets = []
+        index = {}
+        outputs = {}
+        for out, rec in sorted(self.outputs.items()):
+            deps = tuple(rec['deps'])
+            if deps not in index:
+                index[deps] = len(dep_sets)
+                dep_sets.append(list(deps))
+            outputs[out] = dict(rec, deps=index[deps])
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': LOCK_VERSION, 'sources': self.sources, 'dep_sets': dep_sets,
+                       'outputs': outputs}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp, self.path)
+
+
+# ── Verify ─────────────────────────────────────────────────────────────
+
+def unlocked_files(outputs, art_dir=ART_DIR):
+    """Sorted paths of the files under art_dir that `outputs` has no record for."""
+    found = []
+    for root, dirs, files in os.walk(art_dir):
+        rel = os.path.relpath(root, art_dir).replace(os.sep, '/')
+        if rel == '.':
+            dirs[:] = [d for d in dirs if d not in UNLOCKED_DIRS]
+        found += [name if rel == '.' else f'{rel}/{name}' for name in files]
+    return sorted(out for out in found if out not in outputs)
+
+
+def _changed_units(lock, cache, workers):
+    """{module: {unit, ...}} of the definitions that differ from the lock."""
+    paths = {name: os.path.join(TOOLS_DIR, name) for name in lock.sources}
+    shas = cache.digests(paths.values(), workers)
+    changed = {}
+    for name, src in lock.sources.items():
+        sha = shas[paths[name]]
+        if sha == src['sha1']:
+            continue
+        now = _unit_hashes(paths[name]) if sha is not None else {}
+        old = src['units']
+        changed[name[:-len('.py')]] = {u for u in old.keys() | now.keys() if old.get(u) != now.get(u)}
+    return changed
+
+
+def verify(lock_path=LOCK_PATH, art_dir=ART_DIR, cache_path=DIGEST_CACHE, workers=None, ids=None):
+    """Report of the lock's outputs that no longer match their bytes or source, and
+    of the registry ids (default: the whole registry index) and files it misses."""
+    if not os.path.exists(lock_path):
+        raise ValueError(f'no lockfile at {lock_path}; run build_assets.py render first')
+    lock = Lock(lock_path)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    cache = BuildCache(cache_path)
+    stale = {}
+
+    changed = _changed_units(lock, cache, workers)
+    if changed:
+        reached = {}
+        generated = {out: rec for out, rec in lock.outputs.items() if rec['generator']}
+        for rec in generated.values():
+            reached.setdefault(rec['generator'].split('.')[0], set()).update(rec['deps'])
+        for out, rec in generated.items():
+            module = rec['generator'].split('.')[0]
+            moved = [d for d in rec['deps'] if d.split('.')[1] in changed.get(d.split('.')[0], ())]
+            outside = sorted(u for u in changed.get(module, ())
+                             if f'{module}.{u}' not in reached[module])
+            if moved:
+                stale[out] = f'source changed: {", ".join(moved[:3])}' + (' ...' if len(moved) > 3 else '')
+            elif outside:
+                stale[out] = f'{module}.py changed outside its generators: {", ".join(outside[:3])}'
+
+    to_hash = []
+    for out, rec in lock.outputs.items():
+        path = os.path.join(art_dir, out)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            stale.setdefault(out, 'missing')
+            continue
+        if size != rec['size']:
+            stale.setdefault(out, 'modified')
+        else:
+            to_hash.append(out)
+    shas = cache.digests([os.path.join(art_dir, out) for out in to_hash], workers)
+    for out in to_hash:
+        if shas[os.path.join(art_dir, out)] != lock.outputs[out]['sha1']:
+            stale.setdefault(out, 'modified')
+    cache.save()
+
+    locked_ids = {rec['id'] for rec in lock.outputs.values()}
+    unlocked = {f'{i}.png': 'registry id not in the lock'
+                for i in (registry.load_index() if ids is None else ids) if i not in locked_ids}
+    for out in unlocked_files(lock.outputs, art_dir):
+        unlocked.setdefault(out, 'file not in the lock')
+    return Report(len(lock.outputs), dict(sorted(stale.items())), dict(sorted(unlocked.items())))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Coherent 2D noise evaluated over whole coordinate grids with NumPy.
+
+    simplex2      Gustavson's 2D simplex noise, roughly -1..1
+    value2        value noise on an integer lattice with quintic fade, -1..1;
+                  `period` makes it wrap so a texture tiles seamlessly
+    fbm           octaves of either, summed with falling amplitude
+    domain_warp   evaluate a noise at coordinates displaced by two fBm fields
+
+Permutation tables come from the mulberry32 stream of a seed (rng.py), so
+a seed gives the same field on every machine. A table may also be a stack
+of tables, [N, 512], one per leading index of the coordinate arrays, so N
+differently seeded fields are still a single evaluation.
+"""
+
+import numpy as np
+
+from rng import mulberry32
+
+F2 = 0.5 * (np.sqrt(3.0) - 1.0)
+G2 = (3.0 - np.sqrt(3.0)) / 6.0
+GRAD2 = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0),
+                  (1, 0), (-1, 0), (0, 1), (0, -1), (0, 1), (0, -1)], dtype=np.float64)
+
+
+def permutation(seed):
+    """Doubled 256-entry permutation table for a seed, or [N, 512] for an array of seeds."""
+    draws = mulberry32(seed, 0, 256)
+    perm = np.argsort(draws, axis=-1, kind='stable')
+    return np.concatenate([perm, perm], axis=-1)
+
+
+def _lookup(perm, idx):
+    if perm.ndim == 1:
+        return perm[idx]
+    rows = np.arange(perm.shape[0]).reshape((-1,) + (1,) * (idx.ndim - 1))
+    return perm[rows, idx]
+
+
+def _grid(x, y, perm):
+    """Broadcast coordinates to one shape (with the table stack's leading axis)."""
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    if perm.ndim > 1 and x.shape[:1] != perm.shape[:1]:
+        shape = (perm.shape[0],) + x.shape
+        x, y = np.broadcast_to(x, shape), np.broadcast_to(y, shape)
+    return x, y
+
+
+# ── Noise bases ────────────────────────────────────────────────────────
+
+def simplex2(x, y, perm):
+    x, y = _grid(x, y, perm)
+    s = (x + y) * F2
+    i = np.floor(x + s).astype(np.intp)
+    j = np.floor(y + s).astype(np.intp)
+    t = (i + j) * G2
+    x0 = x - (i - t)
+    y0 = y - (j - t)
+    i1 = (x0 > y0).astype(np.intp)
+    j1 = 1 - i1
+    x1, y1 = x0 - i1 + G2, y0 - j1 + G2
+    x2, y2 = x0 - 1.0 + 2.0 * G2, y0 - 1.0 + 2.0 * G2
+
+    ii, jj = i & 255, j & 255
+    g0 = _lookup(perm, ii + _lookup(perm, jj)) % 12
+    g1 = _lookup(perm, ii + i1 + _lookup(perm, jj + j1)) % 12
+    g2 = _lookup(perm, ii + 1 + _lookup(perm, jj + 1)) % 12
+
+    total = np.zeros_like(x)
+    for g, cx, cy in ((g0, x0, y0), (g1, x1, y1), (g2, x2, y2)):
+        falloff = np.maximum(0.5 - cx * cx - cy * cy, 0.0)
+        total += falloff ** 4 * (GRAD2[g, 0] * cx + GRAD2[g, 1] * cy)
+    return 70.0 * total
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def value2(x, y, perm, period=None):
+    x, y = _grid(x, y, perm)
+    xi = np.floor(x).astype(np.intp)
+    yi = np.floor(y).astype(np.intp)
+    fx, fy = _fade(x - xi), _fade(y - yi)
+
+    def corner(dx, dy):
+        cx, cy = xi + dx, yi + dy
+        if period is not None:
+            cx, cy = cx % period, cy % period
+        return _lookup(perm, (_lookup(perm, cx & 255) + cy) & 255) / 127.5 - 1.0
+
+    top = corner(0, 0) + (corner(1, 0) - corner(0, 0)) * fx
+    bottom = corner(0, 1) + (corner(1, 1) - corner(0, 1)) * fx
+    return top + (bottom - top) * fy
+
+
+# ── Combinators ────────────────────────────────────────────────────────
+
+def fbm(x, y, perm, octaves=4, lacunarity=2.0, gain=0.5, basis=simplex2, period=None):
+    """Fractal sum of `octaves` layers of `basis`, normalized to roughly -1..1.
+
+    With a `period` (value2 only) every octave wraps at the same image size,
+    so lacunarity should be an integer.
+    """
+    x, y = _grid(x, y, perm)
+    total = np.zeros_like(x)
+    amp, freq, norm = 1.0, 1.0, 0.0
+    for _ in range(octaves):
+        if period is None:
+            total += amp * basis(x * freq, y * freq, perm)
+        else:
+            total += amp * basis(x * freq, y * freq, perm, period=int(period * freq))
+        norm += amp
+        amp *= gain
+        freq *= lacunarity
+    return total / norm
+
+
+def domain_warp(x, y, perm, amount=1.0, octaves=3, basis=simplex2, period=None):
+    """fBm sampled at (x, y) pushed by `amount` along two other fBm fields."""
+    x, y = _grid(x, y, perm)
+    kw = {'octaves': octaves, 'basis': basis, 'period': period}
+    # Offsets stay whole lattice units so a periodic field stays periodic
+    qx = fbm(x + 17.0, y + 3.0, perm, **kw)
+    qy = fbm(x + 5.0, y + 29.0, perm, **kw)
+    return fbm(x + amount * qx, y + amount * qy, perm, **kw)
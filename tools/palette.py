@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Interned colour palettes and palette-indexed canvases for the pixel generators.
+
+Every IndexedCanvas interns the (r, g, b, a) colours written to it in its
+own ColorTable and stores one uint8 index per pixel (a quarter of the RGBA
+size); it turns into RGBA only at encode time, with one gather through the
+table's lookup array. A table holds at most MAX_COLORS colours, transparent
+included, and says which canvas overflowed instead of failing somewhere in
+the middle of a full render. Tables live and die with their canvases, so
+neither a full build nor a long `watch` session accumulates colours.
+
+A Palette is what the canvases of one generator module share: the colour
+helpers (hex_to_rgba, darken, lighten, blend), memoized with exactly the
+same integer rounding, so `pal_c(pal, 'metal')` in every weapon template
+is a dict hit instead of a string parse, and a theme. retheme() maps old
+colours to new ones for every canvas made from the palette, so they
+re-encode in the new colours without re-running their generator.
+
+Palettes live in one process-wide registry, one per generator module.
+"""
+
+import numpy as np
+
+from pngio import encode_png
+
+MAX_COLORS = 256
+TRANSPARENT = (0, 0, 0, 0)
+
+_PALETTES = {}
+
+
+def get_palette(name):
+    """The registry's palette called `name`, created empty on first use."""
+    if name not in _PALETTES:
+        _PALETTES[name] = Palette(name)
+    return _PALETTES[name]
+
+
+class Palette:
+    """Memoized colour helpers and a colour theme shared by a module's canvases."""
+
+    def __init__(self, name):
+        self.name = name
+        self.theme = {}     # old (r, g, b, a) -> new, see retheme()
+        self.version = 0    # bumped by retheme() so tables rebuild their lookup arrays
+        self._derived = {}
+
+    def retheme(self, mapping):
+        """Replace colours: {old (r, g, b, a): new (r, g, b, a)}.
+
+        Existing canvases keep their indices and pick up the new colours.
+        """
+        for old, new in mapping.items():
+            old, new = tuple(int(v) for v in old), tuple(int(v) for v in new)
+            for k, v in self.theme.items():
+                if v == old:
+                    self.theme[k] = new
+            self.theme[old] = new
+        self.version += 1
+        self._derived.clear()
+
+    # ── Memoized colour helpers ─────────────────────────────────────────
+
+    def _memo(self, key, compute):
+        c = self._derived.get(key)
+        if c is None:
+            c = self._derived[key] = compute()
+        return c
+
+    def hex(self, h, a=255):
+        def compute():
+            s = h.lstrip('#')
+            return (int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16), a)
+        return self._memo(('hex', h, a), compute)
+
+    def darken(self, c, f=0.65):
+        return self._memo(('darken', c, f),
+                          lambda: (int(c[0]*f), int(c[1]*f), int(c[2]*f), c[3]))
+
+    def lighten(self, c, f=1.4):
+        return self._memo(('lighten', c, f),
+                          lambda: (min(255, int(c[0]*f)), min(255, int(c[1]*f)),
+                                   min(255, int(c[2]*f)), c[3]))
+
+    def blend(self, c1, c2, t):
+        return self._memo(('blend', c1, c2, t),
+                          lambda: tuple(int(c1[k]*(1-t) + c2[k]*t) for k in range(4)))
+
+    def canvas(self, w, h):
+        return IndexedCanvas(ColorTable(self), w, h)
+
+
+class ColorTable:
+    """The interned colours of one canvas; index 0 is always transparent."""
+
+    def __init__(self, palette):
+        self.palette = palette
+        self.colors = []
+        self._index = {}
+        self._lut = None
+        self._lut_version = None
+        self.intern(TRANSPARENT)
+
+    def __len__(self):
+        return len(self.colors)
+
+    def intern(self, c):
+        """The index of colour c, adding it to the table if new."""
+        i = self._index.get(c)
+        if i is None:
+            c = tuple(int(v) for v in c)
+            i = self._index.get(c)
+            if i is None:
+                if len(self.colors) >= MAX_COLORS:
+                    raise ValueError(f'{self.palette.name!r} canvas needs more than {MAX_COLORS} '
+                                     f'colours (adding {c}); draw it on an RGBA list canvas')
+                i = len(self.colors)
+                self.colors.append(c)
+                self._lut = None
+            self._index[c] = i
+        return i
+
+    def color(self, i):
+        c = self.colors[i]
+        return self.palette.theme.get(c, c)
+
+    def lut(self):
+        """[len(self), 4] uint8 lookup array, themed; rebuilt only after a change."""
+        if self._lut is None or self._lut_version != self.palette.version:
+            theme = self.palette.theme
+            self._lut = np.array([theme.get(c, c) for c in self.colors], dtype=np.uint8).reshape(-1, 4)
+            self._lut_version = self.palette.version
+        return self._lut
+
+
+# ── Indexed canvas ─────────────────────────────────────────────────────
+
+class _IndexedRow:
+    """px[y] view so generator helpers can keep writing px[y][x] = c."""
+
+    __slots__ = ('_canvas', '_y')
+
+    def __init__(self, canvas, y):
+        self._canvas = canvas
+        self._y = y
+
+    def __len__(self):
+        return self._canvas.w
+
+    def __getitem__(self, x):
+        return self._canvas.colors.color(self._canvas.index[self._y, x])
+
+    def __setitem__(self, x, c):
+        self._canvas.index[self._y, x] = self._canvas.colors.intern(c)
+
+    def __iter__(self):
+        color = self._canvas.colors.color
+        return (color(i) for i in self._canvas.index[self._y].tolist())
+
+
+class IndexedCanvas:
+    """An (h, w) uint8 grid of ColorTable indices that reads like a list-of-rows canvas."""
+
+    def __init__(self, colors, w, h):
+        self.colors = colors
+        self.w = w
+        self.h = h
+        self.index = np.zeros((h, w), dtype=np.uint8)
+
+    def __len__(self):
+        return self.h
+
+    def __getitem__(self, y):
+        return _IndexedRow(self, y % self.h if y < 0 else y)
+
+    def __iter__(self):
+        return (_IndexedRow(self, y) for y in range(self.h))
+
+    def fill_rect(self, x, y, w, h, c):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.w), min(y + h, self.h)
+        if x1 > x0 and y1 > y0:
+            self.index[y0:y1, x0:x1] = self.colors.intern(c)
+
+    def set_px(self, x, y, c):
+        if 0 <= y < self.h and 0 <= x < self.w:
+            self.index[y, x] = self.colors.intern(c)
+
+    def to_rgba(self):
+        """(h, w, 4) uint8 through one lookup-table gather."""
+        return self.colors.lut()[self.index]
+
+    def encode(self, level=-1):
+        return encode_png(self.to_rgba(), level)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Read and write 8-bit RGBA PNGs as NumPy arrays.
+Raw chunks with stdlib zlib, no PIL; the pixel-art gen_* scripts encode
+through encode_png(). A decoder lets build stages consume what the
+generators wrote to tileArt/.
+Palette PNGs (PLTE + tRNS, see quantize.py) are written and read as well;
+they decode to RGBA like everything else.
+
+write_png_stream() encodes images too large to hold raw (world maps, big
+atlas pages) from a generator of row bands, compressing bands in parallel.
+"""
+
+import collections
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PNG_SIG = b'\x89PNG\r\n\x1a\n'
+
+# Channels per pixel for the 8-bit colour types we read (gray, RGB, palette, gray+A, RGBA)
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+# ── Header ─────────────────────────────────────────────────────────────
+
+def read_header(path):
+    """Return (width, height, bit_depth, color_type) without decoding pixels."""
+    with open(path, 'rb') as f:
+        head = f.read(26)
+    if head[:8] != PNG_SIG or head[12:16] != b'IHDR':
+        raise ValueError(f'{path}: not a PNG file')
+    return struct.unpack('>IIBB', head[16:26])
+
+
+# ── Decoder ────────────────────────────────────────────────────────────
+
+def _iter_chunks(data):
+    pos = 8
+    while pos < len(data):
+        length, ctype = struct.unpack('>I4s', data[pos:pos + 8])
+        yield ctype, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Undo per-row PNG filters. Returns a (height, stride) uint8 array."""
+    src = np.frombuffer(raw, dtype=np.uint8).reshape(height, stride + 1)
+    filters = src[:, 0]
+    out = np.zeros((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.uint8)
+    for y in range(height):
+        line = src[y, 1:]
+        ftype = filters[y]
+        if ftype == 0:
+            cur = line.copy()
+        elif ftype == 1:
+            # Sub is a running sum per channel: vectorize with cumsum mod 256
+            cur = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        elif ftype == 2:
+            cur = line + prev
+        elif ftype in (3, 4):
+            cur = bytearray(line.tobytes())
+            up = prev.tobytes()
+            for i in range(stride):
+                left = cur[i - bpp] if i >= bpp else 0
+                if ftype == 3:
+                    cur[i] = (cur[i] + ((left + up[i]) >> 1)) & 0xFF
+                else:
+                    ul = up[i - bpp] if i >= bpp else 0
+                    p = left + up[i] - ul
+                    pa, pb, pc = abs(p - left), abs(p - up[i]), abs(p - ul)
+                    if pa <= pb and pa <= pc:
+                        pred = left
+                    elif pb <= pc:
+                        pred = up[i]
+                    else:
+                        pred = ul
+                    cur[i] = (cur[i] + pred) & 0xFF
+            cur = np.frombuffer(bytes(cur), dtype=np.uint8)
+        else:
+            raise ValueError(f'unknown PNG filter type {ftype}')
+        out[y] = cur
+        prev = out[y]
+    return out
+
+
+def decode_png(data):
+    """Decode PNG bytes to a (height, width, 4) uint8 RGBA array."""
+    if data[:8] != PNG_SIG:
+        raise ValueError('not a PNG file')
+    idat = []
+    width = height = color_type = None
+    plte = trns = b''
+    for ctype, body in _iter_chunks(data):
+        if ctype == b'IHDR':
+            width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', body)
+            if depth != 8 or color_type not in _CHANNELS or interlace:
+                raise ValueError(f'unsupported PNG format (depth={depth}, '
+                                 f'color_type={color_type}, interlace={interlace})')
+        elif ctype == b'PLTE':
+            plte = body
+        elif ctype == b'tRNS':
+            trns = body
+        elif ctype == b'IDAT':
+            idat.append(body)
+        elif ctype == b'IEND':
+            break
+
+    channels = _CHANNELS[color_type]
+    rows = _unfilter(zlib.decompress(b''.join(idat)), height, width * channels, channels)
+    px = rows.reshape(height, width, channels)
+    if channels == 4:
+        return px
+    if color_type == 3:
+        lut = np.full((256, 4), 255, dtype=np.uint8)
+        rgb = np.frombuffer(plte, dtype=np.uint8).reshape(-1, 3)
+        lut[:len(rgb), :3] = rgb
+        lut[:len(trns), 3] = np.frombuffer(trns, dtype=np.uint8)
+        return lut[px[..., 0]]
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., 3] = 255
+    if channels in (1, 2):
+        rgba[..., :3] = px[..., :1]
+    else:
+        rgba[..., :3] = px
+    if channels == 2:
+        rgba[..., 3] = px[..., 1]
+    return rgba
+
+
+def read_png(path):
+    with open(path, 'rb') as f:
+        return decode_png(f.read())
+
+
+# ── Encoder ────────────────────────────────────────────────────────────
+
+def _make_chunk(chunk_type, data):
+    length = struct.pack('>I', len(data))
+    crc = struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+    return length + chunk_type + data + crc
+
+
+def encode_png(rgba, level=-1):
+    """Encode a (height, width, 4) uint8 array as PNG bytes (filter: none)."""
+    height, width = rgba.shape[:2]
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = np.ascontiguousarray(rgba, dtype=np.uint8).reshape(height, width * 4)
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (PNG_SIG + _make_chunk(b'IHDR', ihdr)
+            + _make_chunk(b'IDAT', zlib.compress(raw.tobytes(), level))
+            + _make_chunk(b'IEND', b''))
+
+
+def _palette_chunks(palette):
+    """PLTE + tRNS chunks for an [n, 4] uint8 RGBA palette (n <= 256)."""
+    palette = np.asarray(palette, dtype=np.uint8)
+    if not 0 < len(palette) <= 256:
+        raise ValueError(f'palette needs 1..256 colours, got {len(palette)}')
+    alpha = palette[:, 3].tobytes().rstrip(b'\xff')
+    out = _make_chunk(b'PLTE', palette[:, :3].tobytes())
+    if alpha:
+        out += _make_chunk(b'tRNS', alpha)
+    return out
+
+
+def encode_indexed_png(index, palette, level=-1):
+    """Encode (height, width) uint8 palette indices plus an [n, 4] RGBA palette as PNG bytes."""
+    height, width = index.shape
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = index
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+    return (PNG_SIG + _make_chunk(b'IHDR', ihdr) + _palette_chunks(palette)
+            + _make_chunk(b'IDAT', zlib.compress(raw.tobytes(), level))
+            + _make_chunk(b'IEND', b''))
+
+
+def write_png(path, rgba):
+    data = encode_png(rgba)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return data
+
+
+# ── Streaming encoder ──────────────────────────────────────────────────
+#
+# pigz-style parallel deflate: every band is compressed on its own as raw
+# deflate, primed with the last 32 KiB of the previous band as a preset
+# dictionary and ended with Z_FULL_FLUSH (byte-aligned, no final block), so
+# the pieces concatenate into one valid zlib stream. zlib releases the GIL,
+# so a thread pool keeps every core busy. Only the zlib header and the
+# Adler-32 trailer (combined from per-band checksums) are serial.
+
+_WINDOW = 32 * 1024
+_ADLER_BASE = 65521
+ZLIB_HEADER = b'\x78\x9c'
+
+
+def adler32_combine(adler1, adler2, len2):
+    """Adler-32 of A + B from adler32(A), adler32(B) and len(B)."""
+    a1, b1 = adler1 & 0xFFFF, adler1 >> 16
+    a2, b2 = adler2 & 0xFFFF, adler2 >> 16
+    a = (a1 + a2 - 1) % _ADLER_BASE
+    b = (b1 + b2 + len2 % _ADLER_BASE * (a1 - 1)) % _ADLER_BASE
+    return (b << 16) | a
+
+
+def _compress_band(raw, zdict, level, last):
+    if zdict:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = c.compress(raw) + c.flush(zlib.Z_FINISH if last else zlib.Z_FULL_FLUSH)
+    return body, zlib.adler32(raw), len(raw)
+
+
+def _band_rows(band, width, bpp=4):
+    """Filter-type-0 scanlines for a (rows, width, 4) band (or (rows, width) indices), as bytes."""
+    rows = band.shape[0]
+    raw = np.zeros((rows, width * bpp + 1), dtype=np.uint8)
+    raw[:, 1:] = np.ascontiguousarray(band, dtype=np.uint8).reshape(rows, width * bpp)
+    return raw.tobytes()
+
+
+def iter_bands(rgba, rows=256):
+    """Slice an in-memory (h, w, 4) array into row bands for write_png_stream()."""
+    for y in range(0, rgba.shape[0], rows):
+        yield rgba[y:y + rows]
+
+
+def write_png_stream(path, width, height, bands, level=6, workers=None, max_pending=None,
+                     palette=None):
+    """Write a PNG from an iterable of (rows, width, 4) uint8 bands, top to bottom.
+
+    With an [n, 4] RGBA `palette` the image is a palette PNG and the bands
+    are (rows, width) uint8 indices instead.
+
+    Each band becomes one IDAT chunk. At most `max_pending` bands (default
+    twice the worker count) are raw or in flight at once, so memory stays a
+    few bands regardless of image size. Returns the number of bytes written.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    if palette is None:
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+        head, band_shape, bpp = b'', (width, 4), 4
+    else:
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+        head, band_shape, bpp = _palette_chunks(palette), (width,), 1
+    pending = collections.deque()
+    adler, rows_seen, written = 1, 0, 0
+
+    with open(path, 'wb') as f, ThreadPoolExecutor(workers) as pool:
+        def emit(data):
+            nonlocal written
+            f.write(data)
+            written += len(data)
+
+        def drain(keep):
+            nonlocal adler
+            while len(pending) > keep:
+                body, band_adler, n = pending.popleft().result()
+                adler = adler32_combine(adler, band_adler, n)
+                emit(_make_chunk(b'IDAT', body))
+
+        emit(PNG_SIG + _make_chunk(b'IHDR', ihdr) + head + _make_chunk(b'IDAT', ZLIB_HEADER))
+        zdict = b''
+        for band in bands:
+            if band.shape[1:] != band_shape:
+                raise ValueError(f'band shape {band.shape} does not match width {width}')
+            rows_seen += band.shape[0]
+            if rows_seen > height:
+                raise ValueError(f'bands exceed image height {height}')
+            raw = _band_rows(band, width, bpp)
+            pending.append(pool.submit(_compress_band, raw, zdict, level, rows_seen == height))
+            zdict = raw[-_WINDOW:]
+            drain(max_pending)
+        if rows_seen != height:
+            raise ValueError(f'bands cover {rows_seen} rows, expected {height}')
+        drain(0)
+        emit(_make_chunk(b'IDAT', struct.pack('>I', adler)) + _make_chunk(b'IEND', b''))
+    return written
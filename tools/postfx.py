@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Whole-array post-process passes for RGBA sprites.
+
+Every pass takes a (..., h, w, 4) uint8 array and returns a new one, so the
+same call works on a single sprite or a stacked [N, h, w, 4] batch.
+
+    outline      1px/2px outline grown from the alpha mask (4- or 8-neighbour dilation)
+    shadow       offset drop shadow composited underneath
+    glow         additive halo from a separable box blur of the alpha mask
+    hue_shift    HSV hue rotation plus saturation/value scaling
+    desaturate   blend toward luma grey and scale brightness
+
+Generator modules declare passes per registry entry in a POSTFX dict:
+
+    POSTFX = {
+        'wraith': [('glow', {'color': '#88ccff', 'radius': 2})],
+        'drake':  [('outline', {'color': '#1a1a1a'}), ('shadow', {})],
+    }
+
+registry.render_entry() applies them, for `render`, the golden tests and
+each gen_*.py main() alike (gen_sorting_sprites' delicate boxes get their
+border this way).
+"""
+
+import numpy as np
+
+
+def parse_color(c):
+    """'#RRGGBB' / '#RRGGBBAA' or an (r, g, b[, a]) tuple -> 4 uint8 values."""
+    if isinstance(c, str):
+        h = c.lstrip('#')
+        c = tuple(int(h[i:i + 2], 16) for i in range(0, len(h), 2))
+    if len(c) == 3:
+        c = (*c, 255)
+    return np.array(c, dtype=np.uint8)
+
+
+# ── Compositing helpers ────────────────────────────────────────────────
+
+def over(top, bottom):
+    """Straight-alpha 'over' composite of two uint8 RGBA arrays."""
+    ta = top[..., 3:4].astype(np.float32) / 255.0
+    ba = bottom[..., 3:4].astype(np.float32) / 255.0
+    oa = ta + ba * (1.0 - ta)
+    rgb = top[..., :3] * ta + bottom[..., :3] * ba * (1.0 - ta)
+    rgb = np.divide(rgb, oa, out=np.zeros_like(rgb), where=oa > 0)
+    out = np.empty(np.broadcast_shapes(top.shape, bottom.shape), dtype=np.uint8)
+    out[..., :3] = np.clip(np.rint(rgb), 0, 255)
+    out[..., 3:] = np.clip(np.rint(oa * 255.0), 0, 255)
+    return out
+
+
+def _shift(mask, dx, dy):
+    """Translate the last two axes of a mask by (dx, dy), filling with zeros."""
+    out = np.zeros_like(mask)
+    h, w = mask.shape[-2:]
+    if abs(dx) >= w or abs(dy) >= h:
+        return out
+    src = mask[..., max(-dy, 0):h - max(dy, 0), max(-dx, 0):w - max(dx, 0)]
+    out[..., max(dy, 0):h - max(-dy, 0), max(dx, 0):w - max(-dx, 0)] = src
+    return out
+
+
+def dilate(mask, steps=1, corners=False):
+    """4-neighbour binary dilation of a (..., h, w) bool mask; 8-neighbour with corners=True."""
+    for _ in range(steps):
+        if corners:
+            # A 3x3 square is a horizontal then a vertical 3-pixel run
+            mask = mask | _shift(mask, 1, 0) | _shift(mask, -1, 0)
+            mask = mask | _shift(mask, 0, 1) | _shift(mask, 0, -1)
+        else:
+            mask = (mask | _shift(mask, 1, 0) | _shift(mask, -1, 0)
+                    | _shift(mask, 0, 1) | _shift(mask, 0, -1))
+    return mask
+
+
+def box_blur(a, radius):
+    """Separable box blur over the last two axes of a float array (zero edges)."""
+    k = 2 * radius + 1
+    for axis in (-1, -2):
+        pad = [(0, 0)] * a.ndim
+        pad[axis] = (radius + 1, radius)
+        c = np.cumsum(np.pad(a, pad), axis=axis)
+        n = a.shape[axis]
+        a = (np.take(c, np.arange(k, k + n), axis=axis)
+             - np.take(c, np.arange(0, n), axis=axis)) / k
+    return a
+
+
+# ── Passes ─────────────────────────────────────────────────────────────
+
+def outline(rgba, color='#000000', width=1, corners=False):
+    """Paint transparent pixels within `width` steps of the sprite in `color`;
+    corners=True also fills the diagonal steps, giving boxes square corners."""
+    solid = rgba[..., 3] > 0
+    ring = dilate(solid, width, corners) & ~solid
+    out = rgba.copy()
+    out[ring] = parse_color(color)
+    return out
+
+
+def shadow(rgba, dx=1, dy=1, color=(0, 0, 0, 96)):
+    """Drop shadow: the alpha mask offset by (dx, dy), drawn under the sprite."""
+    c = parse_color(color)
+    mask = _shift(rgba[..., 3], dx, dy).astype(np.float32) / 255.0
+    under = np.zeros_like(rgba)
+    under[..., :3] = c[:3]
+    under[..., 3] = np.rint(mask * c[3]).astype(np.uint8)
+    return over(rgba, under)
+
+
+def glow(rgba, color='#ffffff', radius=2, strength=1.0):
+    """Additive halo: blurred alpha tinted by `color`, added under and around the sprite."""
+    c = parse_color(color).astype(np.float32)
+    halo = np.clip(box_blur(rgba[..., 3].astype(np.float32) / 255.0, radius) * strength, 0, 1)
+    halo *= c[3] / 255.0
+    out = rgba.astype(np.float32)
+    out[..., :3] += c[:3] * halo[..., None] * (1.0 - out[..., 3:4] / 255.0)
+    out[..., 3] = np.maximum(out[..., 3], halo * 255.0)
+    # Pixels the halo created from nothing take the glow colour outright
+    fresh = rgba[..., 3] == 0
+    out[..., :3][fresh] = c[:3]
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+def rgb_to_hsv(rgb):
+    """(..., 3) float RGB in 0..1 -> (..., 3) HSV with hue in 0..1."""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    mx = rgb.max(axis=-1)
+    mn = rgb.min(axis=-1)
+    d = mx - mn
+    safe = np.where(d > 0, d, 1.0)
+    h = np.where(mx == r, (g - b) / safe,
+                 np.where(mx == g, 2.0 + (b - r) / safe, 4.0 + (r - g) / safe))
+    h = np.where(d > 0, (h / 6.0) % 1.0, 0.0)
+    s = np.where(mx > 0, d / np.where(mx > 0, mx, 1.0), 0.0)
+    return np.stack([h, s, mx], axis=-1)
+
+
+def hsv_to_rgb(hsv):
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int64) % 6
+    choices = [np.stack(c, axis=-1) for c in
+               ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))]
+    return np.choose(i[..., None], choices)
+
+
+def hue_shift(rgba, hue=0.0, saturation=1.0, value=1.0):
+    """Rotate hue by `hue` turns (0..1) and scale saturation/value; alpha is kept."""
+    hsv = rgb_to_hsv(rgba[..., :3].astype(np.float32) / 255.0)
+    hsv[..., 0] = (hsv[..., 0] + hue) % 1.0
+    hsv[..., 1] = np.clip(hsv[..., 1] * saturation, 0, 1)
+    hsv[..., 2] = np.clip(hsv[..., 2] * value, 0, 1)
+    out = rgba.copy()
+    out[..., :3] = np.clip(np.rint(hsv_to_rgb(hsv) * 255.0), 0, 255)
+    return out
+
+
+def desaturate(rgba, amount=1.0, value=1.0):
+    """Blend toward Rec.601 luma by `amount` (1 = grey) and scale by `value`."""
+    rgb = rgba[..., :3].astype(np.float32)
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    rgb = (rgb + (luma[..., None] - rgb) * amount) * value
+    out = rgba.copy()
+    out[..., :3] = np.clip(np.rint(rgb), 0, 255)
+    return out
+
+
+def sweep_masks(h, w, steps, cx=None, cy=None):
+    """[steps, h, w] bool masks of a clockwise cooldown sweep from 12 o'clock.
+
+    Frame i is True where the sweep has not yet passed, i.e. the pixel's
+    clockwise angle is at least i / steps of a full turn.
+    """
+    cx = (w - 1) / 2 if cx is None else cx
+    cy = (h - 1) / 2 if cy is None else cy
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+    turn = (np.arctan2(xs - cx, cy - ys) / (2 * np.pi)) % 1.0
+    return turn[None] >= (np.arange(steps, dtype=np.float32) / steps)[:, None, None]
+
+
+PASSES = {
+    'outline': outline,
+    'shadow': shadow,
+    'glow': glow,
+    'hue_shift': hue_shift,
+    'desaturate': desaturate,
+}
+
+
+def apply_passes(rgba, specs):
+    """Run [(pass_name, params), ...] in order."""
+    for name, params in specs:
+        if name not in PASSES:
+            raise ValueError(f'unknown post-process pass {name!r}')
+        rgba = PASSES[name](rgba, **params)
+    return rgba
+
+
+def declared_passes(module, name):
+    """The passes a generator module's POSTFX dict declares for one entry."""
+    return [list(spec) for spec in getattr(module, 'POSTFX', {}).get(name, ())]
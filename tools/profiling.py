@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Per-generator profiling: time, drawing-primitive calls and overdraw.
+
+profile_entry() runs one registry entry's generator several times, once
+per measurement, so no instrument inflates another's numbers:
+
+    ms            wall time of a plain gen() call
+    calls         {helper: count} for the module's drawing helpers (its
+                  functions taking the canvas `px` first: set_px,
+                  fill_rect, draw_line, draw_sword, ...)
+    writes        pixel writes, on every canvas the generator made
+                  (LayeredCanvas layers included)
+    pixels        distinct pixels written
+    overwritten   writes - pixels: writes to an already drawn pixel
+    overdraw      writes / pixels
+    heat          (h, w) 1 for every drawn pixel plus its overwrites on
+                  each canvas the size of the sprite
+    peak_kib      tracemalloc peak during gen(), with memory=True
+    stats         pstats.Stats of gen() under cProfile, with cprofile=True
+
+Counting works by handing the generator a CountingCanvas from its
+module's new_canvas(), so it applies to the list-of-rows and indexed
+canvas modules; the rest (pycairo, NumPy texture strips) report time,
+memory and cProfile only.
+
+    format_report(rows, sort)   table sorted by any column
+    heatmap(profile)            sprite | heat strip: one write green,
+                                then yellow, orange and red for four
+                                or more
+"""
+
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+import types
+from collections import namedtuple
+
+import numpy as np
+
+import registry
+
+PROFILE_DIR = os.path.join(registry.TOOLS_DIR, '..', '.asset-cache', 'profile')
+SORT_KEYS = ('overdraw', 'overwritten', 'writes', 'calls', 'ms', 'memory', 'id')
+
+# Writes per pixel -> colour; the last entry stands for that many or more
+HEAT_COLORS = np.array([(0, 0, 0), (46, 139, 87), (230, 200, 40), (240, 130, 30), (215, 35, 35)],
+                       dtype=np.uint8)
+HEATMAP_HEIGHT = 128
+
+
+class Profile(namedtuple('Profile', 'id ms calls writes pixels heat peak_kib stats rgba')):
+    __slots__ = ()
+
+    @property
+    def overwritten(self):
+        return None if self.writes is None else self.writes - self.pixels
+
+    @property
+    def overdraw(self):
+        return None if not self.pixels else self.writes / self.pixels
+
+
+# ── Counting canvas ────────────────────────────────────────────────────
+
+class _CountingRow(list):
+    __slots__ = ('_counts', '_base')
+
+    def __setitem__(self, x, c):
+        list.__setitem__(self, x, c)
+        self._counts[self._base + x % len(self)] += 1
+
+
+class CountingCanvas(list):
+    """A new_canvas() stand-in that counts the writes to every pixel."""
+
+    def __init__(self, w, h, fill=(0, 0, 0, 0)):
+        self.w = w
+        self.h = h
+        self.counts = [0] * (w * h)
+        rows = []
+        for y in range(h):
+            row = _CountingRow([fill] * w)
+            row._counts = self.counts
+            row._base = y * w
+            rows.append(row)
+        super().__init__(rows)
+
+    # The indexed-canvas API, for modules whose fill_rect/set_px delegate to it
+    def fill_rect(self, x, y, w, h, c):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.w), min(y + h, self.h)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self[yy][xx] = c
+
+    def set_px(self, x, y, c):
+        if 0 <= y < self.h and 0 <= x < self.w:
+            self[y][x] = c
+
+    def heat(self):
+        return np.array(self.counts, dtype=np.int32).reshape(self.h, self.w)
+
+
+def _draws(name, fn):
+    """True for a module's drawing helpers: functions whose first parameter is the canvas."""
+    if not isinstance(fn, types.FunctionType) or name.startswith('gen_'):
+        return False
+    code = fn.__code__
+    return code.co_argcount > 0 and code.co_varnames[0] == 'px'
+
+
+def _counted(name, fn, calls):
+    def wrapper(*args, **kwargs):
+        calls[name] = calls.get(name, 0) + 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@contextlib.contextmanager
+def _instrumented(module, canvases, calls):
+    overrides = {name: _counted(name, fn, calls) for name, fn in vars(module).items()
+                 if getattr(fn, '__module__', None) == module.__name__ and _draws(name, fn)}
+
+    def new_canvas(w=module.SIZE, h=module.SIZE):
+        canvas = CountingCanvas(w, h)
+        canvases.append(canvas)
+        return canvas
+
+    overrides['new_canvas'] = new_canvas
+    saved = {name: getattr(module, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(module, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+# ── Profiling ──────────────────────────────────────────────────────────
+
+def profile_entry(sprite, module, gen, cprofile=False, memory=False):
+    """Profile of one registry entry (see the module docstring)."""
+    start = time.perf_counter()
+    result = gen()
+    ms = (time.perf_counter() - start) * 1000
+    rgba = registry.to_rgba(result)
+
+    calls = writes = pixels = heat = None
+    if hasattr(module, 'new_canvas'):
+        canvases = []
+        calls = {}
+        with _instrumented(module, canvases, calls):
+            gen()
+        heats = [c.heat() for c in canvases]
+        writes = sum(int(h.sum()) for h in heats)
+        pixels = sum(int(np.count_nonzero(h)) for h in heats)
+        # One per drawn pixel plus its overwrites on each canvas, so copying
+        # LayeredCanvas layers into the final canvas does not count as overdraw
+        heat = np.zeros(rgba.shape[:2], dtype=np.int32)
+        drawn = np.zeros(rgba.shape[:2], dtype=bool)
+        for h in heats:
+            if h.shape == heat.shape:
+                heat += np.maximum(h - 1, 0)
+                drawn |= h > 0
+        heat += drawn
+
+    peak_kib = None
+    if memory:
+        tracemalloc.start()
+        try:
+            gen()
+            peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    stats = None
+    if cprofile:
+        prof = cProfile.Profile()
+        prof.runcall(gen)
+        stats = pstats.Stats(prof, stream=io.StringIO())
+
+    return Profile(sprite, ms, calls, writes, pixels, heat, peak_kib, stats, rgba)
+
+
+def profile(ids=None, modules=None, cprofile=False, memory=False, log=None):
+    """Profiles of the selected registry entries; modules that cannot be
+    imported here (pycairo missing) are reported to `log` and skipped."""
+    index = registry.load_index(modules=modules)
+    rows = []
+    skipped = {}
+    for sprite in registry.select(index, ids) if ids else index:
+        entry = index[sprite]
+        try:
+            module, gen = registry.resolve(entry)
+            rows.append(profile_entry(sprite, module, gen, cprofile, memory))
+        except ModuleNotFoundError as e:
+            count, _ = skipped.get(entry.module, (0, None))
+            skipped[entry.module] = (count + 1, e.name)
+    for module, (count, missing) in skipped.items():
+        if log:
+            log(f'  {module}: {count} sprites skipped, {missing} is not installed')
+    return rows
+
+
+# ── Report ─────────────────────────────────────────────────────────────
+
+def _sort_key(sort):
+    if sort == 'id':
+        return lambda p: p.id
+    if sort == 'calls':
+        return lambda p: -sum((p.calls or {}).values())
+    if sort == 'memory':
+        return lambda p: -(p.peak_kib or 0)
+    return lambda p: -(getattr(p, sort) or 0)
+
+
+def _top_function(stats):
+    """'file:line(name)' of the function with the most own time."""
+    key, row = max(stats.stats.items(), key=lambda kv: kv[1][2])
+    return f'{pstats.func_std_string(key)} {row[2] * 1000:.1f} ms'
+
+
+def format_report(rows, sort='overdraw', top=20):
+    if sort not in SORT_KEYS:
+        raise ValueError(f'unknown sort key {sort!r}; choose from {", ".join(SORT_KEYS)}')
+    rows = sorted(rows, key=_sort_key(sort))
+    lines = [f"{'sprite':<32} {'ms':>7} {'calls':>6} {'writes':>7} {'pixels':>7} "
+             f"{'overwr':>7} {'overdraw':>8} {'peak KiB':>8}  top helpers"]
+
+    def num(v, fmt):
+        return format(v, fmt) if v is not None else '-'
+
+    for p in rows[:top]:
+        helpers = ', '.join(f'{n} {c}' for n, c in
+                            sorted((p.calls or {}).items(), key=lambda kv: -kv[1])[:3])
+        lines.append(f"{p.id:<32} {p.ms:>7.2f} {num(p.calls and sum(p.calls.values()), 'd'):>6} "
+                     f"{num(p.writes, 'd'):>7} {num(p.pixels, 'd'):>7} {num(p.overwritten, 'd'):>7} "
+                     f"{num(p.overdraw, '.2f'):>8} {num(p.peak_kib, '.1f'):>8}  {helpers}")
+        if p.stats is not None:
+            lines.append(f"{'':<32}   hottest: {_top_function(p.stats)}")
+    if len(rows) > top:
+        lines.append(f'... {len(rows) - top} more (--top)')
+    counted = [p for p in rows if p.writes]
+    if counted:
+        writes = sum(p.writes for p in counted)
+        pixels = sum(p.pixels for p in counted)
+        lines.append(f'\n{len(rows)} sprites, {sum(p.ms for p in rows):.0f} ms; '
+                     f'{writes} writes to {pixels} pixels across {len(counted)} counted sprites '
+                     f'(overdraw {writes / pixels:.2f})')
+    return '\n'.join(lines)
+
+
+# ── Heatmap ────────────────────────────────────────────────────────────
+
+def heatmap(prof):
+    """(H, W, 4) uint8: the sprite next to its writes-per-pixel map, enlarged."""
+    h, w = prof.heat.shape
+    heat = np.zeros((h, w, 4), dtype=np.uint8)
+    heat[..., :3] = HEAT_COLORS[np.minimum(prof.heat, len(HEAT_COLORS) - 1)]
+    heat[..., 3] = np.where(prof.heat > 0, 255, 0)
+    gap = np.zeros((h, 2, 4), dtype=np.uint8)
+    strip = np.concatenate([prof.rgba, gap, heat], axis=1)
+    scale = max(1, HEATMAP_HEIGHT // h)
+    return strip.repeat(scale, axis=0).repeat(scale, axis=1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Colour quantization of RGBA images (atlas pages) to one palette of <= 256 colours.
+
+    median_cut   split the weighted colour set along its widest channel at
+                 the weighted median until there are k boxes; their means
+                 seed the palette
+    kmeans       a few Lloyd steps over the unique colours, weighted by
+                 how many pixels use each
+    quantize     both of the above, then map every pixel to its nearest
+                 palette entry, optionally through an 8x8 Bayer ordered
+                 dither; returns uint8 indices plus the palette
+    psnr         peak signal-to-noise ratio of the result, in dB
+
+Clustering happens on the unique colours of the image, not on its pixels,
+so a 1024x1024 page of pixel art costs about as much as its few thousand
+distinct colours. Colours are compared premultiplied by alpha, so faint
+anti-aliased edges do not take palette entries from solid colours.
+Fully transparent pixels always map to entry 0, (0, 0, 0, 0).
+
+An image with no more distinct colours than the palette allows is
+mapped losslessly; only the anti-aliased cairo output really gets
+quantized.
+"""
+
+import numpy as np
+
+MAX_COLORS = 256
+KMEANS_STEPS = 4
+DITHER_SPREAD = 12.0  # ordered-dither amplitude in 0..255 units
+_CHUNK = 1 << 15      # pixels per nearest-colour block
+
+
+def _bayer(n=8):
+    """n x n Bayer threshold matrix in [0, 1)."""
+    m = np.zeros((1, 1))
+    while m.shape[0] < n:
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return (m + 0.5) / m.size
+
+
+def _premultiply(colors):
+    """[n, 4] uint8 -> [n, 4] float32 with RGB scaled by alpha."""
+    c = colors.astype(np.float32)
+    c[:, :3] *= c[:, 3:] / 255.0
+    return c
+
+
+def _unpremultiply(centers):
+    """Inverse of _premultiply, rounded back to uint8."""
+    c = centers.copy()
+    a = c[:, 3:]
+    c[:, :3] = np.divide(c[:, :3] * 255.0, a, out=np.zeros_like(c[:, :3]), where=a > 0)
+    return np.clip(np.rint(c), 0, 255).astype(np.uint8)
+
+
+def unique_colors(rgba):
+    """(colors [n, 4] uint8, counts [n], inverse [h * w]) of an RGBA image."""
+    packed = np.ascontiguousarray(rgba).reshape(-1, 4).view(np.uint32).ravel()
+    keys, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    return keys.view(np.uint8).reshape(-1, 4), counts, inverse.ravel()
+
+
+# ── Palette search ─────────────────────────────────────────────────────
+
+def _box(points, weights, idx):
+    """(score, widest axis, members) of a median-cut box."""
+    p = points[idx]
+    span = p.max(axis=0) - p.min(axis=0)
+    axis = int(np.argmax(span))
+    score = float(span[axis] * weights[idx].sum()) if len(idx) > 1 else 0.0
+    return score, axis, idx
+
+
+def median_cut(points, weights, k):
+    """Seed k centres from weighted points [n, d] by repeated weighted-median splits."""
+    boxes = [_box(points, weights, np.arange(len(points)))]
+    while len(boxes) < k:
+        # Split the box with the largest weighted spread along its widest channel
+        best = max(range(len(boxes)), key=lambda i: boxes[i][0])
+        score, axis, idx = boxes[best]
+        if score == 0.0:
+            break
+        boxes.pop(best)
+        order = idx[np.argsort(points[idx, axis], kind='stable')]
+        cum = np.cumsum(weights[order])
+        cut = int(np.searchsorted(cum, cum[-1] / 2.0))
+        cut = min(max(cut, 1), len(order) - 1)
+        boxes += [_box(points, weights, order[:cut]), _box(points, weights, order[cut:])]
+    return np.array([np.average(points[idx], axis=0, weights=weights[idx]) for _, _, idx in boxes],
+                    dtype=np.float32)
+
+
+def nearest(points, centers):
+    """Index of the nearest centre (squared Euclidean) for every point, in blocks."""
+    c2 = (centers * centers).sum(axis=1)
+    out = np.empty(len(points), dtype=np.intp)
+    for s in range(0, len(points), _CHUNK):
+        p = points[s:s + _CHUNK]
+        out[s:s + _CHUNK] = np.argmin(c2[None, :] - 2.0 * p @ centers.T, axis=1)
+    return out
+
+
+def kmeans(points, weights, centers, steps=KMEANS_STEPS):
+    """Weighted Lloyd refinement; empty clusters keep their previous centre."""
+    centers = centers.copy()
+    w = weights.astype(np.float32)
+    for _ in range(steps):
+        label = nearest(points, centers)
+        total = np.bincount(label, weights=w, minlength=len(centers))
+        for d in range(points.shape[1]):
+            sums = np.bincount(label, weights=w * points[:, d], minlength=len(centers))
+            np.divide(sums, total, out=centers[:, d], where=total > 0)
+    return centers
+
+
+# ── Quantize ───────────────────────────────────────────────────────────
+
+def quantize(rgba, colors=MAX_COLORS, dither=False, steps=KMEANS_STEPS):
+    """Map an (h, w, 4) uint8 image to (indices (h, w) uint8, palette [n, 4] uint8)."""
+    if not 2 <= colors <= MAX_COLORS:
+        raise ValueError(f'colors must be 2..{MAX_COLORS}')
+    h, w = rgba.shape[:2]
+    uniq, counts, inverse = unique_colors(rgba)
+    clear = uniq[:, 3] == 0
+    solid = np.nonzero(~clear)[0]
+
+    if len(solid) < colors:
+        # Lossless: every visible colour gets its own entry after the transparent one
+        palette = np.concatenate([np.zeros((1, 4), np.uint8), uniq[solid]])
+        lut = np.zeros(len(uniq), dtype=np.uint8)
+        lut[solid] = np.arange(1, len(solid) + 1)
+        return lut[inverse].reshape(h, w), palette
+
+    points = _premultiply(uniq[solid])
+    centers = kmeans(points, counts[solid], median_cut(points, counts[solid], colors - 1), steps)
+    palette = np.concatenate([np.zeros((1, 4), np.uint8), _unpremultiply(centers)])
+    centers = _premultiply(palette[1:])
+
+    if not dither:
+        lut = np.zeros(len(uniq), dtype=np.uint8)
+        lut[solid] = nearest(points, centers) + 1
+        return lut[inverse].reshape(h, w), palette
+
+    # Ordered dither: nudge each pixel by its Bayer threshold, then map per pixel
+    flat = rgba.reshape(-1, 4)
+    visible = np.nonzero(flat[:, 3] > 0)[0]
+    tile = _bayer(8) - 0.5
+    ys, xs = np.divmod(visible, w)
+    offset = (tile[ys % 8, xs % 8] * DITHER_SPREAD).astype(np.float32)
+    px = _premultiply(flat[visible])
+    px[:, :3] += offset[:, None] * (px[:, 3:] / 255.0)
+    index = np.zeros(h * w, dtype=np.uint8)
+    index[visible] = nearest(px, centers) + 1
+    return index.reshape(h, w), palette
+
+
+def psnr(a, b):
+    """PSNR in dB between two uint8 images (inf when identical)."""
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return float('inf') if mse == 0 else float(10.0 * np.log10(255.0 ** 2 / mse))
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Declarative index of every generated sprite: id -> (module, function, args).
+
+Ids are atlas sprite keys, the path under tileArt/ without '.png'
+('items/iron_sword', 'player', 'variants/grass'). Every generator module
+in MODULES declares registry dicts of zero-argument callables, each a
+module-level function or a functools.partial of one:
+
+    'items/iron_sword'  ->  gen_item_icons  gen_templated('draw_sword', 2)
+
+    load_index()    {id: Entry}, read from .asset-cache/registry.json;
+                    only a module whose source (or a tools/ module it
+                    imports from) changed since the last run is imported
+                    to rebuild its part
+    resolve(entry)  the entry's callable; imports just that module
+    render(ids)     lazily yields (id, width, height, pixels or PNG bytes)
+                    for every file the selected entries produce, without
+                    touching tileArt/; each generator module exposes the
+                    same as its own `render` over just its entries
+    render_entry()  pixels of one entry (pixel modules through the
+                    draw-op cache), to_rgba() for any generator result;
+                    entry_png() encodes it for the modules' own main()
+    importtime()    per-module import cost of a command, from -X importtime
+
+Nothing here imports NumPy, pycairo or a generator module at import
+time, so `build_assets.py render <id>` pays only for the modules the
+requested ids need. Function arguments are stored by name ({'fn': name},
+looked up in the entry's module).
+"""
+
+import fnmatch
+import importlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from functools import partial
+
+import depgraph
+from lazy import lazy_import
+
+np = lazy_import('numpy')
+drawops = lazy_import('drawops')
+pngio = lazy_import('pngio')
+postfx = lazy_import('postfx')
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+ART_DIR = os.path.join(TOOLS_DIR, '..', 'tileArt')
+INDEX_PATH = os.path.join(TOOLS_DIR, '..', '.asset-cache', 'registry.json')
+INDEX_VERSION = 1
+
+# Generator module -> the registry dicts it declares
+MODULES = {
+    'gen_enemy_sprites': ('GENERATORS', 'ANIMATED_GENERATORS'),
+    'gen_item_icons': ('GENERATORS',),
+    'gen_npc_sprites': ('GENERATORS',),
+    'gen_player_sprite': ('GENERATORS',),
+    'gen_resource_sprites': ('RESOURCES',),
+    'gen_skill_icons': ('GENERATORS',),
+    'gen_sorting_sprites': ('GENERATORS',),
+    'gen_station_sprites': ('GENERATORS',),
+    'gen_tile_variants': ('GENERATORS',),
+    'gen_town_tiles': ('GENERATORS',),
+    'gen_ui_icons': ('ICONS',),
+    'gen_wild_horse': ('GENERATORS',),
+}
+
+# Generator modules built on new_canvas/fill_rect/set_px list canvases
+PIXEL_MODULES = ('gen_enemy_sprites', 'gen_station_sprites', 'gen_npc_sprites', 'gen_skill_icons')
+
+# The resource sprites in tileArt/ were drawn from random.Random(hash(name)),
+# which PYTHONHASHSEED changes per process, before gen_resource_sprites moved
+# to its rng.py streams. No run reproduces them; drop an id here once its
+# PNG is re-rendered (that needs pycairo).
+LEGACY_RESOURCES = frozenset(f'resources/{name}' for name in (
+    'ancient_tree', 'berry_bush', 'bloodbag', 'cave_coal_deposit', 'cave_copper_vein',
+    'cave_crystal_cluster', 'cave_flametal_vein', 'cave_iron_scrap_pile', 'cave_iron_vein',
+    'cave_obsidian_vein', 'cave_silver_vein', 'cave_sulfite_deposit', 'cave_tin_vein',
+    'charred_bone_pile', 'copper_node', 'dragon_egg', 'flametal_node', 'flax_plant', 'frost_pine',
+    'guck_sac', 'iron_deposit', 'loose_stone', 'mushroom_cluster', 'obsidian_large',
+    'obsidian_node', 'silver_vein', 'stick_pile', 'stone_node', 'surtling_core_node', 'thistle',
+    'tin_node', 'wood_dark_oak', 'wood_oak', 'wood_pine'))
+
+# tileArt/ holds hand-drawn animation strips for these ids; their generator
+# entries still draw the earlier single-frame sprites, so `render` keeps
+# the committed files and the golden tests expect a mismatch. The legacy
+# resource sprites are kept the same way.
+HAND_DRAWN = frozenset({'player', 'enemies/boar', 'enemies/rabbit', 'enemies/wild_horse'}) | LEGACY_RESOURCES
+
+Entry = namedtuple('Entry', 'module name function args')
+
+
+# ── Index ──────────────────────────────────────────────────────────────
+
+def _encode(value, module):
+    if callable(value):
+        if getattr(module, getattr(value, '__name__', ''), None) is not value:
+            raise ValueError(f'{module.__name__}: {value!r} is not a module-level function')
+        return {'fn': value.__name__}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v, module) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    raise ValueError(f'{module.__name__}: cannot index argument {value!r}')
+
+
+def _decode(value, module):
+    if isinstance(value, dict):
+        return getattr(module, value['fn'])
+    if isinstance(value, list):
+        return tuple(_decode(v, module) for v in value)
+    return value
+
+
+def describe(module, gen):
+    """(function name, JSON args) of a registry value."""
+    args = []
+    while isinstance(gen, partial):
+        if gen.keywords:
+            raise ValueError(f'{module.__name__}: keyword arguments are not indexed')
+        args = list(gen.args) + args
+        gen = gen.func
+    return _encode(gen, module)['fn'], [_encode(a, module) for a in args]
+
+
+def _stamp(paths):
+    out = {}
+    for path in paths:
+        st = os.stat(path)
+        out[os.path.basename(path)] = [st.st_size, st.st_mtime_ns]
+    return out
+
+
+def _source_files(module):
+    """The module's file and those of the tools/ modules it (transitively) imports from."""
+    files = set()
+    todo = [module.__name__]
+    while todo:
+        name = todo.pop()
+        mod = sys.modules[name]
+        if mod.__file__ in files:
+            continue
+        files.add(mod.__file__)
+        todo += depgraph.imported_from(mod)
+    return sorted(files)
+
+
+def index_module(name):
+    """{'stamp': ..., 'entries': {id: [name, function, args]}} for one generator module."""
+    module = importlib.import_module(name)
+    prefix = os.path.relpath(module.OUT_DIR, ART_DIR).replace(os.sep, '/')
+    entries = {}
+    for registry in MODULES[name]:
+        for key, gen in getattr(module, registry).items():
+            sprite = key if prefix == '.' else f'{prefix}/{key}'
+            entries[sprite] = [key, *describe(module, gen)]
+    return {'stamp': _stamp(_source_files(module)), 'entries': entries}
+
+
+def _fresh(part):
+    try:
+        return _stamp(os.path.join(TOOLS_DIR, f) for f in part['stamp']) == part['stamp']
+    except FileNotFoundError:
+        return False
+
+
+def load_index(path=INDEX_PATH, modules=None):
+    """{id: Entry} for the generator modules (default: all), sorted by id, cached on disk."""
+    cached = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') == INDEX_VERSION:
+            cached = data['modules']
+    dirty = False
+    for name in modules or MODULES:
+        if name not in cached or not _fresh(cached[name]):
+            cached[name] = index_module(name)
+            dirty = True
+    if dirty:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'modules': cached}, f, sort_keys=True)
+        os.replace(tmp, path)
+    index = {}
+    for name in modules or MODULES:
+        for sprite, (key, function, args) in cached[name]['entries'].items():
+            index[sprite] = Entry(name, key, function, args)
+    # Sorted, so a fresh index and one read back from disk list ids alike
+    return dict(sorted(index.items()))
+
+
+def select(index, patterns):
+    """Ids matching any of the shell-style patterns ('items/*_sword'), in index order."""
+    found = [i for i in index if any(fnmatch.fnmatchcase(i, p) for p in patterns)]
+    missing = [p for p in patterns if not any(fnmatch.fnmatchcase(i, p) for i in found)]
+    if missing:
+        raise ValueError(f'no sprite matches {", ".join(missing)}')
+    return found
+
+
+def resolve(entry):
+    """(module, zero-argument callable) of an index entry."""
+    # __import__ rather than importlib.import_module: only the former is
+    # reported by -X importtime
+    module = __import__(entry.module)
+    gen = getattr(module, entry.function)
+    args = [_decode(a, module) for a in entry.args]
+    return module, partial(gen, *args) if args else gen
+
+
+# ── Rendering ──────────────────────────────────────────────────────────
+
+def _surface_rgba(surface):
+    """Straight-alpha RGBA copy of a cairo ARGB32 image surface."""
+    surface.flush()
+    h, w = surface.get_height(), surface.get_width()
+    bgra = np.ndarray((h, w, 4), np.uint8, surface.get_data(), strides=(surface.get_stride(), 4, 1))
+    alpha = bgra[..., 3:4].astype(np.float32)
+    rgb = bgra[..., 2::-1] * 255.0 / np.maximum(alpha, 1)   # un-premultiply, BGR -> RGB
+    out = np.empty((h, w, 4), dtype=np.uint8)
+    out[..., :3] = np.clip(np.rint(rgb), 0, 255)
+    out[..., 3] = bgra[..., 3]
+    return out
+
+
+def to_rgba(result):
+    """(h, w, 4) uint8 from whatever a generator returns: list canvas, indexed
+    canvas, (pixels, w, h), cairo surface, array or PNG bytes."""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, (bytes, bytearray)):
+        return pngio.decode_png(bytes(result))
+    if hasattr(result, 'to_rgba'):
+        return result.to_rgba()
+    if hasattr(result, 'get_data'):
+        return _surface_rgba(result)
+    if isinstance(result, list):
+        return drawops.to_array(result)
+    return np.asarray(result, dtype=np.uint8)
+
+
+def render_entry(module, name, gen):
+    """(h, w, 4) uint8 pixels of one registry entry, post-process passes applied."""
+    if module.__name__ in PIXEL_MODULES:
+        return drawops.replay(drawops.load_or_record(module, name, gen))
+    return postfx.apply_passes(to_rgba(gen()), postfx.declared_passes(module, name))
+
+
+def entry_png(module, name, gen):
+    """PNG bytes of one registry entry, passes applied; what the gen_*.py main()s write."""
+    return pngio.encode_png(render_entry(module, name, gen))
+
+
+def surface_png(module, name, gen):
+    """entry_png() for a pycairo entry; without declared passes the surface
+    is written by cairo itself, keeping the bytes already in tileArt/."""
+    if postfx.declared_passes(module, name):
+        return entry_png(module, name, gen)
+    buf = io.BytesIO()
+    gen().write_to_png(buf)
+    return buf.getvalue()
+
+
+def output_id(path):
+    """Sprite id of an output path: 'skills/disabled/slash' for tileArt/skills/disabled/slash.png."""
+    return os.path.splitext(os.path.relpath(path, ART_DIR))[0].replace(os.sep, '/')
+
+
+def render(ids=None, modules=None, png=False):
+    """Yield (id, width, height, data) for the files the selected entries produce.
+
+    ids are sprite ids or patterns (default: every entry of `modules`, or
+    all); data is an (h, w, 4) uint8 array, or the encoded PNG with png=True.
+    Entries are rendered one at a time as the iterator is consumed.
+    """
+    index = load_index(modules=modules)
+    for sprite in select(index, ids) if ids else index:
+        entry = index[sprite]
+        module, gen = resolve(entry)
+        rgba = render_entry(module, entry.name, gen)
+        for path, img in entry_outputs(module, entry.name, rgba):
+            h, w = img.shape[:2]
+            yield output_id(path), w, h, pngio.encode_png(img) if png else img
+
+
+def entry_outputs(module, name, rgba):
+    """[(path, rgba), ...] a registry entry is written to."""
+    outputs = [(os.path.join(module.OUT_DIR, f'{name}.png'), rgba)]
+    if hasattr(module, 'gen_state_variants'):
+        disabled, sheet = module.gen_state_variants({name: rgba})[name]
+        outputs += [(os.path.join(module.DISABLED_DIR, f'{name}.png'), disabled),
+                    (os.path.join(module.COOLDOWN_DIR, f'{name}.png'), sheet)]
+    return outputs
+
+
+# ── Import-time benchmark ──────────────────────────────────────────────
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def importtime(argv):
+    """Run `python -X importtime argv...`; [(module, self us, cumulative us, depth)] in import order."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'failed')
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
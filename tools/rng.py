@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Per-sprite random streams that are identical on every machine and in every process.
+
+A sprite's seed is the first four bytes of a SHA-1 over
+"<generator>/<sprite>#<variant>", so it does not depend on PYTHONHASHSEED,
+dict order or what else the process rendered before. The stream itself is
+mulberry32, bit-for-bit the same as mulberry32() in scripts/generateTileArt.js.
+
+mulberry32's state only ever advances by a constant, so the n-th output can
+be computed directly from the seed; SpriteRNG uses that to produce values
+in NumPy batches instead of one Python call at a time. Every SpriteRNG owns
+its state, so sprites rendered in worker processes, in any order or
+subset, draw the same numbers as a full serial build.
+"""
+
+import hashlib
+
+import numpy as np
+
+MULBERRY_STEP = 0x6D2B79F5
+BATCH = 256
+
+
+def stable_seed(generator, name, variant=0):
+    """32-bit seed for one sprite variant, stable across runs and machines."""
+    key = f'{generator}/{name}#{variant}'.encode()
+    return int.from_bytes(hashlib.sha1(key).digest()[:4], 'big')
+
+
+def mulberry32(seed, start, count):
+    """Outputs start .. start + count - 1 of the mulberry32 stream for `seed`, as float64 in [0, 1).
+
+    `seed` may be an array of seeds; the result then has shape seed.shape + (count,).
+    """
+    with np.errstate(over='ignore'):
+        i = np.arange(start + 1, start + count + 1, dtype=np.uint64)
+        seed = np.asarray(seed, dtype=np.uint64)[..., None]
+        s = ((seed + i * np.uint64(MULBERRY_STEP)) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        t = (s ^ (s >> np.uint32(15))) * (s | np.uint32(1))
+        t = (t + (t ^ (t >> np.uint32(7))) * (t | np.uint32(61))) ^ t
+        t = t ^ (t >> np.uint32(14))
+    return t / 4294967296.0
+
+
+class SpriteRNG:
+    """A mulberry32 stream with a random.Random-style subset of methods."""
+
+    def __init__(self, seed):
+        self.seed = seed & 0xFFFFFFFF
+        self._pos = 0
+        self._buf = []
+
+    def batch(self, n):
+        """The next n values as a float64 array (after any already buffered by random())."""
+        out = mulberry32(self.seed, self._pos, n)
+        self._pos += n
+        return out
+
+    def random(self):
+        if not self._buf:
+            # Buffered values are consumed from the end
+            self._buf = self.batch(BATCH)[::-1].tolist()
+        return self._buf.pop()
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+def sprite_rng(generator, name, variant=0):
+    """Fresh stream for one sprite variant of a generator module."""
+    return SpriteRNG(stable_seed(generator, name, variant))
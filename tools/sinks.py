@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Output sinks for generated sprites.
+
+    DirectorySink(root)   one file per sprite under root (tileArt/)
+    ArchiveSink(path)     a single uncompressed .zip or .tar of every file;
+                          `ADD tileArt.tar /app/tileArt/` in a Dockerfile
+                          unpacks it as one layer instead of copying
+                          hundreds of small files
+    ContentStore(root)    objects/<sha1[:2]>/<sha1>.png under a cache
+                          directory plus index.json (name -> sha1), so
+                          identical sprites and unchanged builds are
+                          stored once
+    open_sink(spec)       'dir:PATH', 'zip:PATH', 'tar:PATH' or 'cas:PATH';
+                          a bare path picks by its extension
+
+Every sink takes put(name, data), name relative to its root with '/'
+separators, and hands the bytes to a background writer thread, so the
+next sprite renders while the last one is written. flush() waits for the
+queue; close() (or leaving a `with` block) also finishes the output, and
+both re-raise the first write error. An archive that fails, or a `with`
+block that raises, leaves no temporary file behind.
+
+Files are written under a temporary name and os.replace()d into place. A
+file that already holds exactly the new bytes is left alone, so mtimes
+stay put and nodemon does not restart the dev server; `changed` lists the
+names actually written (for an archive: all of them, or none when the
+finished archive is byte-identical to the existing one).
+"""
+
+import hashlib
+import io
+import json
+import os
+import queue
+import tarfile
+import threading
+import zipfile
+
+ART_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tileArt')
+CAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.asset-cache', 'cas')
+MAX_PENDING = 64      # queued writes before put() blocks
+ARCHIVE_TIME = 315532800   # 1980-01-01, the earliest zip timestamp; keeps archives reproducible
+
+
+def replace_file(path, data):
+    """Atomically write data to path unless it already holds exactly those bytes."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        _remove(tmp)
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Sink:
+    """Base class: a writer thread draining put() calls into _write()."""
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.changed = []
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None and self._write(*item):
+                    self.changed.append(item[0])
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, data):
+        """Store one file; True if it changed. Runs on the writer thread."""
+        raise NotImplementedError
+
+    def _finish(self):
+        """Complete the output after the last write."""
+
+    def _raise(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def put(self, name, data):
+        if self._closed:
+            raise ValueError(f'{type(self).__name__} is closed')
+        self._raise()
+        self._queue.put((name, bytes(data)))
+
+    def flush(self):
+        self._queue.join()
+        self._raise()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            self._discard()
+        self._raise()
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the original error; a half-finished output is discarded
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            self._discard()
+
+    def _discard(self):
+        """Drop a partial output after an error."""
+
+
+class DirectorySink(Sink):
+    def __init__(self, root=ART_DIR, **kw):
+        self.root = root
+        super().__init__(**kw)
+
+    def _write(self, name, data):
+        return replace_file(os.path.join(self.root, *name.split('/')), data)
+
+
+class ArchiveSink(Sink):
+    """Uncompressed zip or tar, by the extension of `path`."""
+
+    def __init__(self, path, **kw):
+        self.path = path
+        self.format = 'zip' if path.endswith('.zip') else 'tar'
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp = f'{path}.{os.getpid()}.tmp'
+        if self.format == 'zip':
+            self._archive = zipfile.ZipFile(self._tmp, 'w', zipfile.ZIP_STORED)
+        else:
+            self._archive = tarfile.open(self._tmp, 'w', format=tarfile.PAX_FORMAT)
+        self._names = []
+        super().__init__(**kw)
+
+    def _write(self, name, data):
+        if self.format == 'zip':
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = ARCHIVE_TIME
+            info.mode = 0o644
+            self._archive.addfile(info, io.BytesIO(data))
+        self._names.append(name)
+        return False
+
+    def _finish(self):
+        try:
+            self._archive.close()
+            try:
+                with open(self.path, 'rb') as old, open(self._tmp, 'rb') as new:
+                    same = old.read() == new.read()
+            except FileNotFoundError:
+                same = False
+            if not same:
+                os.replace(self._tmp, self.path)
+                self.changed = list(self._names)
+        finally:
+            _remove(self._tmp)
+
+    def _discard(self):
+        try:
+            self._archive.close()
+        except Exception:
+            pass    # the error being reported is the one that stopped the build
+        finally:
+            _remove(self._tmp)
+
+
+class ContentStore(Sink):
+    """Objects named by the SHA-1 of their bytes, plus an index of names."""
+
+    def __init__(self, root=CAS_DIR, **kw):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        super().__init__(**kw)
+
+    def object_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], f'{sha}.png')
+
+    def _write(self, name, data):
+        sha = hashlib.sha1(data).hexdigest()
+        path = self.object_path(sha)
+        if not os.path.exists(path):
+            replace_file(path, data)
+        if self.index.get(name) == sha:
+            return False
+        self.index[name] = sha
+        return True
+
+    def _finish(self):
+        if self.changed:
+            replace_file(self.index_path, json.dumps(self.index, indent=1, sort_keys=True).encode())
+
+
+SINKS = {'dir': DirectorySink, 'zip': ArchiveSink, 'tar': ArchiveSink, 'cas': ContentStore}
+
+
+def open_sink(spec):
+    """A sink from 'kind:path' (see SINKS) or a bare path (.zip/.tar archive, else a directory)."""
+    kind, sep, path = spec.partition(':')
+    if not sep or kind not in SINKS:
+        kind, path = 'dir', spec
+        if spec.endswith(('.zip', '.tar')):
+            kind = spec.rsplit('.', 1)[1]
+    if kind in ('zip', 'tar') and not path.endswith(f'.{kind}'):
+        raise ValueError(f'{spec}: a {kind} sink needs a path ending in .{kind}')
+    return SINKS[kind](path)
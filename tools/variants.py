@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Elite / boss / corrupted recolours of enemy sprites.
+
+All enemy strips of an atlas bundle are padded into one [N, h, w, 4]
+stack, converted to HSV once and remapped for every variant in a single
+broadcast over a [V, N, h, w] grid. Alpha is untouched, so a variant
+shares its base sprite's trim box and frame layout.
+"""
+
+import numpy as np
+
+from postfx import hsv_to_rgb, rgb_to_hsv
+
+# hue: rotation in turns, tint: (target hue, pull 0..1 along the shortest arc),
+# saturation/value: scale factors, floor: minimum saturation after scaling
+ENEMY_VARIANTS = {
+    'elite':     {'hue': 0.0, 'tint': (0.00, 0.00), 'saturation': 1.40, 'value': 1.20, 'floor': 0.0},
+    'boss':      {'hue': 0.0, 'tint': (0.02, 0.85), 'saturation': 1.30, 'value': 1.05, 'floor': 0.30},
+    'corrupted': {'hue': 0.0, 'tint': (0.78, 0.90), 'saturation': 0.85, 'value': 0.80, 'floor': 0.25},
+}
+
+
+def _column(values):
+    """Per-variant parameters shaped to broadcast over [V, N, h, w]."""
+    return np.array(values, dtype=np.float32).reshape(-1, 1, 1, 1)
+
+
+def recolour_stack(stack, variants=ENEMY_VARIANTS):
+    """Remap a [N, h, w, 4] uint8 stack for every variant: returns [V, N, h, w, 4]."""
+    specs = list(variants.values())
+    hsv = rgb_to_hsv(stack[..., :3].astype(np.float32) / 255.0)
+    h, s, v = hsv[..., 0][None], hsv[..., 1][None], hsv[..., 2][None]
+
+    target = _column([sp['tint'][0] for sp in specs])
+    pull = _column([sp['tint'][1] for sp in specs])
+    h = (h + _column([sp['hue'] for sp in specs])) % 1.0
+    arc = (target - h + 0.5) % 1.0 - 0.5
+    h = (h + arc * pull) % 1.0
+    s = s * _column([sp['saturation'] for sp in specs])
+    s = np.clip(np.maximum(s, _column([sp['floor'] for sp in specs])), 0, 1)
+    v = np.clip(v * _column([sp['value'] for sp in specs]), 0, 1)
+
+    out = np.empty((len(specs),) + stack.shape, dtype=np.uint8)
+    out[..., :3] = np.clip(np.rint(hsv_to_rgb(np.stack([h, s, v], axis=-1)) * 255.0), 0, 255)
+    out[..., 3] = stack[..., 3]
+    return out
+
+
+def recolour_strips(strips, variants=ENEMY_VARIANTS):
+    """Recolour differently sized strips in one call.
+
+    Returns {variant: [strip, ...]} in the order of `strips`.
+    """
+    if not strips:
+        return {name: [] for name in variants}
+    mh = max(s.shape[0] for s in strips)
+    mw = max(s.shape[1] for s in strips)
+    stack = np.zeros((len(strips), mh, mw, 4), dtype=np.uint8)
+    for i, s in enumerate(strips):
+        stack[i, :s.shape[0], :s.shape[1]] = s
+    out = recolour_stack(stack, variants)
+    return {name: [out[v, i, :s.shape[0], :s.shape[1]] for i, s in enumerate(strips)]
+            for v, name in enumerate(variants)}
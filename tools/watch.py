@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Watch mode: re-render only the sprites whose generator source changed.
+
+A Watcher polls the mtimes of tools/*.py. When a file changes:
+
+  1. its definitions are re-hashed (depgraph.py); a save that leaves every
+     top-level statement's text as it was stops here
+  2. the module is reloaded with importlib.reload, followed by every loaded
+     tools/ module that took names from it, in import order, so
+     `from curves import arc` picks up the new arc
+  3. every registry module among them has its entries re-keyed; an entry
+     is stale when its key (the source it can reach plus its arguments)
+     differs from the last one seen
+  4. stale entries are rendered (pixel modules through the draw-op cache,
+     see drawops.py) and their PNGs handed to a DirectorySink (sinks.py),
+     which replaces them atomically, so the game never reads a
+     half-written file, and leaves unchanged bytes alone
+
+Entries in registry.HAND_DRAWN are never written: their committed
+strips are not what the generator draws. Skill icons bring their
+disabled/ and cooldown/ states along. With `atlas`
+the atlas is rebuilt afterwards; only the bundles whose sprites changed
+are re-packed (see atlas.build_atlas).
+
+A module that fails to parse or reload (a syntax error mid-edit) is
+reported once and keeps its previous version; it is retried on every poll
+until it loads again.
+"""
+
+import glob
+import importlib
+import os
+import sys
+import time
+import traceback
+
+import atlas
+import depgraph
+import drawops
+from pngio import encode_png
+from registry import HAND_DRAWN, PIXEL_MODULES, entry_outputs, output_id, render_entry
+from sinks import DirectorySink
+
+# Pixel-art modules whose registry entries re-render in well under a frame
+REGISTRY_MODULES = PIXEL_MODULES + ('gen_item_icons',)
+
+POLL_INTERVAL = 0.05
+
+
+class Watcher:
+    def __init__(self, modules=REGISTRY_MODULES, atlas_root=None, atlas_out=None, log=print):
+        self.modules = list(modules)
+        self.atlas_root = atlas_root
+        self.atlas_out = atlas_out
+        self.log = log
+        self.sink = DirectorySink(atlas.ART_DIR)
+        self._mtimes = {}
+        self._hashes = {}
+        self._broken = {}   # module -> last error reported for it
+        self._keys = {}
+        for name in self.modules:
+            self._keys[name] = self._entry_keys(importlib.import_module(name))
+        self.poll()
+
+    def _entry_keys(self, module):
+        return depgraph.entry_keys(drawops.generator_entries(module))
+
+    def _definitions(self, name):
+        """The module file's definition hashes, or None (reported) while it does not parse."""
+        try:
+            hashes = depgraph.definitions(os.path.join(depgraph.TOOLS_DIR, f'{name}.py')).hashes
+        except (OSError, SyntaxError, ValueError) as e:
+            error = f'{type(e).__name__}: {e}'
+            if self._broken.get(name) != error:
+                self._broken[name] = error
+                self.log(f'  {name}: {error}; keeping the previous version')
+            # Retry on the next poll, whether or not the file is saved again
+            self._mtimes[name] = None
+            return None
+        self._broken.pop(name, None)
+        return hashes
+
+    def poll(self):
+        """Module names whose .py file changed since the last poll."""
+        changed = []
+        for path in glob.glob(os.path.join(depgraph.TOOLS_DIR, '*.py')):
+            name = os.path.basename(path)[:-3]
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self._mtimes.get(name, mtime) != mtime:
+                changed.append(name)
+            self._mtimes[name] = mtime
+            if name not in self._hashes and name not in changed:
+                hashes = self._definitions(name)
+                if hashes is not None:
+                    self._hashes[name] = hashes
+        return changed
+
+    def _reload_order(self, changed):
+        """Loaded modules to reload for `changed`, each after the modules it imports from."""
+        loaded = {n: m for n, m in sys.modules.items() if depgraph.is_tracked(m)}
+        deps = {n: depgraph.imported_from(m) for n, m in loaded.items()}
+        stale = {n for n in changed if n in loaded}
+        grew = True
+        while grew:
+            more = {n for n in loaded if deps[n] & stale} - stale
+            stale |= more
+            grew = bool(more)
+        order = []
+        while stale:
+            ready = sorted(n for n in stale if not deps[n] & stale) or sorted(stale)[:1]
+            order += ready
+            stale -= set(ready)
+        return order
+
+    def update(self, changed):
+        """Reload `changed` modules and re-render stale entries; returns the files written."""
+        edited = []
+        for name in changed:
+            hashes = self._definitions(name)
+            if hashes is not None and hashes != self._hashes.get(name):
+                self._hashes[name] = hashes
+                edited.append(name)
+        seen = len(self.sink.changed)
+        for name in self._reload_order(edited):
+            try:
+                module = importlib.reload(sys.modules[name])
+            except Exception:
+                self.log(f'  {name}: reload failed, keeping the previous version')
+                self.log(traceback.format_exc(limit=-1).rstrip())
+                break
+            if name in self._keys:
+                self._rerender(module)
+        self.sink.flush()
+        written = self.sink.changed[seen:]
+        if written and self.atlas_out:
+            atlas.build_atlas(self.atlas_root or atlas.ART_DIR, self.atlas_out)
+        return written
+
+    def _rerender(self, module):
+        keys = self._entry_keys(module)
+        old = self._keys[module.__name__]
+        self._keys[module.__name__] = keys
+        gens = dict(drawops.generator_entries(module))
+        for name, key in keys.items():
+            if old.get(name) == key:
+                continue
+            if output_id(os.path.join(module.OUT_DIR, f'{name}.png')) in HAND_DRAWN:
+                # The committed strip is not generator output; never overwrite it
+                continue
+            try:
+                rgba = render_entry(module, name, gens[name])
+            except Exception:
+                self.log(f'  {module.__name__}.{name}: render failed')
+                self.log(traceback.format_exc(limit=-1).rstrip())
+                # Retry on the next save even if this entry's key stays the same
+                self._keys[module.__name__].pop(name)
+                continue
+            for path, img in entry_outputs(module, name, rgba):
+                self.sink.put(f'{output_id(path)}.png', encode_png(img))
+
+    def run(self, interval=POLL_INTERVAL):
+        self.log(f'Watching {depgraph.TOOLS_DIR} ({", ".join(self.modules)}); Ctrl-C to stop')
+        try:
+            while True:
+                changed = self.poll()
+                if changed:
+                    start = time.perf_counter()
+                    written = self.update(changed)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    for name in written:
+                        self.log(f'  {name}')
+                    self.log(f'{", ".join(changed)}: {len(written)} files in {elapsed:.0f} ms')
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sink.close()
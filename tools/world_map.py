@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Render a saved world (server/world/ChunkStore's chunk_X_Y.json files) to one PNG.
+
+Tiles are drawn from the generated 96x96 autotile textures in tileArt/,
+picking the 3x3 sub-tile the same way ClientChunk.getAutotileIndex does;
+tile types without a texture use their TILE_COLORS fill. The client's
+animated water, cave and shore overlays are not drawn.
+
+Memory stays bounded for any world size:
+
+  * chunk files are parsed one chunk row at a time in a process pool, and
+    only the tile ids are kept (a 200x100-chunk world is 5 MB of ids)
+  * the image is produced one tile row at a time by a single gather from a
+    table of pre-cut (and pre-scaled) sub-tiles
+  * rows go straight to pngio.write_png_stream, which compresses bands in
+    parallel and holds only a few of them
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pngio import read_png, write_png_stream
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CHUNK_DIR = os.path.join(ROOT_DIR, 'saves', 'chunks')
+ART_DIR = os.path.join(ROOT_DIR, 'tileArt')
+TILE_TYPES_JS = os.path.join(ROOT_DIR, 'shared', 'TileTypes.js')
+TILE_SPRITES_JS = os.path.join(ROOT_DIR, 'client', 'world', 'TileSprites.js')
+
+TILE_SIZE = 32    # shared/Constants.js
+CHUNK_SIZE = 16   # shared/Constants.js
+MAX_TILE_ID = 128
+MISSING = -1      # no chunk saved here (ClientChunk.getTileLocal's "unknown")
+FALLBACK_COLOR = '#ff00ff'
+
+_CHUNK_FILE = re.compile(r'chunk_(-?\d+)_(-?\d+)\.json$')
+
+
+# ── Tile definitions (from the shared JS modules) ──────────────────────
+
+def _js_object(path, name):
+    with open(path) as f:
+        src = f.read()
+    return re.search(r'const %s = \{(.*?)\n\};' % name, src, re.S).group(1)
+
+
+def tile_definitions():
+    """Return ({tile id: texture name}, {tile id: '#rrggbb'}) from TileTypes.js / TileSprites.js."""
+    ids = {k: int(v) for k, v in re.findall(r'(\w+):\s*(\d+),', _js_object(TILE_TYPES_JS, 'TILE'))}
+    colors = {ids[k]: c for k, c in
+              re.findall(r"\[TILE\.(\w+)\]:\s*'(#[0-9a-fA-F]{6})'", _js_object(TILE_TYPES_JS, 'TILE_COLORS'))}
+    names = {ids[k]: n for k, n in
+             re.findall(r"\[TILE\.(\w+)\]:\s*'(\w+)'", _js_object(TILE_SPRITES_JS, 'TILE_SPRITE_NAMES'))}
+    return names, colors
+
+
+def _downscale(tiles, scale):
+    """Box-filter the last-but-one two axes of [..., T, T, 4] by an integer factor."""
+    if scale == 1:
+        return tiles
+    t = tiles.shape[-2] // scale
+    blocks = tiles.reshape(tiles.shape[:-3] + (t, scale, t, scale, 4)).astype(np.float32)
+    return np.rint(blocks.mean(axis=(-4, -2))).astype(np.uint8)
+
+
+def subtile_table(scale=1, art_dir=ART_DIR):
+    """[1 + MAX_TILE_ID * 9, T, T, 4] sub-tiles, T = TILE_SIZE // scale.
+
+    Slot 0 is transparent (missing chunk); tile id t with autotile (col, row)
+    is slot 1 + t * 9 + row * 3 + col.
+    """
+    names, colors = tile_definitions()
+    table = np.zeros((1 + MAX_TILE_ID * 9, TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    for tile_id in range(MAX_TILE_ID):
+        slots = table[1 + tile_id * 9:1 + (tile_id + 1) * 9]
+        path = os.path.join(art_dir, f'{names.get(tile_id)}.png')
+        if tile_id in names and os.path.exists(path):
+            sheet = read_png(path)
+            if sheet.shape[:2] == (TILE_SIZE, TILE_SIZE):
+                slots[...] = sheet  # plain tile, no autotile variants
+                continue
+            sheet = sheet[:3 * TILE_SIZE, :3 * TILE_SIZE]
+            # (row, y, col, x, c) -> (row, col, y, x, c), matching slot order row * 3 + col
+            cells = sheet.reshape(3, TILE_SIZE, 3, TILE_SIZE, 4).transpose(0, 2, 1, 3, 4)
+            slots[...] = cells.reshape(9, TILE_SIZE, TILE_SIZE, 4)
+        else:
+            h = colors.get(tile_id, FALLBACK_COLOR).lstrip('#')
+            slots[...] = [int(h[i:i + 2], 16) for i in (0, 2, 4)] + [255]
+    return _downscale(table, scale)
+
+
+# ── Chunk files ────────────────────────────────────────────────────────
+
+def scan_chunks(chunk_dir=CHUNK_DIR):
+    """{(chunk_x, chunk_y): path} for every saved chunk file (names only, nothing parsed)."""
+    if not os.path.isdir(chunk_dir):
+        raise ValueError(f'no chunk directory at {chunk_dir}')
+    found = {}
+    with os.scandir(chunk_dir) as it:
+        for entry in it:
+            m = _CHUNK_FILE.match(entry.name)
+            if m:
+                found[int(m.group(1)), int(m.group(2))] = entry.path
+    return found
+
+
+def _load_chunk_row(paths, width):
+    """Tile ids of one chunk row: [(column, path), ...] -> [CHUNK_SIZE, width * CHUNK_SIZE] int16."""
+    out = np.full((CHUNK_SIZE, width * CHUNK_SIZE), MISSING, dtype=np.int16)
+    for col, path in paths:
+        try:
+            with open(path) as f:
+                tiles = json.load(f)['tiles']
+            out[:, col * CHUNK_SIZE:(col + 1) * CHUNK_SIZE] = \
+                np.asarray(tiles, dtype=np.int16).reshape(CHUNK_SIZE, CHUNK_SIZE)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # ChunkStore.load treats unreadable files as missing too
+    return out
+
+
+def iter_tile_rows(chunks, bounds, workers=None):
+    """Yield the world's tile-id rows top to bottom, each [width * CHUNK_SIZE] int16."""
+    x0, y0, x1, y1 = bounds
+    width = x1 - x0
+    rows = [[(cx - x0, chunks[cx, cy]) for cx in range(x0, x1) if (cx, cy) in chunks]
+            for cy in range(y0, y1)]
+    with ProcessPoolExecutor(workers) as pool:
+        for grid in pool.map(_load_chunk_row, rows, [width] * len(rows)):
+            yield from grid
+
+
+# ── Rendering ──────────────────────────────────────────────────────────
+
+def autotile_slots(above, row, below):
+    """Sub-tile slot per tile of `row`, vectorized ClientChunk.getAutotileIndex."""
+    pad = np.full(1, MISSING, dtype=row.dtype)
+    west = np.concatenate([pad, row[:-1]])
+    east = np.concatenate([row[1:], pad])
+    w_open, e_open = west != row, east != row
+    n_open, s_open = above != row, below != row
+    col = 1 - (w_open & ~e_open) + (e_open & ~w_open)
+    r = 1 - (n_open & ~s_open) + (s_open & ~n_open)
+    slots = 1 + row.astype(np.intp) * 9 + r * 3 + col
+    slots[(row < 0) | (row >= MAX_TILE_ID)] = 0
+    return slots
+
+
+def iter_bands(tile_rows, table):
+    """One image band (T rows of pixels) per tile row, using a one-row lookahead."""
+    t = table.shape[1]
+    above = row = None
+    for below in tile_rows:
+        if row is None:
+            row = below
+            above = np.full_like(row, MISSING)
+            continue
+        yield table[autotile_slots(above, row, below)].transpose(1, 0, 2, 3).reshape(t, -1, 4)
+        above, row = row, below
+    if row is not None:
+        below = np.full_like(row, MISSING)
+        yield table[autotile_slots(above, row, below)].transpose(1, 0, 2, 3).reshape(t, -1, 4)
+
+
+def render_world(out_path, chunk_dir=CHUNK_DIR, scale=1, bounds=None, workers=None, level=6):
+    """Render every saved chunk (or the chunk rectangle `bounds` = (x0, y0, x1, y1),
+    end-exclusive) to out_path. Returns (width, height, bytes written, chunk count).
+    """
+    if TILE_SIZE % scale:
+        raise ValueError(f'scale must divide the tile size {TILE_SIZE}')
+    chunks = scan_chunks(chunk_dir)
+    if bounds is None:
+        if not chunks:
+            raise ValueError(f'no chunk_X_Y.json files in {chunk_dir}')
+        xs = [x for x, _ in chunks]
+        ys = [y for _, y in chunks]
+        bounds = (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+    x0, y0, x1, y1 = bounds
+    table = subtile_table(scale)
+    t = table.shape[1]
+    width = (x1 - x0) * CHUNK_SIZE * t
+    height = (y1 - y0) * CHUNK_SIZE * t
+    bands = iter_bands(iter_tile_rows(chunks, bounds, workers), table)
+    nbytes = write_png_stream(out_path, width, height, bands, level=level, workers=workers)
+    count = sum(1 for x, y in chunks if x0 <= x < x1 and y0 <= y < y1)
+    return width, height, nbytes, count